@@ -1,6 +1,5 @@
 """Context builder for assembling agent prompts."""
 
-import base64
 import mimetypes
 import platform
 from pathlib import Path
@@ -8,6 +7,11 @@ from typing import Any
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.utils.cpu_executor import run_cpu_sync
+from nanobot.utils.cpu_tasks import encode_image
+
+# Images at least this large are encoded in the CPU worker pool
+_OFFLOAD_IMAGE_BYTES = 512 * 1024
 
 
 class ContextBuilder:
@@ -169,7 +173,10 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
             mime, _ = mimetypes.guess_type(path)
             if not p.is_file() or not mime or not mime.startswith("image/"):
                 continue
-            b64 = base64.b64encode(p.read_bytes()).decode()
+            if p.stat().st_size >= _OFFLOAD_IMAGE_BYTES:
+                b64 = run_cpu_sync(encode_image, str(p))
+            else:
+                b64 = encode_image(str(p))
             images.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}})
         
         if not images:
@@ -0,0 +1,101 @@
+"""Wall-clock deadlines for agent turns."""
+
+import asyncio
+import time
+from typing import Any
+
+from nanobot.config.schema import TurnDeadlinesConfig
+from nanobot.providers.base import LLMProvider
+
+BUDGET_EXHAUSTED_NOTE = (
+    "[System: The time budget for this turn is exhausted. Do not call any more tools. "
+    "Reply now with the best answer you can give from what you have gathered so far, "
+    "and briefly mention anything you could not finish.]"
+)
+
+TIMED_OUT_FALLBACK = "I ran out of time before I could finish this request."
+
+
+class TurnDeadline:
+    """
+    Wall-clock budget for a single agent turn.
+
+    The last `reserve` seconds are kept back so that the turn can still
+    produce a best-effort answer once the working budget is spent.
+    """
+
+    def __init__(self, seconds: float | None = None, reserve: float = 0.0):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.reserve = min(reserve, self.seconds / 2) if self.seconds else 0.0
+        self._start = time.monotonic()
+
+    @classmethod
+    def for_source(
+        cls,
+        config: TurnDeadlinesConfig,
+        source: str,
+        channel: str | None = None,
+    ) -> "TurnDeadline":
+        """Build a deadline from config for a turn source and channel."""
+        seconds = config.channels.get(channel) if channel and source == "interactive" else None
+        if seconds is None:
+            seconds = getattr(config, source, config.interactive)
+        return cls(seconds, reserve=config.finalize_seconds)
+
+    @property
+    def remaining(self) -> float | None:
+        """Seconds left in the whole turn, or None when unbounded."""
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - (time.monotonic() - self._start))
+
+    @property
+    def expired(self) -> bool:
+        """True once the working budget (excluding the reserve) is spent."""
+        remaining = self.remaining
+        return remaining is not None and remaining <= self.reserve
+
+    def timeout(self, cap: float | None = None) -> float | None:
+        """Timeout for the next provider call or tool execution."""
+        remaining = self.remaining
+        if remaining is None:
+            return cap
+        budget = max(0.0, remaining - self.reserve)
+        return min(budget, cap) if cap is not None else budget
+
+
+def last_assistant_text(messages: list[dict[str, Any]]) -> str | None:
+    """Return the most recent assistant text produced since the last user message."""
+    for msg in reversed(messages):
+        if msg.get("role") == "user":
+            break
+        content = msg.get("content")
+        if msg.get("role") == "assistant" and isinstance(content, str) and content.strip():
+            return content
+    return None
+
+
+async def best_effort_answer(
+    provider: LLMProvider,
+    model: str,
+    messages: list[dict[str, Any]],
+    deadline: TurnDeadline,
+    tools: list[dict[str, Any]] | None = None,
+    note: str = BUDGET_EXHAUSTED_NOTE,
+) -> str:
+    """Ask for a final answer within the reserved time, falling back to partial output."""
+    remaining = deadline.remaining
+    if remaining is None or remaining > 1:
+        try:
+            async with asyncio.timeout(remaining):
+                response = await provider.chat(
+                    messages=messages + [{"role": "user", "content": note}],
+                    tools=tools,
+                    model=model,
+                    timeout=remaining,
+                )
+            if response.finish_reason != "error" and response.content:
+                return response.content
+        except TimeoutError:
+            pass
+    return last_assistant_text(messages) or TIMED_OUT_FALLBACK
@@ -0,0 +1,237 @@
+"""Background job manager for long-running shell commands."""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from loguru import logger
+
+from nanobot.agent.tools.limits import (
+    ResourceLimits,
+    kill_process_group,
+    release_cgroup,
+    terminate_process_group,
+)
+from nanobot.agent.tools.registry import workspace_changes
+from nanobot.agent.tools.shell import OutputCapture
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.utils.io_executor import run_io
+
+# Bytes read from the job's output pipe per step
+_READ_CHUNK = 64 * 1024
+# Finished jobs remembered per manager; older ones are forgotten
+_MAX_FINISHED = 50
+
+
+@dataclass
+class Job:
+    """One background command and what is known about it so far."""
+    id: str
+    command: str
+    cwd: str
+    owner: str
+    output: OutputCapture
+    sender_id: str = "user"
+    log_path: Path | None = None
+    notify: bool = True
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    status: str = "running"  # running, exited, failed, killed, timed out
+    exit_code: int | None = None
+    log_bytes: int = 0
+    process: asyncio.subprocess.Process | None = None
+    cgroup: Path | None = None
+    task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def describe(self) -> str:
+        state = self.status
+        if self.status == "exited":
+            state = f"exited {self.exit_code}"
+        return f"[{self.id}] {state} after {self.elapsed:.0f}s: {self.command}"
+
+
+class JobManager:
+    """
+    Runs shell commands in the background and tracks their output.
+
+    Each job's combined stdout/stderr is kept in a head/tail capture and,
+    when a log directory is set, appended to `<log_dir>/<id>.log` up to
+    `max_log_bytes`. When a job finishes and asked to be notified, a system
+    message is published on the bus so the agent can tell the user, the same
+    way subagents announce their results.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        log_dir: Path | None = None,
+        max_jobs: int = 4,
+        timeout: int = 3600,
+        max_output_chars: int = 10000,
+        max_log_bytes: int = 10_000_000,
+        limits: ResourceLimits | None = None,
+        kill_grace: float = 2.0,
+    ):
+        self.bus = bus
+        self.log_dir = log_dir
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.max_output_chars = max_output_chars
+        self.max_log_bytes = max_log_bytes
+        self.limits = limits or ResourceLimits()
+        self.kill_grace = kill_grace
+        self._jobs: dict[str, Job] = {}
+
+    def running_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.running)
+
+    def get(self, job_id: str, owner: str | None = None) -> Job | None:
+        """Look up a job, only returning it to the conversation that started it."""
+        job = self._jobs.get(job_id)
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def list(self, owner: str | None = None) -> list[Job]:
+        return [j for j in self._jobs.values() if owner is None or j.owner == owner]
+
+    async def start(
+        self, command: str, cwd: str, owner: str, notify: bool = True, sender_id: str = "user"
+    ) -> Job:
+        """
+        Start `command` in its own process group and return immediately.
+
+        Raises:
+            RuntimeError: If `max_jobs` jobs are already running.
+        """
+        if self.running_count() >= self.max_jobs:
+            raise RuntimeError(f"{self.max_jobs} background jobs are already running")
+        self._forget_finished()
+
+        job_id = uuid.uuid4().hex[:8]
+        log_path = self.log_dir / f"{job_id}.log" if self.log_dir else None
+        output = OutputCapture(
+            "output",
+            head_bytes=self.max_output_chars * 2 // 3,
+            tail_bytes=self.max_output_chars // 3,
+        )
+        job = Job(id=job_id, command=command, cwd=cwd, owner=owner, output=output,
+                  sender_id=sender_id, log_path=log_path, notify=notify)
+        job.cgroup = self.limits.create_cgroup()
+        try:
+            job.process = await self.limits.spawn_shell(
+                command,
+                job.cgroup,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=cwd,
+            )
+        except Exception:
+            await run_io(release_cgroup, job.cgroup)
+            raise
+        self._jobs[job_id] = job
+        workspace_changes.job_started()
+        job.task = asyncio.create_task(self._run(job))
+        logger.info(f"Started background job [{job_id}]: {command}")
+        return job
+
+    async def terminate(self, job: Job) -> bool:
+        """
+        Stop a running job's whole process group, escalating from SIGTERM to SIGKILL.
+
+        Returns:
+            False if the job had already finished.
+        """
+        if not job.running or job.process is None:
+            return False
+        job.status = "killed"
+        await terminate_process_group(job.process, self.kill_grace)
+        return True
+
+    def kill_all(self) -> None:
+        """SIGKILL every running job; used on shutdown."""
+        for job in self._jobs.values():
+            if job.running and job.process is not None:
+                job.status = "killed"
+                kill_process_group(job.process)
+
+    async def _run(self, job: Job) -> None:
+        assert job.process is not None
+        log = None
+        if job.log_path:
+            try:
+                log = await run_io(_open_log, job.log_path)
+            except OSError as e:
+                logger.warning(f"Job [{job.id}] cannot write its log: {e}")
+                job.log_path = None
+        try:
+            await asyncio.wait_for(self._pump(job, log), timeout=self.timeout or None)
+            if job.status == "running":
+                job.exit_code = job.process.returncode
+                job.status = "exited"
+        except asyncio.TimeoutError:
+            job.status = "timed out"
+            await terminate_process_group(job.process, self.kill_grace)
+        except Exception as e:
+            logger.error(f"Background job [{job.id}] failed: {e}")
+            job.status = "failed"
+            kill_process_group(job.process)
+        finally:
+            job.finished_at = time.time()
+            workspace_changes.job_finished()
+            await run_io(release_cgroup, job.cgroup)
+            if log is not None:
+                await run_io(log.close)
+        logger.info(f"Background job {job.describe()}")
+        if job.notify:
+            await self._announce(job)
+
+    async def _pump(self, job: Job, log: BinaryIO | None) -> None:
+        assert job.process is not None and job.process.stdout is not None
+        while chunk := await job.process.stdout.read(_READ_CHUNK):
+            job.output.feed(chunk)
+            if log is not None and job.log_bytes < self.max_log_bytes:
+                chunk = chunk[:self.max_log_bytes - job.log_bytes]
+                await run_io(log.write, chunk)
+                job.log_bytes += len(chunk)
+        await job.process.wait()
+
+    async def _announce(self, job: Job) -> None:
+        """Tell the conversation that started the job that it has finished."""
+        announce_content = f"""[Background job {job.describe()}]
+
+Output:
+{job.output.text() if job.output.total else "(no output)"}
+
+Summarize this naturally for the user. Keep it brief (1-2 sentences)."""
+
+        await self.bus.publish_inbound(InboundMessage(
+            channel="system",
+            sender_id="job",
+            chat_id=job.owner,
+            content=announce_content,
+            metadata={"origin_sender_id": job.sender_id},
+        ))
+
+    def _forget_finished(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if not j.running), key=lambda j: j.started_at)
+        for job in finished[:max(0, len(finished) - _MAX_FINISHED + 1)]:
+            del self._jobs[job.id]
+
+
+def _open_log(path: Path) -> BinaryIO:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return open(path, "wb")
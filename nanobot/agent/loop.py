@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import asyncio
 import json
+import os
+import time
 import uuid
 from collections.abc import AsyncIterator
 from pathlib import Path
@@ -12,24 +14,62 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 from nanobot.agent.context import ContextBuilder
+from nanobot.agent.deadline import TurnDeadline, best_effort_answer
+from nanobot.agent.jobs import JobManager
+from nanobot.agent.loop_guard import LOOP_STOP_NOTE, ToolLoopGuard
+from nanobot.agent.quota import QuotaManager
+from nanobot.agent.result_store import ResultStore
 from nanobot.agent.stream_runner import stream_direct_response
 from nanobot.agent.subagent import SubagentManager
 from nanobot.agent.tools.cron import CronTool
+from nanobot.agent.tools.exposure import ToolExposurePolicy, ToolSelection
 from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.agent.tools.jobs import (
+    JOB_TOOL_NAMES,
+    ExecBackgroundTool,
+    JobKillTool,
+    JobOutputTool,
+    JobStatusTool,
+)
+from nanobot.agent.tools.limits import ResourceLimits
 from nanobot.agent.tools.message import MessageTool
-from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.metrics import ToolMetrics
+from nanobot.agent.tools.python import PythonTool
+from nanobot.agent.tools.python_pool import PythonWorkerPool
+from nanobot.agent.tools.registry import ToolLimiter, ToolRegistry, ToolResultCache
+from nanobot.agent.tools.result import ReadResultTool
+from nanobot.agent.tools.search import SearchTool, WorkspaceIndex, default_index_path
+from nanobot.agent.tools.search_cache import SearchCache
 from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionManager
 from nanobot.agent.tools.spawn import SpawnTool
-from nanobot.agent.tools.web import WebFetchTool, WebSearchTool
+from nanobot.agent.tools.web import WebFetchManyTool, WebFetchTool, WebSearchTool
+from nanobot.agent.tools.web_cache import WebCache
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.config.schema import ExecToolConfig
+from nanobot.config.schema import (
+    ExecToolConfig,
+    LoopGuardConfig,
+    PythonToolConfig,
+    QuotaConfig,
+    SubagentsConfig,
+    ToolExposureConfig,
+    ToolResultsConfig,
+    TurnDeadlinesConfig,
+    WebFetchConfig,
+    WebSearchConfig,
+)
 from nanobot.providers.base import LLMProvider
 from nanobot.session.manager import SessionManager
+from nanobot.utils.helpers import get_data_path
+from nanobot.utils.io_executor import run_io
 
 if TYPE_CHECKING:
     from nanobot.cron.service import CronService
 
+# Seconds between tool metrics snapshots written for `nanobot status`
+METRICS_SAVE_INTERVAL_S = 30.0
+
 
 class AgentLoop:
     """
@@ -54,6 +94,16 @@ class AgentLoop:
         exec_config: "ExecToolConfig | None" = None,
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
+        quota_config: "QuotaConfig | None" = None,
+        deadlines_config: "TurnDeadlinesConfig | None" = None,
+        loop_guard_config: "LoopGuardConfig | None" = None,
+        results_config: "ToolResultsConfig | None" = None,
+        python_config: "PythonToolConfig | None" = None,
+        web_fetch_config: "WebFetchConfig | None" = None,
+        web_search_config: "WebSearchConfig | None" = None,
+        tool_limiter: ToolLimiter | None = None,
+        exposure_config: "ToolExposureConfig | None" = None,
+        subagents_config: "SubagentsConfig | None" = None,
     ):
         self.bus = bus
         self.provider = provider
@@ -64,10 +114,70 @@ class AgentLoop:
         self.exec_config = exec_config or ExecToolConfig()
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
+        self.deadlines = deadlines_config or TurnDeadlinesConfig()
+        self.loop_guard = loop_guard_config or LoopGuardConfig()
+        self.results = results_config or ToolResultsConfig()
+        self.results_dir = get_data_path() / "results"
+        self.metrics_path = get_data_path() / "metrics" / "tools.json"
+        self._metrics_saved_at = 0.0
         
         self.context = ContextBuilder(workspace)
         self.sessions = SessionManager(workspace)
-        self.tools = ToolRegistry()
+        self.quota = QuotaManager(quota_config, store_path=get_data_path() / "quota" / "usage.json")
+        self.tools = ToolRegistry(tool_limiter)
+        self.tool_policy = ToolExposurePolicy.from_config(exposure_config or ToolExposureConfig())
+        self.exec_limits = ResourceLimits(**self.exec_config.limits.model_dump())
+        self.shell_sessions = (
+            ShellSessionManager(
+                self.exec_config.max_sessions, self.exec_config.session_idle_seconds, self.exec_limits
+            )
+            if self.exec_config.persistent_sessions and os.name == "posix" else None
+        )
+        self.python_config = python_config or PythonToolConfig()
+        self.python_pool = (
+            PythonWorkerPool(
+                str(workspace),
+                size=self.python_config.workers,
+                max_uses=self.python_config.max_uses,
+                preload=self.python_config.preload,
+                max_output_chars=self.python_config.max_output_chars,
+                limits=ResourceLimits(address_space_mb=self.python_config.memory_mb),
+            )
+            if self.python_config.enabled and not restrict_to_workspace else None
+        )
+        if self.python_config.enabled and restrict_to_workspace:
+            # Snippets can open any path, so they cannot honour the workspace restriction
+            logger.warning("python tool disabled because tools.restrictToWorkspace is set")
+        self.web_fetch_config = web_fetch_config or WebFetchConfig()
+        self.web_cache = (
+            WebCache(
+                get_data_path() / "web_cache",
+                max_bytes=self.web_fetch_config.cache_max_mb * 1024 * 1024,
+                default_ttl=self.web_fetch_config.cache_default_ttl,
+            )
+            if self.web_fetch_config.cache_enabled else None
+        )
+        self.web_search_config = web_search_config or WebSearchConfig()
+        self.search_cache = (
+            SearchCache(
+                get_data_path() / "web_search_cache.json",
+                ttl=self.web_search_config.cache_ttl,
+                max_entries=self.web_search_config.cache_max_entries,
+            )
+            if self.web_search_config.cache_ttl > 0 else None
+        )
+        # One search index per workspace, shared with subagents
+        self.search_index = WorkspaceIndex(self.workspace.resolve(), default_index_path(self.workspace))
+        self.jobs = JobManager(
+            bus,
+            log_dir=self.workspace / ".nanobot" / "jobs",
+            max_jobs=self.exec_config.max_background_jobs,
+            timeout=self.exec_config.background_timeout,
+            max_output_chars=self.exec_config.max_output_chars,
+            max_log_bytes=self.exec_config.job_log_bytes,
+            limits=self.exec_limits,
+            kill_grace=self.exec_config.kill_grace_seconds,
+        )
         self.subagents = SubagentManager(
             provider=provider,
             workspace=workspace,
@@ -76,6 +186,21 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            quota=self.quota,
+            deadlines_config=self.deadlines,
+            loop_guard_config=self.loop_guard,
+            results_config=self.results,
+            results_dir=self.results_dir,
+            python_pool=self.python_pool,
+            python_timeout=self.python_config.timeout,
+            web_fetch_config=self.web_fetch_config,
+            web_cache=self.web_cache,
+            web_search_config=self.web_search_config,
+            search_cache=self.search_cache,
+            search_index=self.search_index,
+            tool_limiter=self.tools.limiter,
+            tool_metrics=self.tools.metrics,
+            subagents_config=subagents_config,
         )
         
         self._running = False
@@ -90,17 +215,57 @@ class AgentLoop:
         self.tools.register(WriteFileTool(allowed_dir=allowed_dir))
         self.tools.register(EditFileTool(allowed_dir=allowed_dir))
         self.tools.register(ListDirTool(allowed_dir=allowed_dir))
+        self.tools.register(SearchTool(self.workspace, allowed_dir=allowed_dir, index=self.search_index))
         
         # Shell tool
-        self.tools.register(ExecTool(
+        exec_tool = ExecTool(
             working_dir=str(self.workspace),
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.restrict_to_workspace,
-        ))
+            max_output_chars=self.exec_config.max_output_chars,
+            kill_after_bytes=self.exec_config.kill_after_bytes,
+            spill_dir=self.workspace / ".nanobot" / "exec" if self.exec_config.spill_output else None,
+            sessions=self.shell_sessions,
+            limits=self.exec_limits,
+            kill_grace=self.exec_config.kill_grace_seconds,
+        )
+        self.tools.register(exec_tool)
+        
+        # Python snippets on warm interpreters
+        if self.python_pool is not None:
+            self.tools.register(PythonTool(self.python_pool, timeout=self.python_config.timeout))
+        
+        # Background jobs for long-running commands
+        if self.exec_config.max_background_jobs > 0:
+            self.tools.register(ExecBackgroundTool(self.jobs, exec_tool))
+            self.tools.register(JobStatusTool(self.jobs))
+            self.tools.register(JobOutputTool(self.jobs))
+            self.tools.register(JobKillTool(self.jobs))
         
         # Web tools
-        self.tools.register(WebSearchTool(api_key=self.brave_api_key))
-        self.tools.register(WebFetchTool())
+        self.tools.register(WebSearchTool(
+            api_key=self.brave_api_key,
+            max_results=self.web_search_config.max_results,
+            cache=self.search_cache,
+        ))
+        fetch_tool = WebFetchTool(
+            max_chars=self.web_fetch_config.max_chars,
+            cache=self.web_cache,
+            max_bytes=self.web_fetch_config.max_bytes,
+        )
+        self.tools.register(fetch_tool)
+        if self.web_fetch_config.batch_max_urls > 0:
+            self.tools.register(WebFetchManyTool(
+                fetch_tool,
+                max_urls=self.web_fetch_config.batch_max_urls,
+                concurrency=self.web_fetch_config.batch_concurrency,
+                per_host=self.web_fetch_config.batch_per_host,
+                max_total_chars=self.web_fetch_config.batch_max_total_chars,
+                registry=self.tools,
+            ))
+        
+        # Paged access to large results stored out of band
+        self.tools.register(ReadResultTool(self.results_dir, max_chars=self.results.spill_chars))
         
         # Message tool
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
@@ -118,7 +283,6 @@ class AgentLoop:
         """Run the agent loop, processing messages from the bus."""
         self._running = True
         logger.info("Agent loop started")
-        
         while self._running:
             try:
                 # Wait for next message
@@ -141,11 +305,29 @@ class AgentLoop:
                         content=f"Sorry, I encountered an error: {str(e)}"
                     ))
             except asyncio.TimeoutError:
-                continue
+                pass
+            await self._save_metrics()
+    
+    async def _save_metrics(self) -> None:
+        """Write tool metrics for `nanobot status`, at most every METRICS_SAVE_INTERVAL_S."""
+        now = time.monotonic()
+        if not self.tools.metrics.dirty or now - self._metrics_saved_at < METRICS_SAVE_INTERVAL_S:
+            return
+        self._metrics_saved_at = now
+        self.tools.metrics.dirty = False
+        await run_io(ToolMetrics.write_snapshot, self.metrics_path, self.tools.metrics.snapshot())
     
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
+        if self.shell_sessions is not None:
+            self.shell_sessions.close_all()
+        self.jobs.kill_all()
+        if self.python_pool is not None:
+            self.python_pool.close()
+        if self.tools.metrics.dirty:
+            self.tools.metrics.save(self.metrics_path)
+        self.quota.save()
         logger.info("Agent loop stopping")
     
     async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
@@ -165,8 +347,14 @@ class AgentLoop:
         
         logger.info(f"Processing message from {msg.channel}:{msg.sender_id}")
         
+        # Admission control: defer politely if the sender or channel is over budget
+        deferral = self.quota.check(msg.channel, msg.sender_id)
+        if deferral:
+            return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id, content=deferral)
+        self.quota.record_request(msg.channel, msg.sender_id)
+        
         # Get or create session
-        session = self.sessions.get_or_create(msg.session_key)
+        session = await run_io(self.sessions.get_or_create, msg.session_key)
         
         # Update tool contexts
         message_tool = self.tools.get("message")
@@ -175,14 +363,24 @@ class AgentLoop:
         
         spawn_tool = self.tools.get("spawn")
         if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(msg.channel, msg.chat_id)
+            spawn_tool.set_context(msg.channel, msg.chat_id, msg.sender_id)
         
         cron_tool = self.tools.get("cron")
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(msg.channel, msg.chat_id)
         
+        exec_tool = self.tools.get("exec")
+        if isinstance(exec_tool, ExecTool):
+            exec_tool.set_context(msg.channel, msg.chat_id)
+        
+        for name in JOB_TOOL_NAMES:
+            job_tool = self.tools.get(name)
+            if job_tool and hasattr(job_tool, "set_context"):
+                job_tool.set_context(msg.channel, msg.chat_id, msg.sender_id)
+        
         # Build initial messages (use get_history for LLM-formatted messages)
-        messages = self.context.build_messages(
+        messages = await run_io(
+            self.context.build_messages,
             history=session.get_history(),
             current_message=msg.content,
             media=msg.media if msg.media else None,
@@ -191,52 +389,13 @@ class AgentLoop:
         )
         
         # Agent loop
-        iteration = 0
-        final_content = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
-            
-            # Handle tool calls
-            if response.has_tool_calls:
-                # Add assistant message with tool calls
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)  # Must be JSON string
-                        }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages,
-                    response.content,
-                    tool_call_dicts,
-                    assistant_message=response.assistant_message,
-                )
-                
-                # Execute tools
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments)
-                    logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                # No tool calls, we're done
-                final_content = response.content
-                break
+        deadline = TurnDeadline.for_source(
+            self.deadlines, msg.metadata.get("source", "interactive"), msg.channel
+        )
+        final_content = await self._run_agent_loop(
+            messages, msg.channel, msg.sender_id, deadline,
+            selection=self.select_tools(msg.channel, msg.content),
+        )
         
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
@@ -244,7 +403,7 @@ class AgentLoop:
         # Save to session
         session.add_message("user", msg.content)
         session.add_message("assistant", final_content)
-        self.sessions.save(session)
+        await run_io(self.sessions.save, session)
         
         return OutboundMessage(
             channel=msg.channel,
@@ -270,10 +429,12 @@ class AgentLoop:
             # Fallback
             origin_channel = "cli"
             origin_chat_id = msg.chat_id
+        # Usage of the announce turn and anything it spawns counts against the original sender
+        origin_sender_id = msg.metadata.get("origin_sender_id", msg.sender_id)
         
         # Use the origin session for context
         session_key = f"{origin_channel}:{origin_chat_id}"
-        session = self.sessions.get_or_create(session_key)
+        session = await run_io(self.sessions.get_or_create, session_key)
         
         # Update tool contexts
         message_tool = self.tools.get("message")
@@ -282,14 +443,24 @@ class AgentLoop:
         
         spawn_tool = self.tools.get("spawn")
         if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(origin_channel, origin_chat_id)
+            spawn_tool.set_context(origin_channel, origin_chat_id, origin_sender_id)
         
         cron_tool = self.tools.get("cron")
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(origin_channel, origin_chat_id)
         
+        exec_tool = self.tools.get("exec")
+        if isinstance(exec_tool, ExecTool):
+            exec_tool.set_context(origin_channel, origin_chat_id)
+        
+        for name in JOB_TOOL_NAMES:
+            job_tool = self.tools.get(name)
+            if job_tool and hasattr(job_tool, "set_context"):
+                job_tool.set_context(origin_channel, origin_chat_id, origin_sender_id)
+        
         # Build messages with the announce content
-        messages = self.context.build_messages(
+        messages = await run_io(
+            self.context.build_messages,
             history=session.get_history(),
             current_message=msg.content,
             channel=origin_channel,
@@ -297,26 +468,102 @@ class AgentLoop:
         )
         
         # Agent loop (limited for announce handling)
+        deadline = TurnDeadline.for_source(self.deadlines, "interactive", origin_channel)
+        final_content = await self._run_agent_loop(
+            messages, origin_channel, origin_sender_id, deadline, enforce_quota=False,
+            selection=self.select_tools(origin_channel, msg.content),
+        )
+        
+        if final_content is None:
+            final_content = "Background task completed."
+        
+        # Save to session (mark as system message in history)
+        session.add_message("user", f"[System: {msg.sender_id}] {msg.content}")
+        session.add_message("assistant", final_content)
+        await run_io(self.sessions.save, session)
+        
+        return OutboundMessage(
+            channel=origin_channel,
+            chat_id=origin_chat_id,
+            content=final_content
+        )
+    
+    def select_tools(self, channel: str, text: str) -> ToolSelection:
+        """Tools offered to the model for a turn on `channel` starting with `text`."""
+        return self.tool_policy.select(self.tools.tool_names, channel, text)
+    
+    async def _run_agent_loop(
+        self,
+        messages: list[dict[str, Any]],
+        channel: str,
+        sender_id: str,
+        deadline: TurnDeadline,
+        enforce_quota: bool = True,
+        selection: ToolSelection | None = None,
+    ) -> str | None:
+        """
+        Run LLM calls and tool executions until the model produces a final answer.
+        
+        Args:
+            messages: Initial message list (system prompt, history, user message).
+            channel: Channel the turn is accounted to.
+            sender_id: Sender the turn is accounted to.
+            deadline: Wall-clock budget for the turn.
+            enforce_quota: Whether to stop the turn when the quota runs out.
+            selection: Tools exposed to and callable by the model (default: all).
+        
+        Returns:
+            The final response content, or None if the model gave none.
+        """
         iteration = 0
-        final_content = None
+        selection = selection or ToolSelection()
+        guard = ToolLoopGuard(self.loop_guard)
+        cache = ToolResultCache()
+        store = ResultStore(self.results, self.results_dir)
         
         while iteration < self.max_iterations:
             iteration += 1
+            definitions = self.tools.get_definitions(selection.exposed)
             
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
+            # Re-check the budget between iterations of a long turn
+            if enforce_quota and iteration > 1:
+                deferral = self.quota.check(channel, sender_id)
+                if deferral:
+                    return deferral
+            
+            if deadline.expired:
+                logger.info(f"Turn deadline reached after {iteration - 1} iterations")
+                return await best_effort_answer(
+                    self.provider, self.model, messages, deadline, definitions
+                )
+            
+            # Call LLM
+            timeout = deadline.timeout()
+            try:
+                async with asyncio.timeout(timeout):
+                    response = await self.provider.chat(
+                        messages=messages,
+                        tools=definitions,
+                        model=self.model,
+                        timeout=timeout,
+                    )
+            except TimeoutError:
+                logger.info("Turn deadline reached during LLM call")
+                return await best_effort_answer(
+                    self.provider, self.model, messages, deadline, definitions
+                )
+            self.quota.record_usage(channel, sender_id, response.usage)
             
+            # Handle tool calls
             if response.has_tool_calls:
+                # Add assistant message with tool calls
                 tool_call_dicts = [
                     {
                         "id": tc.id,
                         "type": "function",
                         "function": {
                             "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)
+                            "arguments": json.dumps(tc.arguments)  # Must be JSON string
                         }
                     }
                     for tc in response.tool_calls
@@ -328,30 +575,34 @@ class AgentLoop:
                     assistant_message=response.assistant_message,
                 )
                 
+                # Execute tools within what is left of the turn
                 for tool_call in response.tool_calls:
                     args_str = json.dumps(tool_call.arguments)
                     logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
+                    if selection.allows(tool_call.name):
+                        selection.note_call(tool_call.name)
+                        result = await guard.execute(
+                            self.tools, tool_call.name, tool_call.arguments,
+                            timeout=deadline.timeout(), cache=cache,
+                        )
+                    else:
+                        result = ToolSelection.refusal(tool_call.name, channel)
+                    result = await store.spill(tool_call.name, result)
                     messages = self.context.add_tool_result(
                         messages, tool_call.id, tool_call.name, result
                     )
+                
+                if guard.should_stop:
+                    logger.info("Loop guard stopped the turn: repeated tool calls")
+                    return await best_effort_answer(
+                        self.provider, self.model, messages, deadline,
+                        definitions, note=LOOP_STOP_NOTE,
+                    )
             else:
-                final_content = response.content
-                break
-        
-        if final_content is None:
-            final_content = "Background task completed."
-        
-        # Save to session (mark as system message in history)
-        session.add_message("user", f"[System: {msg.sender_id}] {msg.content}")
-        session.add_message("assistant", final_content)
-        self.sessions.save(session)
+                # No tool calls, we're done
+                return response.content
         
-        return OutboundMessage(
-            channel=origin_channel,
-            chat_id=origin_chat_id,
-            content=final_content
-        )
+        return None
     
     async def process_direct(
         self,
@@ -359,6 +610,7 @@ class AgentLoop:
         session_key: str = "cli:direct",
         channel: str = "cli",
         chat_id: str = "direct",
+        source: str = "interactive",
     ) -> str:
         """
         Process a message directly (for CLI or cron usage).
@@ -368,6 +620,7 @@ class AgentLoop:
             session_key: Session identifier.
             channel: Source channel (for context).
             chat_id: Source chat ID (for context).
+            source: Turn source for deadlines (interactive, cron, heartbeat).
         
         Returns:
             The agent's response.
@@ -376,7 +629,8 @@ class AgentLoop:
             channel=channel,
             sender_id="user",
             chat_id=chat_id,
-            content=content
+            content=content,
+            metadata={"source": source},
         )
         
         response = await self._process_message(msg)
@@ -389,6 +643,7 @@ class AgentLoop:
         channel: str = "cli",
         chat_id: str = "direct",
         run_id: str | None = None,
+        sender_id: str = "user",
     ) -> AsyncIterator[dict[str, Any]]:
         """Process a direct message and stream events."""
         rid = run_id or uuid.uuid4().hex[:10]
@@ -399,6 +654,7 @@ class AgentLoop:
             channel=channel,
             chat_id=chat_id,
             run_id=rid,
+            sender_id=sender_id,
         ):
             yield event
 
@@ -0,0 +1,118 @@
+"""Detection of repeated tool calls and non-progress cycles within a turn."""
+
+import hashlib
+import json
+from typing import Any
+
+from nanobot.agent.tools.registry import ToolRegistry, ToolResultCache
+from nanobot.config.schema import LoopGuardConfig
+
+LOOP_STOP_NOTE = (
+    "[System: You are repeating the same tool calls without making progress. Do not call "
+    "any more tools. Reply now with the best answer you can give from what you have, and "
+    "say what is blocking you.]"
+)
+
+
+def fingerprint(value: Any) -> str:
+    """Stable short hash of a JSON-serializable value."""
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class ToolLoopGuard:
+    """
+    Per-turn tracker that fingerprints tool calls and their results.
+
+    A loop is either the same call returning the same result `repeat_threshold`
+    times, or a short sequence of calls (e.g. A, B, A, B) repeating back to
+    back with unchanged results, which is caught one repetition earlier.
+    """
+
+    def __init__(self, config: LoopGuardConfig | None = None):
+        self.config = config or LoopGuardConfig()
+        self._history: list[tuple[str, str]] = []
+        self._counts: dict[tuple[str, str], int] = {}
+        self._results: dict[str, str] = {}
+        self.should_stop = False
+        self.detections = 0
+
+    def cached_result(self, name: str, arguments: dict[str, Any]) -> str | None:
+        """
+        Return a memoized result instead of executing a call that keeps repeating.
+
+        Only used with action "memoize", once the call has already produced the
+        same result enough times that running it again is pointless.
+        """
+        if not self.config.enabled or self.config.action != "memoize":
+            return None
+        call_fp = fingerprint([name, arguments])
+        result = self._results.get(call_fp)
+        if result is None:
+            return None
+        if self._counts.get((call_fp, fingerprint(result)), 0) < self.config.repeat_threshold - 1:
+            return None
+        self.detections += 1
+        return (
+            f"{result}\n\n[Loop guard: result reused from an identical earlier {name} call. "
+            "Running it again will not change the outcome; try a different approach.]"
+        )
+
+    def record(self, name: str, arguments: dict[str, Any], result: str) -> str | None:
+        """
+        Record an executed call and its result.
+
+        Returns:
+            A corrective note to append to the tool result when a loop is detected.
+        """
+        if not self.config.enabled:
+            return None
+        call_fp = fingerprint([name, arguments])
+        entry = (call_fp, fingerprint(result))
+        self._history.append(entry)
+        self._counts[entry] = self._counts.get(entry, 0) + 1
+        self._results[call_fp] = result
+
+        if self._counts[entry] >= self.config.repeat_threshold:
+            reason = f"{name} was called {self._counts[entry]} times with the same arguments and result"
+        elif period := self._cycle_period():
+            reason = f"the last {period} tool calls keep repeating with unchanged results"
+        else:
+            return None
+
+        self.detections += 1
+        if self.config.action == "stop":
+            self.should_stop = True
+        return (
+            f"\n\n[Loop guard: {reason}. You are not making progress; change your approach "
+            "or answer with what you have.]"
+        )
+
+    async def execute(
+        self,
+        tools: ToolRegistry,
+        name: str,
+        arguments: dict[str, Any],
+        timeout: float | None = None,
+        cache: ToolResultCache | None = None,
+    ) -> str:
+        """Execute a tool call through the registry with loop detection applied."""
+        cached = self.cached_result(name, arguments)
+        if cached is not None:
+            return cached
+        result = await tools.execute(name, arguments, timeout=timeout, cache=cache)
+        note = self.record(name, arguments, result)
+        return result + note if note else result
+
+    def _cycle_period(self) -> int | None:
+        """Find a repeating block of 2+ calls at the end of the history."""
+        repeats = max(2, self.config.repeat_threshold - 1)
+        for period in range(2, self.config.max_cycle_length + 1):
+            span = period * repeats
+            if len(self._history) < span:
+                break
+            tail = self._history[-span:]
+            block = tail[:period]
+            if len(set(block)) > 1 and all(tail[i] == block[i % period] for i in range(span)):
+                return period
+        return None
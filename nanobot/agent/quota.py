@@ -0,0 +1,198 @@
+"""Rolling-window token and request quotas per sender and per channel."""
+
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.config.schema import QuotaConfig
+from nanobot.utils.io_executor import run_io
+
+# Number of buckets a window is split into; bounds memory per key.
+_BUCKETS_PER_WINDOW = 60
+# Minimum seconds between writes of the usage file while usage is being recorded
+SAVE_INTERVAL_S = 5.0
+
+
+class QuotaManager:
+    """
+    Tracks LLM usage per sender and per channel over a rolling window.
+
+    Usage is bucketed by time so state stays small regardless of traffic,
+    and persisted as JSON so budgets survive gateway restarts. Writes are
+    debounced to one per SAVE_INTERVAL_S and run on the I/O pool when an
+    event loop is running; call save() on shutdown to flush the rest.
+    """
+
+    def __init__(self, config: QuotaConfig | None = None, store_path: Path | None = None):
+        self.config = config or QuotaConfig()
+        self.store_path = store_path
+        self._usage: dict[str, dict[int, list[int]]] | None = None
+        self._dirty = False
+        self._saved_at = 0.0
+        self._write_lock = threading.Lock()
+        self._write_seq = 0
+        self._written_seq = 0
+        self._writes: set[asyncio.Task[None]] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    @property
+    def _bucket_s(self) -> int:
+        return max(1, self.config.window_seconds // _BUCKETS_PER_WINDOW)
+
+    @staticmethod
+    def _keys(channel: str, sender_id: str) -> tuple[str, str]:
+        return f"sender:{channel}:{sender_id}", f"channel:{channel}"
+
+    def _load(self) -> dict[str, dict[int, list[int]]]:
+        """Load usage buckets from disk."""
+        if self._usage is not None:
+            return self._usage
+        self._usage = {}
+        if self.store_path and self.store_path.exists():
+            try:
+                data = json.loads(self.store_path.read_text(encoding="utf-8"))
+                for key, buckets in data.get("usage", {}).items():
+                    self._usage[key] = {int(ts): [int(v[0]), int(v[1])] for ts, v in buckets.items()}
+            except Exception as e:
+                logger.warning(f"Failed to load quota store: {e}")
+                self._usage = {}
+        return self._usage
+
+    def save(self) -> None:
+        """Persist usage buckets to disk now."""
+        if snapshot := self._take_snapshot():
+            self._write(*snapshot)
+
+    def _save_soon(self) -> None:
+        """Persist usage if the last write is old enough, off the event loop when there is one."""
+        if time.monotonic() - self._saved_at < SAVE_INTERVAL_S:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        if snapshot := self._take_snapshot():
+            task = asyncio.ensure_future(run_io(self._write, *snapshot))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    def _take_snapshot(self) -> tuple[int, str] | None:
+        if not self.store_path or not self._dirty or self._usage is None:
+            return None
+        data = {"usage": {k: {str(ts): v for ts, v in b.items()} for k, b in self._usage.items() if b}}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._write_seq += 1
+        return self._write_seq, json.dumps(data)
+
+    def _write(self, seq: int, data: str) -> None:
+        assert self.store_path is not None
+        with self._write_lock:
+            if seq < self._written_seq:
+                return  # A newer snapshot is already on disk
+            try:
+                self.store_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.store_path.with_suffix(".tmp")
+                tmp.write_text(data, encoding="utf-8")
+                os.replace(tmp, self.store_path)
+                self._written_seq = seq
+            except OSError as e:
+                logger.warning(f"Failed to save quota store: {e}")
+
+    def _prune(self, key: str, now: float) -> dict[int, list[int]]:
+        usage = self._load()
+        buckets = usage.setdefault(key, {})
+        cutoff = now - self.config.window_seconds
+        for ts in [ts for ts in buckets if ts + self._bucket_s <= cutoff]:
+            del buckets[ts]
+            self._dirty = True
+        return buckets
+
+    def _totals(self, key: str, now: float) -> tuple[int, int]:
+        buckets = self._prune(key, now)
+        tokens = sum(v[0] for v in buckets.values())
+        requests = sum(v[1] for v in buckets.values())
+        return tokens, requests
+
+    def _add(self, key: str, now: float, tokens: int, requests: int) -> None:
+        buckets = self._prune(key, now)
+        start = int(now // self._bucket_s) * self._bucket_s
+        entry = buckets.setdefault(start, [0, 0])
+        entry[0] += tokens
+        entry[1] += requests
+        self._dirty = True
+
+    def _retry_after(self, key: str, now: float) -> int:
+        """Seconds until the oldest bucket for a key leaves the window."""
+        buckets = self._prune(key, now)
+        if not buckets:
+            return 0
+        oldest = min(buckets)
+        return max(1, int(oldest + self._bucket_s + self.config.window_seconds - now))
+
+    def check(self, channel: str, sender_id: str) -> str | None:
+        """
+        Check whether a sender may use more of the budget.
+
+        Returns:
+            A polite deferral message if a budget is exhausted, otherwise None.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        sender_key, channel_key = self._keys(channel, sender_id)
+        limits = (
+            (sender_key, self.config.sender_tokens, self.config.sender_requests),
+            (channel_key, self.config.channel_tokens, self.config.channel_requests),
+        )
+        for key, max_tokens, max_requests in limits:
+            tokens, requests = self._totals(key, now)
+            if (max_tokens and tokens >= max_tokens) or (max_requests and requests >= max_requests):
+                minutes = max(1, math.ceil(self._retry_after(key, now) / 60))
+                logger.info(f"Quota exceeded for {key} ({tokens} tokens, {requests} requests)")
+                return self.config.deferral_message.format(minutes=minutes)
+        return None
+
+    def record_request(self, channel: str, sender_id: str) -> None:
+        """Count one admitted turn against the sender and channel budgets."""
+        if not self.enabled:
+            return
+        now = time.time()
+        for key in self._keys(channel, sender_id):
+            self._add(key, now, 0, 1)
+        self._save_soon()
+
+    def record_usage(self, channel: str, sender_id: str, usage: dict[str, int] | None) -> None:
+        """Count LLM token usage (from LLMResponse.usage) against the budgets."""
+        if not self.enabled or not usage:
+            return
+        tokens = int(usage.get("total_tokens") or 0)
+        if not tokens:
+            tokens = int(usage.get("prompt_tokens") or 0) + int(usage.get("completion_tokens") or 0)
+        if not tokens:
+            return
+        now = time.time()
+        for key in self._keys(channel, sender_id):
+            self._add(key, now, tokens, 0)
+        self._save_soon()
+
+    def status(self) -> dict[str, Any]:
+        """Return current totals for every tracked key."""
+        now = time.time()
+        result: dict[str, Any] = {}
+        for key in list(self._load()):
+            tokens, requests = self._totals(key, now)
+            if tokens or requests:
+                result[key] = {"tokens": tokens, "requests": requests}
+        return result
@@ -0,0 +1,95 @@
+"""Per-turn out-of-band storage for large tool results."""
+
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.config.schema import ToolResultsConfig
+from nanobot.utils.io_executor import run_io
+
+READ_RESULT_TOOL = "read_result"
+
+_HANDLE_RE = re.compile(r"^([0-9a-f]{8})-(\d+)$")
+
+
+class ResultStore:
+    """
+    Spills large tool results to disk and leaves a compact excerpt in the prompt.
+
+    One store is created per turn. Each stored result gets a handle such as
+    "3fa85f64-2" that the read_result tool resolves to a range of the full text,
+    so a big fetch early in a turn is not re-sent on every later iteration.
+    """
+
+    def __init__(self, config: ToolResultsConfig | None = None, root: Path | None = None):
+        self.config = config or ToolResultsConfig()
+        self.root = root
+        self.turn_id = uuid.uuid4().hex[:8]
+        self._count = 0
+
+    @property
+    def turn_dir(self) -> Path | None:
+        return self.root / self.turn_id if self.root else None
+
+    async def spill(self, name: str, result: str) -> str:
+        """
+        Store a large tool result and return the excerpt to put in the prompt.
+
+        Results under the threshold, and results of read_result itself, are
+        returned unchanged.
+        """
+        cfg = self.config
+        if not cfg.enabled or self.turn_dir is None or name == READ_RESULT_TOOL:
+            return result
+        if len(result) <= max(cfg.spill_chars, cfg.head_chars + cfg.tail_chars):
+            return result
+
+        self._count += 1
+        handle = f"{self.turn_id}-{self._count}"
+        try:
+            await run_io(self._store, self._count, result)
+        except OSError as e:
+            logger.warning(f"Failed to store large {name} result: {e}")
+            return result
+
+        head = result[:cfg.head_chars]
+        tail = result[-cfg.tail_chars:] if cfg.tail_chars else ""
+        omitted = len(result) - len(head) - len(tail)
+        lines = result.count("\n") + 1
+        return (
+            f"{head}\n\n... [{omitted} characters omitted] ...\n\n{tail}\n\n"
+            f"[Full {name} result stored as '{handle}' ({len(result)} characters, {lines} lines). "
+            f"Call {READ_RESULT_TOOL} with this handle and an offset/limit to read other parts.]"
+        )
+
+    @staticmethod
+    def resolve(root: Path, handle: str) -> Path | None:
+        """Map a handle to its stored file, or None if it is malformed or unknown."""
+        match = _HANDLE_RE.match(handle.strip())
+        if not match:
+            return None
+        path = root / match.group(1) / f"{match.group(2)}.txt"
+        return path if path.is_file() else None
+
+    def _store(self, index: int, result: str) -> None:
+        assert self.turn_dir is not None
+        if not self.turn_dir.exists():
+            self._prune()
+            self.turn_dir.mkdir(parents=True, exist_ok=True)
+        (self.turn_dir / f"{index}.txt").write_text(result, encoding="utf-8")
+
+    def _prune(self) -> None:
+        """Remove stored results of turns older than the retention period."""
+        if not self.root or not self.root.exists():
+            return
+        cutoff = time.time() - self.config.retention_hours * 3600
+        for entry in self.root.iterdir():
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry, ignore_errors=True)
+            except OSError:
+                continue
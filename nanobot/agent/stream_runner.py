@@ -1,23 +1,38 @@
 """Streaming helpers for the agent loop."""
 
+import asyncio
 import json
 from collections.abc import AsyncIterator
 from typing import Any
 
+from nanobot.agent.deadline import TurnDeadline, best_effort_answer
+from nanobot.agent.loop_guard import LOOP_STOP_NOTE, ToolLoopGuard
+from nanobot.agent.result_store import ResultStore
+from nanobot.agent.tools.exposure import ToolSelection
+from nanobot.agent.tools.jobs import JOB_TOOL_NAMES
+from nanobot.agent.tools.registry import ToolResultCache
 from nanobot.providers.base import LLMResponse
+from nanobot.utils.io_executor import run_io
 
 
-def _set_tool_contexts(agent: Any, channel: str, chat_id: str) -> None:
+def _set_tool_contexts(agent: Any, channel: str, chat_id: str, sender_id: str) -> None:
     """Set channel/chat context on context-aware tools."""
     message_tool = agent.tools.get("message")
     if message_tool and hasattr(message_tool, "set_context"):
         message_tool.set_context(channel, chat_id)
     spawn_tool = agent.tools.get("spawn")
     if spawn_tool and hasattr(spawn_tool, "set_context"):
-        spawn_tool.set_context(channel, chat_id)
+        spawn_tool.set_context(channel, chat_id, sender_id)
     cron_tool = agent.tools.get("cron")
     if cron_tool and hasattr(cron_tool, "set_context"):
         cron_tool.set_context(channel, chat_id)
+    exec_tool = agent.tools.get("exec")
+    if exec_tool and hasattr(exec_tool, "set_context"):
+        exec_tool.set_context(channel, chat_id)
+    for name in JOB_TOOL_NAMES:
+        job_tool = agent.tools.get(name)
+        if job_tool and hasattr(job_tool, "set_context"):
+            job_tool.set_context(channel, chat_id, sender_id)
 
 
 def _build_tool_call_dicts(response: LLMResponse) -> list[dict[str, Any]]:
@@ -38,16 +53,24 @@ def _preview(value: Any, max_len: int = 500) -> str:
     return text if len(text) <= max_len else f"{text[: max_len - 3]}..."
 
 
-async def _collect_streamed_response(agent: Any, messages: list[dict[str, Any]]) -> tuple[LLMResponse, list[str]]:
+async def _collect_streamed_response(
+    agent: Any,
+    messages: list[dict[str, Any]],
+    timeout: float | None = None,
+    tools: list[dict[str, Any]] | None = None,
+) -> tuple[LLMResponse, list[str]]:
     """Collect streamed deltas and return a normalized response."""
+    if tools is None:
+        tools = agent.tools.get_definitions()
     deltas: list[str] = []
     response: LLMResponse | None = None
     stream_error = ""
 
     async for event in agent.provider.chat_stream(
         messages=messages,
-        tools=agent.tools.get_definitions(),
+        tools=tools,
         model=agent.model,
+        timeout=timeout,
     ):
         event_type = event.get("type")
         if event_type == "delta":
@@ -67,8 +90,9 @@ async def _collect_streamed_response(agent: Any, messages: list[dict[str, Any]])
 
     fallback = await agent.provider.chat(
         messages=messages,
-        tools=agent.tools.get_definitions(),
+        tools=tools,
         model=agent.model,
+        timeout=timeout,
     )
     if stream_error:
         fallback.content = fallback.content or f"Error calling LLM: {stream_error}"
@@ -82,11 +106,27 @@ async def stream_direct_response(
     channel: str,
     chat_id: str,
     run_id: str,
+    sender_id: str = "user",
 ) -> AsyncIterator[dict[str, Any]]:
     """Stream direct agent responses with tool execution events."""
-    session = agent.sessions.get_or_create(session_key)
-    _set_tool_contexts(agent, channel, chat_id)
-    messages = agent.context.build_messages(
+    deferral = agent.quota.check(channel, sender_id)
+    if deferral:
+        yield {"type": "chat.delta", "run_id": run_id, "text_delta": deferral}
+        yield {
+            "type": "chat.final",
+            "run_id": run_id,
+            "full_text": deferral,
+            "usage": {},
+            "session_key": session_key,
+        }
+        agent.clear_stream_run(run_id)
+        return
+    agent.quota.record_request(channel, sender_id)
+
+    session = await run_io(agent.sessions.get_or_create, session_key)
+    _set_tool_contexts(agent, channel, chat_id, sender_id)
+    messages = await run_io(
+        agent.context.build_messages,
         history=session.get_history(),
         current_message=content,
         channel=channel,
@@ -95,13 +135,40 @@ async def stream_direct_response(
 
     final_content = ""
     final_usage: dict[str, int] = {}
-    for _ in range(agent.max_iterations):
+    deadline = TurnDeadline.for_source(agent.deadlines, "interactive", channel)
+    guard = ToolLoopGuard(agent.loop_guard)
+    cache = ToolResultCache()
+    store = ResultStore(agent.results, agent.results_dir)
+    selection = agent.select_tools(channel, content)
+    for iteration in range(agent.max_iterations):
+        definitions = agent.tools.get_definitions(selection.exposed)
         if agent.is_stream_run_cancelled(run_id):
             yield {"type": "agent.error", "run_id": run_id, "message": "Run cancelled"}
             agent.clear_stream_run(run_id)
             return
+        if iteration > 0:
+            deferral = agent.quota.check(channel, sender_id)
+            if deferral:
+                final_content = deferral
+                break
+
+        if deadline.expired:
+            final_content = await best_effort_answer(
+                agent.provider, agent.model, messages, deadline, definitions
+            )
+            break
+
+        timeout = deadline.timeout()
+        try:
+            async with asyncio.timeout(timeout):
+                response, deltas = await _collect_streamed_response(agent, messages, timeout, definitions)
+        except TimeoutError:
+            final_content = await best_effort_answer(
+                agent.provider, agent.model, messages, deadline, definitions
+            )
+            break
 
-        response, deltas = await _collect_streamed_response(agent, messages)
+        agent.quota.record_usage(channel, sender_id, response.usage)
         for delta in deltas:
             yield {"type": "chat.delta", "run_id": run_id, "text_delta": delta}
         final_usage = response.usage or final_usage
@@ -126,7 +193,15 @@ async def stream_direct_response(
                     "args": tool_call.arguments,
                 }
                 try:
-                    result = await agent.tools.execute(tool_call.name, tool_call.arguments)
+                    if selection.allows(tool_call.name):
+                        selection.note_call(tool_call.name)
+                        result = await guard.execute(
+                            agent.tools, tool_call.name, tool_call.arguments,
+                            timeout=deadline.timeout(), cache=cache,
+                        )
+                    else:
+                        result = ToolSelection.refusal(tool_call.name, channel)
+                    result = await store.spill(tool_call.name, result)
                     ok = True
                 except Exception as exc:  # pragma: no cover - defensive
                     result = f"Tool execution failed: {exc}"
@@ -139,6 +214,12 @@ async def stream_direct_response(
                     "ok": ok,
                 }
                 messages = agent.context.add_tool_result(messages, tool_call.id, tool_call.name, str(result))
+            if guard.should_stop:
+                final_content = await best_effort_answer(
+                    agent.provider, agent.model, messages, deadline,
+                    definitions, note=LOOP_STOP_NOTE,
+                )
+                break
             continue
 
         final_content = response.content or "".join(deltas)
@@ -149,7 +230,7 @@ async def stream_direct_response(
 
     session.add_message("user", content)
     session.add_message("assistant", final_content)
-    agent.sessions.save(session)
+    await run_io(agent.sessions.save, session)
     updated_at = session.updated_at.isoformat()
 
     yield {
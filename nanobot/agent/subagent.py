@@ -1,20 +1,50 @@
 """Subagent manager for background task execution."""
 
 import asyncio
+import heapq
 import json
+import time
 import uuid
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
+from nanobot.agent.deadline import TurnDeadline, best_effort_answer
+from nanobot.agent.loop_guard import LOOP_STOP_NOTE, ToolLoopGuard
+from nanobot.agent.quota import QuotaManager
+from nanobot.agent.result_store import ResultStore
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
-from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.metrics import ToolMetrics
+from nanobot.agent.tools.registry import ToolLimiter, ToolRegistry, ToolResultCache
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.limits import ResourceLimits
+from nanobot.agent.tools.python import PythonTool
+from nanobot.agent.tools.python_pool import PythonWorkerPool
+from nanobot.agent.tools.search_cache import SearchCache
+from nanobot.agent.tools.web import WebSearchTool, WebFetchTool, WebFetchManyTool
+from nanobot.agent.tools.web_cache import WebCache
+from nanobot.agent.tools.result import ReadResultTool
+from nanobot.agent.tools.search import SearchTool, WorkspaceIndex, default_index_path
+
+# Priorities accepted by spawn, most urgent first
+SUBAGENT_PRIORITIES = ("high", "normal", "low")
+
+
+@dataclass(order=True)
+class _PendingSubagent:
+    """A spawned subagent waiting for a free slot; ordered by priority, then arrival."""
+    rank: int
+    seq: int
+    task_id: str = field(compare=False)
+    task: str = field(compare=False)
+    label: str = field(compare=False)
+    origin: dict[str, str] = field(compare=False)
+    queued_at: float = field(compare=False, default_factory=time.monotonic)
 
 
 class SubagentManager:
@@ -24,6 +54,10 @@ class SubagentManager:
     Subagents are lightweight agent instances that run in the background
     to handle specific tasks. They share the same LLM provider but have
     isolated context and a focused system prompt.
+    
+    At most `max_concurrent` subagents run at once (0 = unlimited). Further
+    spawns wait in a queue ordered by priority, first come first served
+    within a priority, and start as running ones finish.
     """
     
     def __init__(
@@ -35,8 +69,31 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        quota: "QuotaManager | None" = None,
+        deadlines_config: "TurnDeadlinesConfig | None" = None,
+        loop_guard_config: "LoopGuardConfig | None" = None,
+        results_config: "ToolResultsConfig | None" = None,
+        results_dir: Path | None = None,
+        python_pool: "PythonWorkerPool | None" = None,
+        python_timeout: int = 60,
+        web_fetch_config: "WebFetchConfig | None" = None,
+        web_cache: "WebCache | None" = None,
+        web_search_config: "WebSearchConfig | None" = None,
+        search_cache: "SearchCache | None" = None,
+        search_index: WorkspaceIndex | None = None,
+        tool_limiter: ToolLimiter | None = None,
+        tool_metrics: ToolMetrics | None = None,
+        subagents_config: "SubagentsConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import (
+            ExecToolConfig,
+            LoopGuardConfig,
+            SubagentsConfig,
+            ToolResultsConfig,
+            TurnDeadlinesConfig,
+            WebFetchConfig,
+            WebSearchConfig,
+        )
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -44,7 +101,27 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.quota = quota
+        self.deadlines = deadlines_config or TurnDeadlinesConfig()
+        self.loop_guard = loop_guard_config or LoopGuardConfig()
+        self.results = results_config or ToolResultsConfig()
+        self.results_dir = results_dir
+        self.python_pool = python_pool
+        self.python_timeout = python_timeout
+        self.web_fetch_config = web_fetch_config or WebFetchConfig()
+        self.web_cache = web_cache
+        self.web_search_config = web_search_config or WebSearchConfig()
+        self.search_cache = search_cache
+        self.search_index = search_index or WorkspaceIndex(workspace.resolve(), default_index_path(workspace))
+        self.tool_limiter = tool_limiter
+        self.tool_metrics = tool_metrics
+        self.subagents_config = subagents_config or SubagentsConfig()
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self._pending: list[_PendingSubagent] = []
+        self._seq = 0
+        self._started = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
     
     async def spawn(
         self,
@@ -52,6 +129,8 @@ class SubagentManager:
         label: str | None = None,
         origin_channel: str = "cli",
         origin_chat_id: str = "direct",
+        origin_sender_id: str = "user",
+        priority: str = "normal",
     ) -> str:
         """
         Spawn a subagent to execute a task in the background.
@@ -61,29 +140,66 @@ class SubagentManager:
             label: Optional human-readable label for the task.
             origin_channel: The channel to announce results to.
             origin_chat_id: The chat ID to announce results to.
+            origin_sender_id: The sender whose quota the subagent's usage counts against.
+            priority: "high", "normal" or "low"; orders the queue when all slots are busy.
         
         Returns:
-            Status message indicating the subagent was started.
+            Status message saying the subagent was started or queued (with its position).
         """
+        if priority not in SUBAGENT_PRIORITIES:
+            return f"Error: priority must be one of {', '.join(SUBAGENT_PRIORITIES)}"
         task_id = str(uuid.uuid4())[:8]
         display_label = label or task[:30] + ("..." if len(task) > 30 else "")
         
         origin = {
             "channel": origin_channel,
             "chat_id": origin_chat_id,
+            "sender_id": origin_sender_id,
         }
         
-        # Create background task
-        bg_task = asyncio.create_task(
-            self._run_subagent(task_id, task, display_label, origin)
-        )
-        self._running_tasks[task_id] = bg_task
+        limit = self.subagents_config.max_concurrent
+        if not limit or (len(self._running_tasks) < limit and not self._pending):
+            self._start(task_id, task, display_label, origin)
+            logger.info(f"Spawned subagent [{task_id}]: {display_label}")
+            return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
         
-        # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        if len(self._pending) >= self.subagents_config.max_queued:
+            logger.warning(f"Subagent queue full, rejected: {display_label}")
+            return (
+                f"Error: {len(self._running_tasks)} subagents are running and {len(self._pending)} "
+                "are queued, which is the limit. Wait for some to finish or do the task yourself."
+            )
         
-        logger.info(f"Spawned subagent [{task_id}]: {display_label}")
-        return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
+        self._seq += 1
+        entry = _PendingSubagent(
+            SUBAGENT_PRIORITIES.index(priority), self._seq, task_id, task, display_label, origin
+        )
+        heapq.heappush(self._pending, entry)
+        position = sum(1 for other in self._pending if other <= entry)
+        logger.info(f"Queued subagent [{task_id}] at position {position} ({priority}): {display_label}")
+        return (
+            f"Subagent [{display_label}] queued at position {position} (id: {task_id}, priority: {priority}); "
+            f"{len(self._running_tasks)} subagents are already running. "
+            "It will start when a slot frees up, and I'll notify you when it completes."
+        )
+    
+    def _start(self, task_id: str, task: str, label: str, origin: dict[str, str]) -> None:
+        """Run a subagent as a background task and start the next queued one when it ends."""
+        bg_task = asyncio.create_task(self._run_subagent(task_id, task, label, origin))
+        self._running_tasks[task_id] = bg_task
+        bg_task.add_done_callback(lambda _: self._finish(task_id))
+    
+    def _finish(self, task_id: str) -> None:
+        self._running_tasks.pop(task_id, None)
+        limit = self.subagents_config.max_concurrent
+        while self._pending and (not limit or len(self._running_tasks) < limit):
+            entry = heapq.heappop(self._pending)
+            waited = time.monotonic() - entry.queued_at
+            self._started += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            logger.info(f"Starting queued subagent [{entry.task_id}] after {waited:.1f}s: {entry.label}")
+            self._start(entry.task_id, entry.task, entry.label, entry.origin)
     
     async def _run_subagent(
         self,
@@ -97,18 +213,43 @@ class SubagentManager:
         
         try:
             # Build subagent tools (no message tool, no spawn tool)
-            tools = ToolRegistry()
+            tools = ToolRegistry(self.tool_limiter, self.tool_metrics, scope="subagent")
             allowed_dir = self.workspace if self.restrict_to_workspace else None
             tools.register(ReadFileTool(allowed_dir=allowed_dir))
             tools.register(WriteFileTool(allowed_dir=allowed_dir))
             tools.register(ListDirTool(allowed_dir=allowed_dir))
+            tools.register(SearchTool(self.workspace, allowed_dir=allowed_dir, index=self.search_index))
             tools.register(ExecTool(
                 working_dir=str(self.workspace),
                 timeout=self.exec_config.timeout,
                 restrict_to_workspace=self.restrict_to_workspace,
+                max_output_chars=self.exec_config.max_output_chars,
+                kill_after_bytes=self.exec_config.kill_after_bytes,
+                spill_dir=self.workspace / ".nanobot" / "exec" if self.exec_config.spill_output else None,
+                limits=ResourceLimits(**self.exec_config.limits.model_dump()),
+                kill_grace=self.exec_config.kill_grace_seconds,
+            ))
+            if self.python_pool is not None:
+                tools.register(PythonTool(self.python_pool, timeout=self.python_timeout))
+            tools.register(WebSearchTool(
+                api_key=self.brave_api_key,
+                max_results=self.web_search_config.max_results,
+                cache=self.search_cache,
             ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
+            fetch = self.web_fetch_config
+            fetch_tool = WebFetchTool(max_chars=fetch.max_chars, cache=self.web_cache, max_bytes=fetch.max_bytes)
+            tools.register(fetch_tool)
+            if fetch.batch_max_urls > 0:
+                tools.register(WebFetchManyTool(
+                    fetch_tool,
+                    max_urls=fetch.batch_max_urls,
+                    concurrency=fetch.batch_concurrency,
+                    per_host=fetch.batch_per_host,
+                    max_total_chars=fetch.batch_max_total_chars,
+                    registry=tools,
+                ))
+            if self.results_dir:
+                tools.register(ReadResultTool(self.results_dir, max_chars=self.results.spill_chars))
             
             # Build messages with subagent-specific prompt
             system_prompt = self._build_subagent_prompt(task)
@@ -117,19 +258,48 @@ class SubagentManager:
                 {"role": "user", "content": task},
             ]
             
-            # Run agent loop (limited iterations)
+            # Run agent loop (limited iterations and wall-clock budget)
             max_iterations = 15
             iteration = 0
             final_result: str | None = None
+            deadline = TurnDeadline.for_source(self.deadlines, "subagent")
+            guard = ToolLoopGuard(self.loop_guard)
+            cache = ToolResultCache()
+            store = ResultStore(self.results, self.results_dir)
             
             while iteration < max_iterations:
                 iteration += 1
                 
-                response = await self.provider.chat(
-                    messages=messages,
-                    tools=tools.get_definitions(),
-                    model=self.model,
-                )
+                # Subagents spend the spawning sender's budget, so stop when it runs out
+                if self.quota and (deferral := self.quota.check(origin["channel"], origin["sender_id"])):
+                    logger.info(f"Subagent [{task_id}] stopped: quota exhausted")
+                    await self._announce_result(task_id, label, task, deferral, origin, "error")
+                    return
+                
+                if deadline.expired:
+                    logger.info(f"Subagent [{task_id}] reached its deadline")
+                    final_result = await best_effort_answer(
+                        self.provider, self.model, messages, deadline, tools.get_definitions()
+                    )
+                    break
+                
+                timeout = deadline.timeout()
+                try:
+                    async with asyncio.timeout(timeout):
+                        response = await self.provider.chat(
+                            messages=messages,
+                            tools=tools.get_definitions(),
+                            model=self.model,
+                            timeout=timeout,
+                        )
+                except TimeoutError:
+                    logger.info(f"Subagent [{task_id}] reached its deadline during LLM call")
+                    final_result = await best_effort_answer(
+                        self.provider, self.model, messages, deadline, tools.get_definitions()
+                    )
+                    break
+                if self.quota:
+                    self.quota.record_usage(origin["channel"], origin["sender_id"], response.usage)
                 
                 if response.has_tool_calls:
                     # Add assistant message with tool calls
@@ -156,13 +326,25 @@ class SubagentManager:
                     for tool_call in response.tool_calls:
                         args_str = json.dumps(tool_call.arguments)
                         logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
+                        result = await guard.execute(
+                            tools, tool_call.name, tool_call.arguments,
+                            timeout=deadline.timeout(), cache=cache,
+                        )
+                        result = await store.spill(tool_call.name, result)
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
                             "name": tool_call.name,
                             "content": result,
                         })
+                    
+                    if guard.should_stop:
+                        logger.info(f"Subagent [{task_id}] stopped by loop guard")
+                        final_result = await best_effort_answer(
+                            self.provider, self.model, messages, deadline,
+                            tools.get_definitions(), note=LOOP_STOP_NOTE,
+                        )
+                        break
                 else:
                     final_result = response.content
                     break
@@ -222,6 +404,7 @@ Summarize this naturally for the user. Keep it brief (1-2 sentences). Do not men
             sender_id="subagent",
             chat_id=f"{origin['channel']}:{origin['chat_id']}",
             content=announce_content,
+            metadata={"origin_sender_id": origin["sender_id"]},
         )
         
         await self.bus.publish_inbound(msg)
@@ -261,3 +444,20 @@ When you have completed the task, provide a clear summary of your findings or ac
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
         return len(self._running_tasks)
+    
+    def queue_stats(self) -> dict[str, Any]:
+        """Running and queued subagents, and how long queued ones waited for a slot."""
+        now = time.monotonic()
+        by_priority = {name: 0 for name in SUBAGENT_PRIORITIES}
+        for entry in self._pending:
+            by_priority[SUBAGENT_PRIORITIES[entry.rank]] += 1
+        return {
+            "running": len(self._running_tasks),
+            "maxConcurrent": self.subagents_config.max_concurrent,
+            "queued": len(self._pending),
+            "queuedByPriority": by_priority,
+            "oldestWaitSeconds": round(max((now - e.queued_at for e in self._pending), default=0.0), 1),
+            "startedFromQueue": self._started,
+            "meanWaitSeconds": round(self._total_wait / self._started, 1) if self._started else 0.0,
+            "maxWaitSeconds": round(self._max_wait, 1),
+        }
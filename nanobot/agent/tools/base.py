@@ -1,5 +1,6 @@
 """Base class for agent tools."""
 
+import json
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -21,6 +22,13 @@ class Tool(ABC):
         "object": dict,
     }
     
+    # Identical calls within one turn return the same result and may be memoized
+    idempotent: bool = False
+    # Results depend on workspace files (memoized results are dropped when it changes)
+    reads_workspace: bool = False
+    # Execution may modify workspace files
+    writes_workspace: bool = False
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -90,6 +98,13 @@ class Tool(ABC):
                 errors.extend(self._validate(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]"))
         return errors
     
+    def cache_key(self, params: dict[str, Any]) -> str:
+        """Canonical form of call arguments, used to memoize idempotent calls."""
+        props = (self.parameters or {}).get("properties", {})
+        merged = {k: v["default"] for k, v in props.items() if isinstance(v, dict) and "default" in v}
+        merged.update({k: v for k, v in params.items() if v is not None})
+        return json.dumps(merged, sort_keys=True, ensure_ascii=False, default=str)
+    
     def to_schema(self) -> dict[str, Any]:
         """Convert tool to OpenAI function schema format."""
         return {
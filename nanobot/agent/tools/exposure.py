@@ -0,0 +1,97 @@
+"""Per-turn choice of which tool schemas are sent to the model."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+# Built-in tool groups; config may add groups or redefine these
+DEFAULT_TOOL_GROUPS: dict[str, list[str]] = {
+    "files": ["read_file", "write_file", "edit_file", "list_dir", "search"],
+    "shell": ["exec", "python", "exec_background", "job_status", "job_output", "job_kill"],
+    "web": ["web_search", "web_fetch", "web_fetch_many"],
+    "schedule": ["cron"],
+    "agents": ["spawn"],
+    "messaging": ["message"],
+    "results": ["read_result"],
+}
+
+
+@dataclass
+class ToolSelection:
+    """
+    Tools for one turn.
+
+    `allowed` tools may be called at all (None = every registered tool);
+    `exposed` is the subset whose schemas are sent to the model.
+    """
+    allowed: set[str] | None = None
+    exposed: set[str] | None = None
+    _groups: dict[str, set[str]] = field(default_factory=dict, repr=False)
+
+    def allows(self, name: str) -> bool:
+        return self.allowed is None or name in self.allowed
+
+    def note_call(self, name: str) -> None:
+        """Expose a hidden tool's group for the rest of the turn once the model has called it."""
+        if self.exposed is None or name in self.exposed:
+            return
+        related = {name}
+        for members in self._groups.values():
+            if name in members:
+                related |= members
+        self.exposed |= related if self.allowed is None else related & self.allowed
+
+    @staticmethod
+    def refusal(name: str, channel: str) -> str:
+        return f"Error: Tool '{name}' is not available in channel '{channel}'"
+
+
+class ToolExposurePolicy:
+    """
+    Decides which tools each turn sees.
+
+    - `channels` maps a channel to the groups/tools allowed there; tools
+      outside the list are neither shown nor executed. Unlisted channels
+      allow everything.
+    - `optional` maps a group/tool to keywords; it is only shown when the
+      user's message contains one of them (case-insensitive substring).
+      If the model calls it anyway, it is shown for the rest of the turn.
+
+    With neither configured every registered tool is exposed on every turn.
+    """
+
+    def __init__(
+        self,
+        groups: dict[str, list[str]] | None = None,
+        channels: dict[str, list[str]] | None = None,
+        optional: dict[str, list[str]] | None = None,
+    ):
+        self.groups = {name: set(members) for name, members in {**DEFAULT_TOOL_GROUPS, **(groups or {})}.items()}
+        self.channels = channels or {}
+        self.optional = {name: [k.lower() for k in keywords] for name, keywords in (optional or {}).items()}
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ToolExposurePolicy":
+        """Build from a ToolExposureConfig."""
+        return cls(groups=config.groups, channels=config.channels, optional=config.optional)
+
+    def expand(self, names: Iterable[str]) -> set[str]:
+        """Replace group names with their member tools."""
+        tools: set[str] = set()
+        for name in names:
+            tools |= self.groups.get(name, {name})
+        return tools
+
+    def select(self, tool_names: Iterable[str], channel: str, text: str) -> ToolSelection:
+        """Tools for a turn on `channel` that starts with the user message `text`."""
+        if not self.channels and not self.optional:
+            return ToolSelection()
+        allowed = set(tool_names)
+        if channel in self.channels:
+            allowed &= self.expand(self.channels[channel])
+        lowered = text.lower()
+        exposed = set(allowed)
+        for name, keywords in self.optional.items():
+            if not any(keyword in lowered for keyword in keywords):
+                exposed -= self.expand([name])
+        return ToolSelection(allowed=allowed, exposed=exposed, _groups=self.groups)
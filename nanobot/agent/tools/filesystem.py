@@ -1,9 +1,30 @@
 """File system tools: read, write, edit."""
 
+import contextlib
+import difflib
+import fnmatch
+import itertools
+import mmap
+import os
+import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.io_executor import run_io
+
+# Bytes inspected for NUL bytes when deciding whether a file is binary
+_SNIFF_BYTES = 8192
+# Bytes scanned per step when locating lines in a memory-mapped file
+_SCAN_CHUNK = 1 << 20
+# Head shown when a file is too large to read at once
+_SUMMARY_LINES = 40
+_SUMMARY_BYTES = 4096
+# Diff lines returned after an edit
+_DIFF_MAX_LINES = 40
+# Directories shown but never descended into or searched
+SKIP_DIRS = {".nanobot", ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".mypy_cache", ".pytest_cache"}
 
 
 def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
@@ -14,11 +35,109 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
     return resolved
 
 
+def _swap_umask() -> int:
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+# os.umask() can only read the mask by changing it, which would briefly loosen
+# the mode of files other threads create; do that once at import, before any
+# I/O threads exist, and prefer /proc afterwards
+_IMPORT_UMASK = _swap_umask()
+
+
+def _current_umask() -> int:
+    """The process umask, read without changing it."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    return _IMPORT_UMASK
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    """Write via a temp file in the same directory and rename, so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        else:
+            # mkstemp creates 0600; give new files the mode open() would have
+            os.chmod(tmp, 0o666 & ~_current_umask())
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def _diff_summary(old: str, new: str, path: str, max_lines: int = _DIFF_MAX_LINES) -> str:
+    """Compact unified diff of an edit, capped at max_lines."""
+    lines = list(difflib.unified_diff(
+        old.splitlines(), new.splitlines(), fromfile=path, tofile=path, n=1, lineterm=""
+    ))[2:]
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... ({len(lines) - max_lines} more diff lines)"]
+    return "\n".join(lines)
+
+
+def _is_binary(sample: bytes) -> bool:
+    """Heuristic: text files do not contain NUL bytes."""
+    return b"\x00" in sample
+
+
+def _format_size(size: int) -> str:
+    """Human-readable byte count."""
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{size} B" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def _skip_lines(mm: mmap.mmap, start: int, count: int) -> int:
+    """Return the byte offset just past `count` newlines from `start` (or the end of the map)."""
+    pos, size = start, len(mm)
+    while count > 0 and pos < size:
+        chunk = mm[pos:pos + _SCAN_CHUNK]
+        found = chunk.count(b"\n")
+        if found < count:
+            count -= found
+            pos += len(chunk)
+            continue
+        idx = -1
+        for _ in range(count):
+            idx = chunk.index(b"\n", idx + 1)
+        return pos + idx + 1
+    return min(pos, size)
+
+
+def _count_lines(mm: mmap.mmap) -> int:
+    """Count lines without decoding the file."""
+    size, count = len(mm), 0
+    for pos in range(0, size, _SCAN_CHUNK):
+        count += mm[pos:pos + _SCAN_CHUNK].count(b"\n")
+    return count + (1 if size and mm[size - 1:size] != b"\n" else 0)
+
+
 class ReadFileTool(Tool):
-    """Tool to read file contents."""
+    """Tool to read file contents, whole or by line/byte range."""
     
-    def __init__(self, allowed_dir: Path | None = None):
+    idempotent = True
+    reads_workspace = True
+    
+    def __init__(self, allowed_dir: Path | None = None, max_bytes: int = 256 * 1024):
         self._allowed_dir = allowed_dir
+        self.max_bytes = max_bytes
 
     @property
     def name(self) -> str:
@@ -26,7 +145,10 @@ class ReadFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Read the contents of a file at the given path."
+        return (
+            "Read the contents of a file at the given path. Large files must be read in ranges "
+            "using offset/limit (lines) or byte_offset/byte_limit (bytes)."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -36,12 +158,43 @@ class ReadFileTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The file path to read"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "1-based line number to start reading from",
+                    "minimum": 1
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of lines to read",
+                    "minimum": 1
+                },
+                "byte_offset": {
+                    "type": "integer",
+                    "description": "Byte position to start reading from",
+                    "minimum": 0
+                },
+                "byte_limit": {
+                    "type": "integer",
+                    "description": "Maximum number of bytes to read",
+                    "minimum": 1
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(self, **kwargs: Any) -> str:
+        return await run_io(self._read, **kwargs)
+    
+    def _read(
+        self,
+        path: str,
+        offset: int | None = None,
+        limit: int | None = None,
+        byte_offset: int | None = None,
+        byte_limit: int | None = None,
+        **kwargs: Any,
+    ) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
             if not file_path.exists():
@@ -49,17 +202,77 @@ class ReadFileTool(Tool):
             if not file_path.is_file():
                 return f"Error: Not a file: {path}"
             
-            content = file_path.read_text(encoding="utf-8")
-            return content
+            by_line = offset is not None or limit is not None
+            by_byte = byte_offset is not None or byte_limit is not None
+            if by_line and by_byte:
+                return "Error: Use either offset/limit (lines) or byte_offset/byte_limit (bytes), not both"
+            
+            size = file_path.stat().st_size
+            if size == 0:
+                return ""
+            with open(file_path, "rb") as f:
+                if _is_binary(f.read(_SNIFF_BYTES)):
+                    return f"Error: {path} appears to be a binary file ({size:,} bytes)"
+                if not by_line and not by_byte and size <= self.max_bytes:
+                    return file_path.read_text(encoding="utf-8")
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if by_line:
+                        return self._read_lines(mm, path, offset or 1, limit)
+                    if by_byte:
+                        return self._read_bytes(mm, path, byte_offset or 0, byte_limit)
+                    return self._summarize(mm, path)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error reading file: {str(e)}"
+    
+    def _read_lines(self, mm: mmap.mmap, path: str, offset: int, limit: int | None) -> str:
+        start = _skip_lines(mm, 0, offset - 1)
+        if start >= len(mm):
+            return f"Error: {path} has fewer than {offset} lines"
+        end = _skip_lines(mm, start, limit) if limit else len(mm)
+        truncated = end - start > self.max_bytes
+        if truncated:
+            end = start + self.max_bytes
+        chunk = mm[start:end]
+        text = chunk.decode("utf-8", errors="replace")
+        if end >= len(mm):
+            return text
+        last = offset + chunk.count(b"\n") - (0 if truncated else 1)
+        if truncated:
+            return (
+                f"{text}\n\n[Output capped at {self.max_bytes:,} bytes inside line {last}; "
+                f"continue with byte_offset={end}]"
+            )
+        return f"{text}\n[Lines {offset}-{last} of {path}; continue with offset={last + 1}]"
+    
+    def _read_bytes(self, mm: mmap.mmap, path: str, byte_offset: int, byte_limit: int | None) -> str:
+        size = len(mm)
+        if byte_offset >= size:
+            return f"Error: byte_offset {byte_offset} is past the end of {path} ({size:,} bytes)"
+        end = min(size, byte_offset + min(byte_limit or self.max_bytes, self.max_bytes))
+        text = mm[byte_offset:end].decode("utf-8", errors="replace")
+        if end >= size:
+            return text
+        return f"{text}\n\n[Bytes {byte_offset}-{end} of {size:,}; continue with byte_offset={end}]"
+    
+    def _summarize(self, mm: mmap.mmap, path: str) -> str:
+        size = len(mm)
+        lines = _count_lines(mm)
+        head_end = min(_skip_lines(mm, 0, _SUMMARY_LINES), _SUMMARY_BYTES)
+        head = mm[:head_end].decode("utf-8", errors="replace")
+        return (
+            f"File too large to read at once: {path} ({size:,} bytes, {lines:,} lines; "
+            f"limit {self.max_bytes:,} bytes). Read a range with offset/limit (lines) or "
+            f"byte_offset/byte_limit (bytes). Beginning of the file:\n\n{head}"
+        )
 
 
 class WriteFileTool(Tool):
     """Tool to write content to a file."""
     
+    writes_workspace = True
+    
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
 
@@ -88,11 +301,14 @@ class WriteFileTool(Tool):
             "required": ["path", "content"]
         }
     
-    async def execute(self, path: str, content: str, **kwargs: Any) -> str:
+    async def execute(self, **kwargs: Any) -> str:
+        return await run_io(self._write, **kwargs)
+    
+    def _write(self, path: str, content: str, **kwargs: Any) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding="utf-8")
+            _atomic_write(file_path, content)
             return f"Successfully wrote {len(content)} bytes to {path}"
         except PermissionError as e:
             return f"Error: {e}"
@@ -101,7 +317,9 @@ class WriteFileTool(Tool):
 
 
 class EditFileTool(Tool):
-    """Tool to edit a file by replacing text."""
+    """Tool to edit a file by replacing text, one or several spots per call."""
+    
+    writes_workspace = True
     
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
@@ -112,7 +330,10 @@ class EditFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Edit a file by replacing old_text with new_text. The old_text must exist exactly in the file."
+        return (
+            "Edit a file by replacing old_text with new_text. The old_text must exist exactly once in the file. "
+            "To change several spots in one call, pass an edits array instead; either all edits apply or none."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -130,31 +351,81 @@ class EditFileTool(Tool):
                 "new_text": {
                     "type": "string",
                     "description": "The text to replace with"
+                },
+                "edits": {
+                    "type": "array",
+                    "description": "Several replacements applied together (instead of old_text/new_text)",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "old_text": {"type": "string"},
+                            "new_text": {"type": "string"}
+                        },
+                        "required": ["old_text", "new_text"]
+                    }
                 }
             },
-            "required": ["path", "old_text", "new_text"]
+            "required": ["path"]
         }
     
-    async def execute(self, path: str, old_text: str, new_text: str, **kwargs: Any) -> str:
+    async def execute(self, **kwargs: Any) -> str:
+        return await run_io(self._edit, **kwargs)
+    
+    def _edit(
+        self,
+        path: str,
+        old_text: str | None = None,
+        new_text: str | None = None,
+        edits: list[dict[str, str]] | None = None,
+        **kwargs: Any,
+    ) -> str:
         try:
+            if edits and old_text is not None:
+                return "Error: Pass either old_text/new_text or edits, not both"
+            if not edits:
+                if old_text is None or new_text is None:
+                    return "Error: old_text and new_text are required (or pass edits)"
+                edits = [{"old_text": old_text, "new_text": new_text}]
+            
             file_path = _resolve_path(path, self._allowed_dir)
             if not file_path.exists():
                 return f"Error: File not found: {path}"
             
             content = file_path.read_text(encoding="utf-8")
             
-            if old_text not in content:
-                return f"Error: old_text not found in file. Make sure it matches exactly."
+            # Locate every edit in the original content before changing anything
+            spans: list[tuple[int, int, str]] = []
+            for i, edit in enumerate(edits, 1):
+                label = f"edit {i}: " if len(edits) > 1 else ""
+                old = edit["old_text"]
+                if not old or old not in content:
+                    return f"Error: {label}old_text not found in file. Make sure it matches exactly."
+                count = content.count(old)
+                if count > 1:
+                    return (
+                        f"Warning: {label}old_text appears {count} times. "
+                        "Please provide more context to make it unique."
+                    )
+                start = content.index(old)
+                spans.append((start, start + len(old), edit["new_text"]))
             
-            # Count occurrences
-            count = content.count(old_text)
-            if count > 1:
-                return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
+            spans.sort()
+            for (_, prev_end, _), (start, _, _) in zip(spans, spans[1:]):
+                if start < prev_end:
+                    return "Error: edits overlap. Combine overlapping edits into one."
             
-            new_content = content.replace(old_text, new_text, 1)
-            file_path.write_text(new_content, encoding="utf-8")
+            parts, pos = [], 0
+            for start, end, replacement in spans:
+                parts.append(content[pos:start])
+                parts.append(replacement)
+                pos = end
+            parts.append(content[pos:])
+            new_content = "".join(parts)
+            _atomic_write(file_path, new_content)
             
-            return f"Successfully edited {path}"
+            summary = _diff_summary(content, new_content, path)
+            count = f" ({len(edits)} edits)" if len(edits) > 1 else ""
+            return f"Successfully edited {path}{count}\n{summary}" if summary else f"Successfully edited {path}{count}"
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
@@ -162,7 +433,10 @@ class EditFileTool(Tool):
 
 
 class ListDirTool(Tool):
-    """Tool to list directory contents."""
+    """Tool to list directory contents, optionally as a recursive tree."""
+    
+    idempotent = True
+    reads_workspace = True
     
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
@@ -173,7 +447,10 @@ class ListDirTool(Tool):
     
     @property
     def description(self) -> str:
-        return "List the contents of a directory."
+        return (
+            "List the contents of a directory. Use depth > 1 to get an indented tree of "
+            "subdirectories in one call; directories end with '/'."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -183,12 +460,46 @@ class ListDirTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The directory path to list"
+                },
+                "depth": {
+                    "type": "integer",
+                    "description": "Levels to descend (1 = this directory only)",
+                    "minimum": 1,
+                    "maximum": 10,
+                    "default": 1
+                },
+                "glob": {
+                    "type": "string",
+                    "description": "Only list files whose name matches this glob, e.g. '*.py'"
+                },
+                "max_entries": {
+                    "type": "integer",
+                    "description": "Stop after this many entries",
+                    "minimum": 1,
+                    "maximum": 5000,
+                    "default": 200
+                },
+                "include_sizes": {
+                    "type": "boolean",
+                    "description": "Show file sizes",
+                    "default": False
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(self, **kwargs: Any) -> str:
+        return await run_io(self._list, **kwargs)
+    
+    def _list(
+        self,
+        path: str,
+        depth: int = 1,
+        glob: str | None = None,
+        max_entries: int = 200,
+        include_sizes: bool = False,
+        **kwargs: Any,
+    ) -> str:
         try:
             dir_path = _resolve_path(path, self._allowed_dir)
             if not dir_path.exists():
@@ -196,16 +507,49 @@ class ListDirTool(Tool):
             if not dir_path.is_dir():
                 return f"Error: Not a directory: {path}"
             
-            items = []
-            for item in sorted(dir_path.iterdir()):
-                prefix = "📁 " if item.is_dir() else "📄 "
-                items.append(f"{prefix}{item.name}")
+            entries = self._walk(str(dir_path), 0, depth, glob, include_sizes)
+            items = list(itertools.islice(entries, max_entries + 1))
             
             if not items:
-                return f"Directory {path} is empty"
-            
+                return f"No entries matching {glob} in {path}" if glob else f"Directory {path} is empty"
+            if len(items) > max_entries:
+                items[max_entries:] = [
+                    f"[Listing truncated at {max_entries} entries; narrow it with path, depth or glob]"
+                ]
             return "\n".join(items)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error listing directory: {str(e)}"
+    
+    def _walk(
+        self, dir_path: str, level: int, depth: int, glob: str | None, include_sizes: bool
+    ) -> Iterator[str]:
+        """Yield tree lines lazily so listing stops as soon as the entry limit is reached."""
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        indent = "  " * level
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                header = f"{indent}{entry.name}/"
+                if level + 1 >= depth or entry.name in SKIP_DIRS:
+                    if not glob:
+                        yield header
+                    continue
+                try:
+                    children = self._walk(entry.path, level + 1, depth, glob, include_sizes)
+                    first = next(children, None)
+                except PermissionError:
+                    first, children = f"{indent}  [permission denied]", iter(())
+                if first is None and glob:
+                    continue
+                yield header
+                if first is not None:
+                    yield first
+                    yield from children
+            elif not glob or fnmatch.fnmatch(entry.name, glob):
+                if include_sizes:
+                    size = entry.stat(follow_symlinks=False).st_size
+                    yield f"{indent}{entry.name} ({_format_size(size)})"
+                else:
+                    yield f"{indent}{entry.name}"
@@ -0,0 +1,176 @@
+"""Tools for running shell commands as background jobs."""
+
+import os
+from typing import TYPE_CHECKING, Any
+
+from nanobot.agent.tools.base import Tool
+
+if TYPE_CHECKING:
+    from nanobot.agent.jobs import JobManager
+    from nanobot.agent.tools.shell import ExecTool
+
+# Tools that need set_context() so jobs stay scoped to their conversation
+JOB_TOOL_NAMES = ("exec_background", "job_status", "job_output", "job_kill")
+
+
+class _JobTool(Tool):
+    """Shared conversation context for the job tools; jobs are only visible to their owner."""
+
+    def __init__(self, manager: "JobManager"):
+        self._manager = manager
+        self._owner = "cli:direct"
+        self._sender_id = "user"
+
+    def set_context(self, channel: str, chat_id: str, sender_id: str = "user") -> None:
+        """Set the conversation that owns the jobs, and the sender whose quota their announces use."""
+        self._owner = f"{channel}:{chat_id}"
+        self._sender_id = sender_id
+
+    def _lookup(self, job_id: str) -> "tuple[Any, str | None]":
+        job = self._manager.get(job_id, owner=self._owner)
+        if job is None:
+            return None, f"Error: Unknown job: {job_id}"
+        return job, None
+
+
+class ExecBackgroundTool(_JobTool):
+    """Start a shell command in the background and return a job id immediately."""
+
+    writes_workspace = True
+
+    def __init__(self, manager: "JobManager", exec_tool: "ExecTool"):
+        super().__init__(manager)
+        self._exec = exec_tool
+
+    @property
+    def name(self) -> str:
+        return "exec_background"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Start a long-running shell command (build, test suite, download) in the background "
+            "and return a job id immediately. Check on it with job_status and job_output, stop it "
+            "with job_kill. By default you are notified when it finishes."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "command": {"type": "string", "description": "The shell command to run"},
+                "working_dir": {"type": "string", "description": "Optional working directory for the command"},
+                "notify": {"type": "boolean", "description": "Announce the result when the job finishes (default true)"},
+            },
+            "required": ["command"],
+        }
+
+    async def execute(
+        self, command: str, working_dir: str | None = None, notify: bool = True, **kwargs: Any
+    ) -> str:
+        cwd = working_dir or self._exec.working_dir or os.getcwd()
+        guard_error = self._exec._guard_command(command, cwd)
+        if guard_error:
+            return guard_error
+        try:
+            job = await self._manager.start(
+                command, cwd, owner=self._owner, notify=notify, sender_id=self._sender_id
+            )
+        except Exception as e:
+            return f"Error starting background job: {e}"
+        return f"Started background job {job.id}. Use job_status or job_output with job_id '{job.id}'."
+
+
+class JobStatusTool(_JobTool):
+    """Report the state of background jobs."""
+
+    @property
+    def name(self) -> str:
+        return "job_status"
+
+    @property
+    def description(self) -> str:
+        return "Show the status of a background job, or of all jobs in this conversation if no id is given."
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id returned by exec_background"},
+            },
+        }
+
+    async def execute(self, job_id: str | None = None, **kwargs: Any) -> str:
+        if job_id:
+            job, error = self._lookup(job_id)
+            return error or job.describe()
+        jobs = self._manager.list(owner=self._owner)
+        if not jobs:
+            return "No background jobs."
+        return "\n".join(job.describe() for job in jobs)
+
+
+class JobOutputTool(_JobTool):
+    """Return the captured output of a background job."""
+
+    @property
+    def name(self) -> str:
+        return "job_output"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Show the output of a background job so far (start and end are kept; the middle of "
+            "long output is elided, and the full log can be read with read_file)."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id returned by exec_background"},
+            },
+            "required": ["job_id"],
+        }
+
+    async def execute(self, job_id: str, **kwargs: Any) -> str:
+        job, error = self._lookup(job_id)
+        if error:
+            return error
+        parts = [job.describe(), job.output.text() if job.output.total else "(no output yet)"]
+        if job.log_path:
+            parts.append(f"[{job.output.total:,} bytes so far; log: {job.log_path}]")
+        return "\n".join(parts)
+
+
+class JobKillTool(_JobTool):
+    """Kill a running background job."""
+
+    @property
+    def name(self) -> str:
+        return "job_kill"
+
+    @property
+    def description(self) -> str:
+        return "Kill a running background job and everything it started."
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id returned by exec_background"},
+            },
+            "required": ["job_id"],
+        }
+
+    async def execute(self, job_id: str, **kwargs: Any) -> str:
+        job, error = self._lookup(job_id)
+        if error:
+            return error
+        if not await self._manager.terminate(job):
+            return f"Job {job.id} already finished: {job.describe()}"
+        return f"Killed job {job.id}"
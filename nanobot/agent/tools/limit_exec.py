@@ -0,0 +1,47 @@
+"""
+Exec wrapper that applies resource limits, then runs the real command.
+
+Started as a script by ResourceLimits.wrap_argv, never imported by nanobot
+itself. A preexec_fn is not safe in a process with threads (the I/O pool,
+the HTTP client): the child can deadlock between fork and exec. Instead
+the limits are applied in a fresh, single-threaded interpreter that then
+execs the command in its place, so the command keeps this process's pid,
+session and cgroup.
+
+Usage: limit_exec.py <json spec> <program> [args...]
+where the spec is {"rlimits": [["RLIMIT_CPU", 30], ...], "cgroup": "/sys/fs/cgroup/.../nanobot-x"}.
+"""
+
+import json
+import os
+import resource
+import sys
+
+
+def _apply(spec: dict) -> None:
+    if cgroup := spec.get("cgroup"):
+        try:
+            with open(os.path.join(cgroup, "cgroup.procs"), "w") as f:
+                f.write("0")
+        except OSError:
+            pass
+    for name, value in spec.get("rlimits", []):
+        which = getattr(resource, name)
+        _, hard = resource.getrlimit(which)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(which, (value, hard if hard != resource.RLIM_INFINITY else value))
+
+
+def main() -> None:
+    spec, argv = json.loads(sys.argv[1]), sys.argv[2:]
+    _apply(spec)
+    try:
+        os.execvp(argv[0], argv)
+    except OSError as e:
+        sys.stderr.write(f"{argv[0]}: {e.strerror}\n")
+        sys.exit(127)
+
+
+if __name__ == "__main__":
+    main()
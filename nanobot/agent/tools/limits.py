@@ -0,0 +1,165 @@
+"""Resource limits and process-group handling for shell commands."""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+_LIMIT_EXEC_SCRIPT = Path(__file__).with_name("limit_exec.py")
+# How long release_cgroup waits for a killed cgroup to empty before removing it
+_CGROUP_DRAIN_S = 1.0
+
+
+@dataclass
+class ResourceLimits:
+    """
+    Per-command limits applied to the shell and everything it starts.
+
+    rlimits are inherited by every child; a value of 0 leaves that limit
+    alone. When `cgroup_parent` points at a writable, delegated cgroup v2
+    directory, each command also gets its own child cgroup with
+    `memory.max` and `pids.max` set, which caps the process tree as a whole
+    rather than each process separately.
+
+    Limits are applied by a small exec wrapper (limit_exec.py) rather than a
+    preexec_fn, which can deadlock the child of a multithreaded process.
+    """
+    cpu_seconds: int = 0
+    address_space_mb: int = 0
+    max_open_files: int = 0
+    max_processes: int = 0
+    cgroup_parent: str = ""
+
+    def create_cgroup(self) -> Path | None:
+        """Create a child cgroup for one command, or return None if cgroup v2 isn't usable."""
+        if not self.cgroup_parent or os.name != "posix":
+            return None
+        parent = Path(self.cgroup_parent)
+        if not (parent / "cgroup.controllers").exists() or not os.access(parent, os.W_OK):
+            logger.debug(f"cgroup v2 parent {parent} is not available; using rlimits only")
+            return None
+        path = parent / f"nanobot-{uuid.uuid4().hex[:12]}"
+        try:
+            path.mkdir()
+            if self.address_space_mb:
+                (path / "memory.max").write_text(str(self.address_space_mb * 1024 * 1024))
+                (path / "memory.swap.max").write_text("0")
+            if self.max_processes:
+                (path / "pids.max").write_text(str(self.max_processes))
+        except OSError as e:
+            # A controller may not be enabled in the parent's subtree_control
+            logger.debug(f"Could not fully configure cgroup {path}: {e}")
+            if not path.is_dir():
+                return None
+        return path
+
+    def popen_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for asyncio.create_subprocess_* (a new session, so the group can be killed)."""
+        return {"start_new_session": True} if os.name == "posix" else {}
+
+    def wrap_argv(self, argv: list[str], cgroup: Path | None = None) -> list[str]:
+        """`argv`, prefixed with the limit_exec wrapper when there are limits to apply."""
+        if os.name != "posix":
+            return argv
+        rlimits: list[tuple[str, int]] = []
+        if self.cpu_seconds:
+            rlimits.append(("RLIMIT_CPU", self.cpu_seconds))
+        if self.address_space_mb:
+            rlimits.append(("RLIMIT_AS", self.address_space_mb * 1024 * 1024))
+        if self.max_open_files:
+            rlimits.append(("RLIMIT_NOFILE", self.max_open_files))
+        # RLIMIT_NPROC counts every process of the user, so the cgroup pids.max is preferred
+        if self.max_processes and cgroup is None:
+            rlimits.append(("RLIMIT_NPROC", self.max_processes))
+        if not rlimits and cgroup is None:
+            return argv
+        spec = json.dumps({"rlimits": rlimits, "cgroup": str(cgroup) if cgroup else None})
+        return [sys.executable, "-I", "-S", str(_LIMIT_EXEC_SCRIPT), spec, *argv]
+
+    async def spawn_shell(
+        self, command: str, cgroup: Path | None = None, **kwargs: Any
+    ) -> asyncio.subprocess.Process:
+        """Like asyncio.create_subprocess_shell, in a new session and under these limits."""
+        if os.name != "posix":
+            return await asyncio.create_subprocess_shell(command, **kwargs)
+        return await asyncio.create_subprocess_exec(
+            *self.wrap_argv(["/bin/sh", "-c", command], cgroup), **self.popen_kwargs(), **kwargs
+        )
+
+
+def release_cgroup(cgroup: Path | None) -> None:
+    """
+    Kill anything left in a command's cgroup, wait for it to empty, and remove it.
+
+    Blocks for up to `_CGROUP_DRAIN_S`; async code should call it through run_io.
+    """
+    if cgroup is None:
+        return
+    try:
+        kill_file = cgroup / "cgroup.kill"
+        if kill_file.exists():
+            kill_file.write_text("1")
+    except OSError as e:
+        logger.debug(f"Could not kill cgroup {cgroup}: {e}")
+    # rmdir fails with EBUSY until every killed process has actually exited
+    if not wait_cgroup_empty(cgroup, _CGROUP_DRAIN_S):
+        logger.warning(f"cgroup {cgroup} still has processes after {_CGROUP_DRAIN_S}s; removing anyway")
+    try:
+        cgroup.rmdir()
+    except OSError as e:
+        logger.warning(f"Could not remove cgroup {cgroup}: {e}")
+
+
+def wait_cgroup_empty(cgroup: Path, timeout: float) -> bool:
+    """Poll cgroup.events until it reports `populated 0`; False on timeout."""
+    events = cgroup / "cgroup.events"
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        try:
+            if "populated 0" in events.read_text():
+                return True
+        except OSError:
+            return True  # Gone already, or not a cgroup v2 directory
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
+
+def kill_process_group(process: asyncio.subprocess.Process, sig: int | None = None) -> None:
+    """Signal the shell and everything it started (SIGKILL unless `sig` is given)."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, sig or signal.SIGKILL)
+        elif sig is None:
+            process.kill()
+        else:
+            process.terminate()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def terminate_process_group(process: asyncio.subprocess.Process, grace: float = 2.0) -> None:
+    """
+    Send SIGTERM to the process group, then SIGKILL once `grace` seconds have passed.
+
+    SIGKILL is always sent at the end so that children which ignored SIGTERM
+    after the shell itself exited are still cleaned up.
+    """
+    if grace > 0:
+        kill_process_group(process, signal.SIGTERM)
+        loop = asyncio.get_running_loop()
+        end = loop.time() + grace
+        # Poll returncode rather than wait(): wait() also waits for the pipes to close
+        while process.returncode is None and loop.time() < end:
+            await asyncio.sleep(0.05)
+    kill_process_group(process)
@@ -0,0 +1,129 @@
+"""Per-tool execution metrics recorded by the tool registry."""
+
+import bisect
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+@dataclass
+class _ToolStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    invalid: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    result_bytes: int = 0
+    max_result_bytes: int = 0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def quantile(self, q: float) -> float:
+        """Estimate: upper bound of the bucket holding the q-th call, capped at the slowest call."""
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "invalidParams": self.invalid,
+            "meanMs": round(self.total_seconds / self.calls * 1000, 1) if self.calls else 0.0,
+            "p50Ms": _ms(self.quantile(0.5)),
+            "p95Ms": _ms(self.quantile(0.95)),
+            "maxMs": _ms(self.max_seconds),
+            "resultBytes": self.result_bytes,
+            "meanResultBytes": self.result_bytes // self.calls if self.calls else 0,
+            "maxResultBytes": self.max_result_bytes,
+            "latencyBuckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.buckets)),
+        }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+class ToolMetrics:
+    """
+    Call counts, latency histograms, error counts and result sizes per tool,
+    broken down by scope ("agent" for the main loop, "subagent" for spawned ones).
+
+    One instance is shared by every registry of an agent loop. Snapshots are
+    written to disk periodically so `nanobot status` can show them.
+    """
+
+    def __init__(self):
+        self._stats: dict[tuple[str, str], _ToolStats] = {}
+        self.since = time.time()
+        self.dirty = False
+
+    def _get(self, tool: str, scope: str) -> _ToolStats:
+        key = (tool, scope)
+        if key not in self._stats:
+            self._stats[key] = _ToolStats()
+        return self._stats[key]
+
+    def record(self, tool: str, scope: str, seconds: float, result: str, error: bool, timed_out: bool) -> None:
+        """Record one executed call."""
+        stats = self._get(tool, scope)
+        size = len(result.encode("utf-8"))
+        stats.calls += 1
+        stats.errors += error
+        stats.timeouts += timed_out
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.result_bytes += size
+        stats.max_result_bytes = max(stats.max_result_bytes, size)
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.dirty = True
+
+    def record_invalid(self, tool: str, scope: str) -> None:
+        """Record a call rejected by parameter validation."""
+        self._get(tool, scope).invalid += 1
+        self.dirty = True
+
+    def snapshot(self) -> dict[str, Any]:
+        """Metrics keyed by tool name, then scope."""
+        tools: dict[str, dict[str, Any]] = {}
+        for (tool, scope), stats in sorted(self._stats.items()):
+            tools.setdefault(tool, {})[scope] = stats.to_dict()
+        return {"since": self.since, "updatedAt": time.time(), "tools": tools}
+
+    def save(self, path: Path) -> None:
+        """Write a snapshot to disk."""
+        self.dirty = False
+        self.write_snapshot(path, self.snapshot())
+
+    @staticmethod
+    def write_snapshot(path: Path, snapshot: dict[str, Any]) -> None:
+        """Write a snapshot taken with snapshot() (safe to run off the event loop)."""
+        data = json.dumps(snapshot)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Failed to save tool metrics: {e}")
+
+    @staticmethod
+    def load_snapshot(path: Path) -> dict[str, Any] | None:
+        """Read a snapshot written by save(), or None if there is none."""
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,62 @@
+"""Python snippet execution tool backed by warm worker processes."""
+
+import asyncio
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.python_pool import PythonWorkerError, PythonWorkerPool
+
+
+class PythonTool(Tool):
+    """Run Python code in a pre-started interpreter."""
+
+    writes_workspace = True
+
+    def __init__(self, pool: PythonWorkerPool, timeout: int = 60):
+        self.pool = pool
+        self.timeout = timeout
+
+    @property
+    def name(self) -> str:
+        return "python"
+
+    @property
+    def description(self) -> str:
+        preload = ", ".join(self.pool.preload)
+        hint = f" {preload} are preloaded, so importing them is instant." if preload else ""
+        return (
+            "Run a Python snippet and return what it prints plus the value of its last expression. "
+            "Faster than `exec python -c` for data crunching. Each call starts with a fresh namespace "
+            f"in the workspace directory.{hint}"
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "code": {"type": "string", "description": "Python source to run"},
+            },
+            "required": ["code"],
+        }
+
+    async def execute(self, code: str, **kwargs: Any) -> str:
+        try:
+            reply = await self.pool.run(code, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return f"Error: Python snippet timed out after {self.timeout} seconds (worker was restarted)"
+        except PythonWorkerError as e:
+            return f"Error: Python worker crashed: {e} (the memory limit may have been hit)"
+        except Exception as e:
+            return f"Error running python: {str(e)}"
+
+        output_parts = []
+        if reply.get("stdout"):
+            output_parts.append(reply["stdout"].rstrip("\n"))
+        if reply.get("result") is not None:
+            output_parts.append(reply["result"])
+        if reply.get("stderr", "").strip():
+            output_parts.append(f"STDERR:\n{reply['stderr'].rstrip()}")
+        if reply.get("error"):
+            output_parts.append(reply["error"].rstrip())
+        return "\n".join(output_parts) if output_parts else "(no output)"
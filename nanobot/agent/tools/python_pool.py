@@ -0,0 +1,190 @@
+"""Pool of pre-started Python worker processes for the python tool."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.agent.tools.limits import ResourceLimits, kill_process_group
+
+_WORKER_SCRIPT = Path(__file__).with_name("python_worker.py")
+# StreamReader line limit; replies carry up to three capped text fields
+_REPLY_LIMIT = 16 * 1024 * 1024
+
+
+class PythonWorkerError(Exception):
+    """The worker died or stopped answering; it has been discarded."""
+
+
+class PythonWorker:
+    """One interpreter that runs snippets sent as JSON lines."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.uses = 0
+        self.preloaded: list[str] = []
+        self._killed = False
+
+    @property
+    def alive(self) -> bool:
+        return not self._killed and self.process.returncode is None
+
+    @classmethod
+    async def start(
+        cls, cwd: str, preload: list[str], max_output_chars: int, limits: ResourceLimits
+    ) -> "PythonWorker":
+        config = json.dumps({"preload": preload, "max_output_chars": max_output_chars})
+        process = await asyncio.create_subprocess_exec(
+            *limits.wrap_argv([sys.executable, "-u", str(_WORKER_SCRIPT), config]),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=cwd,
+            limit=_REPLY_LIMIT,
+            **limits.popen_kwargs(),
+        )
+        worker = cls(process)
+        hello = await worker._read()
+        worker.preloaded = hello.get("preloaded", [])
+        return worker
+
+    async def run(self, code: str, timeout: float) -> dict[str, Any]:
+        """
+        Run one snippet and return the worker's reply.
+
+        Raises:
+            asyncio.TimeoutError: The snippet ran too long; the worker is killed.
+            PythonWorkerError: The worker crashed (e.g. hit its memory cap).
+        """
+        assert self.process.stdin is not None
+        self.uses += 1
+        try:
+            self.process.stdin.write((json.dumps({"code": code}) + "\n").encode("utf-8"))
+            await self.process.stdin.drain()
+            return await asyncio.wait_for(self._read(), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self.close()
+            raise
+        except (ConnectionError, PythonWorkerError) as e:
+            self.close()
+            raise PythonWorkerError(str(e) or "worker exited") from e
+
+    async def _read(self) -> dict[str, Any]:
+        assert self.process.stdout is not None
+        line = await self.process.stdout.readline()
+        if not line:
+            await self.process.wait()
+            raise PythonWorkerError(f"worker exited with code {self.process.returncode}")
+        return json.loads(line)
+
+    def close(self) -> None:
+        if self.alive:
+            kill_process_group(self.process)
+        self._killed = True
+        if self.process.stdin is not None:
+            self.process.stdin.close()
+
+
+class PythonWorkerPool:
+    """
+    Keeps up to `size` warm interpreters for the workspace.
+
+    No worker is started until the first snippet runs. Workers import the
+    `preload` modules once at startup, so snippets that use them skip the
+    import cost. A worker is retired after `max_uses` snippets,
+    on a timeout, or when it crashes, and a replacement is started in the
+    background so the next call finds a warm one.
+    """
+
+    def __init__(
+        self,
+        cwd: str,
+        size: int = 2,
+        max_uses: int = 50,
+        preload: list[str] | None = None,
+        max_output_chars: int = 10000,
+        limits: ResourceLimits | None = None,
+    ):
+        self.cwd = cwd
+        self.size = size
+        self.max_uses = max_uses
+        self.preload = preload or []
+        self.max_output_chars = max_output_chars
+        self.limits = limits or ResourceLimits()
+        self._idle: list[PythonWorker] = []
+        self._slots = asyncio.Semaphore(size)
+        self._starting = 0
+        self._busy = 0
+        self._closed = False
+        self._background: set[asyncio.Task[Any]] = set()
+
+    async def warm(self) -> None:
+        """Start workers until `size` are running or idle."""
+        while not self._closed and len(self._idle) + self._starting + self._busy < self.size:
+            self._starting += 1
+            try:
+                worker = await self._spawn()
+            except Exception as e:
+                logger.warning(f"Could not start python worker: {e}")
+                return
+            finally:
+                self._starting -= 1
+            if self._closed:
+                self._retire(worker)
+                return
+            self._idle.append(worker)
+
+    async def run(self, code: str, timeout: float) -> dict[str, Any]:
+        """Run a snippet on an idle worker, starting one if none is warm."""
+        async with self._slots:
+            self._busy += 1
+            try:
+                worker = self._take_idle() or await self._spawn()
+                try:
+                    return await worker.run(code, timeout)
+                finally:
+                    if worker.alive and worker.uses < self.max_uses and not self._closed:
+                        self._idle.append(worker)
+                    else:
+                        self._retire(worker)
+            finally:
+                self._busy -= 1
+                if not self._closed and len(self._idle) + self._starting + self._busy < self.size:
+                    self._in_background(self.warm())
+
+    def close(self) -> None:
+        """Stop handing out workers and kill the idle ones."""
+        self._closed = True
+        for worker in self._idle:
+            self._retire(worker)
+        self._idle.clear()
+
+    async def aclose(self) -> None:
+        """Close the pool and wait until every worker it started has exited."""
+        self.close()
+        while self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    def _retire(self, worker: PythonWorker) -> None:
+        worker.close()
+        self._in_background(worker.process.wait())
+
+    def _in_background(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _take_idle(self) -> PythonWorker | None:
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.alive:
+                return worker
+        return None
+
+    async def _spawn(self) -> PythonWorker:
+        worker = await PythonWorker.start(self.cwd, self.preload, self.max_output_chars, self.limits)
+        logger.debug(f"Started python worker {worker.process.pid} (preloaded: {', '.join(worker.preloaded) or 'none'})")
+        return worker
@@ -0,0 +1,109 @@
+"""
+Worker process for the python tool.
+
+Started as a script by PythonWorkerPool, never imported by nanobot itself,
+and kept free of nanobot imports so it starts quickly. It preloads the
+configured modules, then reads one JSON request per line on stdin and
+writes one JSON reply per line on the original stdout. File descriptors 1
+and 2 are pointed at /dev/null so stray output cannot corrupt the protocol.
+"""
+
+import ast
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import traceback
+
+
+class _CappedWriter(io.TextIOBase):
+    """Text sink that keeps the first `limit` characters and counts the rest."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts: list[str] = []
+        self.size = 0
+        self.dropped = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        room = self.limit - self.size
+        if room > 0:
+            self.parts.append(s[:room])
+            self.size += min(len(s), room)
+        self.dropped += max(0, len(s) - max(room, 0))
+        return len(s)
+
+    def getvalue(self) -> str:
+        text = "".join(self.parts)
+        if self.dropped:
+            text += f"\n... ({self.dropped:,} more characters dropped)"
+        return text
+
+
+def _format_error(e: BaseException) -> str:
+    # Skip the frame of _run itself so the traceback starts in the snippet
+    tb = e.__traceback__.tb_next if e.__traceback__ else None
+    return "".join(traceback.format_exception(type(e), e, tb))
+
+
+def _run(code: str, limit: int, cwd: str) -> dict:
+    out, err = _CappedWriter(limit), _CappedWriter(limit)
+    reply: dict = {"stdout": "", "stderr": "", "result": None, "error": None}
+    namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            tree = ast.parse(code, "<python>", "exec")
+            # Echo the value of a trailing expression, like the interactive interpreter
+            last = tree.body.pop() if tree.body and isinstance(tree.body[-1], ast.Expr) else None
+            exec(compile(tree, "<python>", "exec"), namespace)
+            if last is not None:
+                value = eval(compile(ast.Expression(last.value), "<python>", "eval"), namespace)
+                if value is not None:
+                    reply["result"] = repr(value)[:limit]
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            reply["error"] = f"SystemExit: {e.code}"
+    except BaseException as e:
+        reply["error"] = _format_error(e)
+    finally:
+        os.chdir(cwd)
+    reply["stdout"] = out.getvalue()
+    reply["stderr"] = err.getvalue()
+    return reply
+
+
+def main() -> None:
+    config = json.loads(sys.argv[1])
+    requests = sys.stdin
+    replies = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    sys.stdin = open(os.devnull)
+
+    preloaded = []
+    for name in config.get("preload", []):
+        try:
+            importlib.import_module(name)
+            preloaded.append(name)
+        except Exception:
+            pass
+
+    def send(message: dict) -> None:
+        replies.write(json.dumps(message) + "\n")
+        replies.flush()
+
+    cwd = os.getcwd()
+    send({"ready": True, "preloaded": preloaded})
+    for line in requests:
+        request = json.loads(line)
+        send(_run(request["code"], config.get("max_output_chars", 10000), cwd))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,148 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
+import time
+from collections.abc import AsyncIterator, Collection
+from contextlib import asynccontextmanager
 from typing import Any
 
+from loguru import logger
+
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.metrics import ToolMetrics
+
+
+class WorkspaceChanges:
+    """
+    Process-wide count of workspace modifications, shared by every result cache.
+
+    Bumped after each call of a workspace-writing tool in any registry (the
+    main agent's and every subagent's) and whenever a background job ends.
+    While background jobs are running (`busy`), workspace reads are not
+    memoized at all, since a job may change files at any moment. Edits made
+    outside nanobot (an editor, another process) are not seen, so a cached
+    read can be stale within one turn.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.busy = 0
+
+    def bump(self) -> None:
+        self.generation += 1
+
+    def job_started(self) -> None:
+        self.busy += 1
+
+    def job_finished(self) -> None:
+        self.busy = max(0, self.busy - 1)
+        self.bump()
+
+
+workspace_changes = WorkspaceChanges()
+
+
+class ToolResultCache:
+    """
+    Per-turn memo of idempotent tool results.
+
+    Create one per turn and pass it to ToolRegistry.execute. Results of
+    workspace-reading tools are stamped with the workspace_changes generation
+    and only served while nothing has written to the workspace since.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[str, str], tuple[str, int | None]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, key: str, generation: int | None = None) -> str | None:
+        entry = self._entries.get((name, key))
+        if entry is None or entry[1] != generation:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, name: str, key: str, result: str, generation: int | None = None) -> None:
+        self._entries[(name, key)] = (result, generation)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ToolLimiter:
+    """
+    Per-tool timeouts and concurrency caps.
+
+    One limiter is shared by the main agent's registry and every subagent
+    registry, so `max_concurrent` bounds a tool across all turns at once.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 0,
+        timeouts: dict[str, float] | None = None,
+        max_concurrent: dict[str, int] | None = None,
+    ):
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.max_concurrent = {name: n for name, n in (max_concurrent or {}).items() if n > 0}
+        self._slots: dict[str, asyncio.Semaphore] = {}
+        self._running: dict[str, int] = {}
+        self._waiting: dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ToolLimiter":
+        """Build from a ToolsConfig."""
+        limits = config.effective_limits()
+        return cls(
+            default_timeout=config.default_timeout,
+            timeouts={name: lim.timeout for name, lim in limits.items() if lim.timeout is not None},
+            max_concurrent={name: lim.max_concurrent for name, lim in limits.items()},
+        )
+
+    def timeout_for(self, name: str) -> float | None:
+        """Seconds a call of this tool may run, or None for no limit."""
+        return self.timeouts.get(name, self.default_timeout) or None
+
+    @asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        """Hold one of the tool's concurrency slots for the duration of a call."""
+        limit = self.max_concurrent.get(name)
+        if limit is None:
+            yield
+            return
+        gate = self._slots.setdefault(name, asyncio.Semaphore(limit))
+        self._waiting[name] = self._waiting.get(name, 0) + 1
+        try:
+            await gate.acquire()
+        finally:
+            self._waiting[name] -= 1
+        self._running[name] = self._running.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            self._running[name] -= 1
+            gate.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Running and waiting calls for each tool with a concurrency cap."""
+        return {
+            name: {"limit": limit, "running": self._running.get(name, 0), "waiting": self._waiting.get(name, 0)}
+            for name, limit in self.max_concurrent.items()
+        }
+
+
+def _tool_timeout_error(name: str, seconds: float | None) -> str:
+    return (
+        f"Error: Tool '{name}' timed out after {seconds:g}s (per-tool limit) and was cancelled. "
+        "Retry with a smaller request or use a different approach."
+    )
+
+
+def _is_error_result(result: str) -> bool:
+    return result.startswith("Error") or result.startswith('{"error"')
 
 
 class ToolRegistry:
@@ -12,8 +152,18 @@ class ToolRegistry:
     Allows dynamic registration and execution of tools.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        limiter: ToolLimiter | None = None,
+        metrics: ToolMetrics | None = None,
+        scope: str = "agent",
+    ):
         self._tools: dict[str, Tool] = {}
+        self.limiter = limiter or ToolLimiter()
+        self.metrics = metrics or ToolMetrics()
+        self.scope = scope
+        self._cache_hits = 0
+        self._cache_misses = 0
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
@@ -31,17 +181,26 @@ class ToolRegistry:
         """Check if a tool is registered."""
         return name in self._tools
     
-    def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
-        return [tool.to_schema() for tool in self._tools.values()]
+    def get_definitions(self, names: Collection[str] | None = None) -> list[dict[str, Any]]:
+        """Get tool definitions in OpenAI format (all tools, or only `names`)."""
+        return [tool.to_schema() for name, tool in self._tools.items() if names is None or name in names]
     
-    async def execute(self, name: str, params: dict[str, Any]) -> str:
+    async def execute(
+        self,
+        name: str,
+        params: dict[str, Any],
+        timeout: float | None = None,
+        cache: ToolResultCache | None = None,
+    ) -> str:
         """
         Execute a tool by name with given parameters.
         
         Args:
             name: Tool name.
             params: Tool parameters.
+            timeout: Optional time budget in seconds (e.g. what is left of the turn);
+                the tool's own limit from the ToolLimiter applies as well.
+            cache: Optional per-turn cache for idempotent tool results.
         
         Returns:
             Tool execution result as string.
@@ -55,11 +214,71 @@ class ToolRegistry:
 
         try:
             errors = tool.validate_params(params)
-            if errors:
-                return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
-            return await tool.execute(**params)
         except Exception as e:
             return f"Error executing {name}: {str(e)}"
+        if errors:
+            self.metrics.record_invalid(name, self.scope)
+            return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
+
+        key = tool.cache_key(params) if cache is not None and tool.idempotent else None
+        if key is not None and tool.reads_workspace and workspace_changes.busy:
+            key = None  # A background job may be changing files right now
+        generation = workspace_changes.generation if tool.reads_workspace else None
+        if key is not None:
+            cached = cache.get(name, key, generation)
+            if cached is not None:
+                self._cache_hits += 1
+                logger.debug(f"Tool cache hit: {name}")
+                return cached
+            self._cache_misses += 1
+
+        start = time.monotonic()
+        result, timed_out = await self._run(tool, name, params, timeout)
+        self.metrics.record(
+            name, self.scope, time.monotonic() - start, result,
+            error=_is_error_result(result), timed_out=timed_out,
+        )
+        if key is not None and not _is_error_result(result):
+            cache.put(name, key, result, generation)
+        return result
+    
+    async def _run(
+        self,
+        tool: Tool,
+        name: str,
+        params: dict[str, Any],
+        timeout: float | None,
+    ) -> tuple[str, bool]:
+        """Execute a validated call under its limits; returns (result, timed out)."""
+        tool_timeout = self.limiter.timeout_for(name)
+        try:
+            async with asyncio.timeout(timeout), self.limiter.slot(name):
+                tool_deadline = asyncio.timeout(tool_timeout)
+                try:
+                    async with tool_deadline:
+                        return await tool.execute(**params), False
+                except TimeoutError:
+                    if tool_deadline.expired():
+                        return _tool_timeout_error(name, tool_timeout), True
+                    raise
+        except TimeoutError as e:
+            if timeout is None:
+                return f"Error executing {name}: {str(e)}", False
+            return f"Error: Tool '{name}' timed out after {timeout:.0f}s (turn time budget exhausted)", True
+        except Exception as e:
+            return f"Error executing {name}: {str(e)}", False
+        finally:
+            if tool.writes_workspace:
+                workspace_changes.bump()
+    
+    def cache_stats(self) -> dict[str, Any]:
+        """Cumulative hit/miss counts for per-turn result caches."""
+        lookups = self._cache_hits + self._cache_misses
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hitRate": round(self._cache_hits / lookups, 3) if lookups else 0.0,
+        }
     
     @property
     def tool_names(self) -> list[str]:
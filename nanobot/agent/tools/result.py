@@ -0,0 +1,52 @@
+"""Tool for paging through large tool results stored out of band."""
+
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.result_store import READ_RESULT_TOOL, ResultStore
+from nanobot.agent.tools.base import Tool
+from nanobot.utils.io_executor import run_io
+
+
+class ReadResultTool(Tool):
+    """Read a character range of a stored tool result."""
+
+    name = READ_RESULT_TOOL
+    description = (
+        "Read part of a large tool result that was stored out of band. "
+        "Use the handle from the '[Full ... result stored as ...]' note."
+    )
+    parameters = {
+        "type": "object",
+        "properties": {
+            "handle": {"type": "string", "description": "Handle of the stored result"},
+            "offset": {"type": "integer", "description": "Character offset to start from", "minimum": 0},
+            "limit": {"type": "integer", "description": "Number of characters to read", "minimum": 1},
+        },
+        "required": ["handle"]
+    }
+    idempotent = True
+
+    def __init__(self, root: Path, max_chars: int = 8000):
+        self.root = root
+        self.max_chars = max_chars
+
+    async def execute(self, **kwargs: Any) -> str:
+        return await run_io(self._read, **kwargs)
+
+    def _read(self, handle: str, offset: int = 0, limit: int | None = None, **kwargs: Any) -> str:
+        path = ResultStore.resolve(self.root, handle)
+        if path is None:
+            return f"Error: Unknown result handle: {handle}"
+        try:
+            text = path.read_text(encoding="utf-8")
+        except Exception as e:
+            return f"Error reading stored result: {e}"
+
+        total = len(text)
+        if offset >= total:
+            return f"Error: offset {offset} is past the end of the result ({total} characters)"
+        end = min(total, offset + min(limit or self.max_chars, self.max_chars))
+        header = f"[{handle}: characters {offset}-{end} of {total}]"
+        footer = f"\n[{total - end} characters remain; continue with offset={end}]" if end < total else ""
+        return f"{header}\n{text[offset:end]}{footer}"
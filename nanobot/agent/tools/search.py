@@ -0,0 +1,339 @@
+"""Workspace search tool backed by a persistent trigram index."""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.filesystem import SKIP_DIRS, _atomic_write, _is_binary, _resolve_path
+from nanobot.utils.helpers import get_data_path
+from nanobot.utils.io_executor import run_io
+
+# Files above this size are not indexed or searched
+_MAX_FILE_BYTES = 1024 * 1024
+_INDEX_VERSION = 1
+# Escapes followed by a fixed number of payload characters
+_ESCAPE_PAYLOAD = {"x": 2, "u": 4, "U": 8}
+# Single-letter escapes: character classes, anchors and control characters
+_SIMPLE_ESCAPES = set("dDsSwWbBAZafnrtv")
+
+
+def _trigrams(data: bytes) -> set[int]:
+    """Case-folded (ASCII) byte trigrams of `data`, packed into ints."""
+    data = data.lower()
+    return {int.from_bytes(data[i:i + 3], "big") for i in range(len(data) - 2)}
+
+
+def _literal_runs(pattern: str) -> list[str] | None:
+    """
+    Literal substrings every match of a regex must contain.
+
+    Conservative: returns None when the pattern has alternation or an escape
+    it does not know, and drops groups, classes, escapes and quantified
+    characters from the runs.
+    """
+    if "|" in pattern:
+        return None
+    runs: list[str] = []
+    current = ""
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c in "([":
+            close = ")" if c == "(" else "]"
+            depth, i = 1, i + 1
+            while i < len(pattern) and depth:
+                if pattern[i] == "\\":
+                    i += 1
+                elif pattern[i] == c:
+                    depth += 1
+                elif pattern[i] == close:
+                    depth -= 1
+                i += 1
+            runs.append(current)
+            current = ""
+            continue
+        if c in "*?{":
+            current = current[:-1]
+            runs.append(current)
+            current = ""
+            if c == "{":
+                end = pattern.find("}", i)
+                i = len(pattern) if end == -1 else end
+        elif c == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            if not nxt.isalnum():
+                current += nxt
+                i += 1
+            else:
+                # Skip the whole escape sequence (\x41, \N{...}, \12, \d, ...) and end the run
+                runs.append(current)
+                current = ""
+                i += 1
+                if nxt in _ESCAPE_PAYLOAD:
+                    i += _ESCAPE_PAYLOAD[nxt]
+                elif nxt == "N":
+                    end = pattern.find("}", i)
+                    i = len(pattern) if end == -1 else end
+                elif nxt.isdigit():
+                    digits = 1
+                    while digits < 3 and i + 1 < len(pattern) and pattern[i + 1].isdigit():
+                        i += 1
+                        digits += 1
+                elif nxt not in _SIMPLE_ESCAPES:
+                    return None
+        elif c in ".^$+)]}":
+            runs.append(current)
+            current = ""
+        else:
+            current += c
+        i += 1
+    runs.append(current)
+    return [r for r in runs if len(r) >= 3]
+
+
+def default_index_path(workspace: Path) -> Path:
+    """Where the index for a workspace is persisted (~/.nanobot/index/<hash>.json)."""
+    digest = hashlib.sha1(str(workspace.resolve()).encode("utf-8")).hexdigest()[:12]
+    return get_data_path() / "index" / f"{digest}.json"
+
+
+class WorkspaceIndex:
+    """
+    Trigram index of text files under a root directory.
+
+    Refreshed incrementally from file mtimes and sizes before each query and
+    persisted as JSON so restarts do not re-read the whole workspace. One
+    instance is shared by every registry working on the same workspace;
+    queries run on I/O-pool threads and are serialized by a lock.
+    """
+
+    def __init__(self, root: Path, index_path: Path | None = None):
+        self.root = root
+        self.index_path = index_path
+        self._files: dict[str, dict[str, Any]] | None = None
+        self._grams: dict[str, set[int]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        self._files = {}
+        if not self.index_path or not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if data.get("version") != _INDEX_VERSION or data.get("root") != str(self.root):
+                return
+            for rel, entry in data.get("files", {}).items():
+                self._files[rel] = {"mtime": entry["mtime"], "size": entry["size"], "binary": entry["binary"]}
+                self._grams[rel] = set(entry["trigrams"])
+        except Exception as e:
+            logger.warning(f"Failed to load search index: {e}")
+            self._files, self._grams = {}, {}
+
+    def _save(self) -> None:
+        if not self.index_path or self._files is None:
+            return
+        data = {
+            "version": _INDEX_VERSION,
+            "root": str(self.root),
+            "files": {
+                rel: {**entry, "trigrams": sorted(self._grams.get(rel, ()))}
+                for rel, entry in self._files.items()
+            },
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.index_path, json.dumps(data))
+        except OSError as e:
+            logger.warning(f"Failed to save search index: {e}")
+
+    def refresh(self) -> list[str]:
+        """Bring the index up to date and return all indexed relative paths."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> list[str]:
+        if self._files is None:
+            self._load()
+        assert self._files is not None
+        seen: set[str] = set()
+        changed = False
+        for path, st in iter_text_candidates(self.root):
+            rel = path.relative_to(self.root).as_posix()
+            seen.add(rel)
+            entry = self._files.get(rel)
+            if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+                continue
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue
+            binary = _is_binary(data[:8192])
+            self._files[rel] = {"mtime": st.st_mtime, "size": st.st_size, "binary": binary}
+            self._grams[rel] = set() if binary else _trigrams(data)
+            changed = True
+        for rel in set(self._files) - seen:
+            del self._files[rel]
+            self._grams.pop(rel, None)
+            changed = True
+        if changed:
+            self._save()
+        return [rel for rel, entry in self._files.items() if not entry["binary"]]
+
+    def candidates(self, literals: list[str] | None) -> list[str]:
+        """Indexed files that contain every trigram of the given literals."""
+        with self._lock:
+            files = self._refresh()
+            if not literals:
+                return files
+            required: set[int] = set()
+            for literal in literals:
+                if literal.isascii():
+                    required |= _trigrams(literal.encode("utf-8"))
+            if not required:
+                return files
+            return [rel for rel in files if required <= self._grams[rel]]
+
+
+def iter_text_candidates(root: Path) -> Iterator[tuple[Path, os.stat_result]]:
+    """Yield (path, stat) for files under `root` worth searching, skipping VCS and dependency dirs."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if st.st_size <= _MAX_FILE_BYTES:
+                yield path, st
+
+
+class SearchTool(Tool):
+    """Search file contents in the workspace using an incremental trigram index."""
+
+    name = "search"
+    description = (
+        "Search file contents in the workspace. Returns matching lines with context, "
+        "ranked by number of matches per file. Faster than exec grep or reading files one by one."
+    )
+    parameters = {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "Text or regular expression to search for", "minLength": 1},
+            "regex": {"type": "boolean", "description": "Treat query as a regular expression", "default": False},
+            "glob": {"type": "string", "description": "Only search paths matching this glob, e.g. '*.py' or 'src/*'"},
+            "path": {"type": "string", "description": "Directory to search (default: workspace)"},
+            "case_sensitive": {"type": "boolean", "default": False},
+            "context": {"type": "integer", "description": "Lines of context around matches", "minimum": 0, "maximum": 10, "default": 1},
+            "max_results": {"type": "integer", "description": "Maximum matching lines", "minimum": 1, "maximum": 500, "default": 50},
+        },
+        "required": ["query"]
+    }
+    idempotent = True
+    reads_workspace = True
+
+    def __init__(
+        self,
+        workspace: Path,
+        allowed_dir: Path | None = None,
+        index_path: Path | None = None,
+        index: WorkspaceIndex | None = None,
+    ):
+        self.workspace = workspace.resolve()
+        self._allowed_dir = allowed_dir
+        self.index = index or WorkspaceIndex(self.workspace, index_path)
+
+    async def execute(self, **kwargs: Any) -> str:
+        return await run_io(self._search, **kwargs)
+
+    def _search(
+        self,
+        query: str,
+        regex: bool = False,
+        glob: str | None = None,
+        path: str | None = None,
+        case_sensitive: bool = False,
+        context: int = 1,
+        max_results: int = 50,
+        **kwargs: Any,
+    ) -> str:
+        try:
+            root = _resolve_path(path, self._allowed_dir) if path else self.workspace
+            if not root.is_dir():
+                return f"Error: Not a directory: {path}"
+            flags = 0 if case_sensitive else re.IGNORECASE
+            try:
+                matcher = re.compile(query if regex else re.escape(query), flags)
+            except re.error as e:
+                return f"Error: Invalid regex: {e}"
+            literals = _literal_runs(query) if regex else [query]
+
+            if root == self.workspace or self.workspace in root.parents:
+                prefix = "" if root == self.workspace else root.relative_to(self.workspace).as_posix() + "/"
+                files = [self.workspace / rel for rel in self.index.candidates(literals) if rel.startswith(prefix)]
+                base = self.workspace
+            else:
+                files = [file for file, _ in iter_text_candidates(root)]
+                base = root
+
+            hits: list[tuple[str, list[str], list[int]]] = []
+            for file in files:
+                rel = file.relative_to(base).as_posix()
+                if glob and not (fnmatch.fnmatch(rel, glob) or fnmatch.fnmatch(file.name, glob)):
+                    continue
+                try:
+                    lines = file.read_text(encoding="utf-8", errors="replace").splitlines()
+                except OSError:
+                    continue
+                matched = [i for i, line in enumerate(lines) if matcher.search(line)]
+                if matched:
+                    hits.append((rel, lines, matched))
+        except PermissionError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error searching: {str(e)}"
+
+        if not hits:
+            return f"No matches for: {query}"
+        hits.sort(key=lambda h: (-len(h[2]), h[0]))
+        return self._format(query, hits, context, max_results)
+
+    @staticmethod
+    def _format(
+        query: str,
+        hits: list[tuple[str, list[str], list[int]]],
+        context: int,
+        max_results: int,
+    ) -> str:
+        total = sum(len(m) for _, _, m in hits)
+        out = [f"{total} matches in {len(hits)} files for: {query}"]
+        shown = 0
+        for rel, lines, matched in hits:
+            if shown >= max_results:
+                break
+            matched = matched[:max_results - shown]
+            shown += len(matched)
+            matched_set = set(matched)
+            wanted: set[int] = set()
+            for i in matched:
+                wanted.update(range(max(0, i - context), min(len(lines), i + context + 1)))
+            out.append("")
+            prev = None
+            for i in sorted(wanted):
+                if prev is not None and i > prev + 1:
+                    out.append("--")
+                sep = ":" if i in matched_set else "-"
+                out.append(f"{rel}{sep}{i + 1}{sep} {lines[i]}")
+                prev = i
+        if shown < total:
+            out.append(f"\n[{total - shown} more matches not shown; narrow the query, path or glob]")
+        return "\n".join(out)
@@ -0,0 +1,121 @@
+"""Persistent TTL cache and in-flight deduplication for web_search."""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.utils.io_executor import run_io
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return " ".join(query.casefold().split())
+
+
+class SearchCache:
+    """
+    Formatted web_search results keyed by normalized query and result count.
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    dropped beyond `max_entries`. The cache is persisted as one JSON file so
+    it survives restarts. Concurrent identical searches share one upstream
+    request (singleflight); only successful results are stored.
+    """
+
+    def __init__(self, store_path: Path | None, ttl: int = 3600, max_entries: int = 500):
+        self.store_path = store_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] | None = None
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._write_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(query: str, count: int) -> str:
+        return f"{count}:{normalize_query(query)}"
+
+    async def get_or_fetch(self, query: str, count: int, fetch: Callable[[], Awaitable[str]]) -> str:
+        """
+        Return a cached result, join an identical search already in flight, or run `fetch`.
+
+        `fetch` returns the formatted result; results starting with "Error" are not cached.
+        """
+        if self._entries is None:
+            entries = await run_io(self._load)
+            if self._entries is None:
+                self._entries = entries
+        key = self.key(query, count)
+        if (entry := self._entries.get(key)) and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        if (pending := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            # Shielded so one caller being cancelled doesn't fail the others
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        result = await fetch()
+        if not result.startswith("Error"):
+            self._put(key, result)
+            if self.store_path:
+                await run_io(self._write, self._snapshot())
+        return result
+
+    def _put(self, key: str, result: str) -> None:
+        assert self._entries is not None
+        now = time.time()
+        self._entries[key] = (now + self.ttl, result)
+        self._entries.move_to_end(key)
+        for stale in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[stale]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self) -> OrderedDict[str, tuple[float, str]]:
+        """Load unexpired entries from disk, least recently used first."""
+        entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        if not self.store_path or not self.store_path.exists():
+            return entries
+        try:
+            data = json.loads(self.store_path.read_text(encoding="utf-8"))
+            now = time.time()
+            for key, expires, result in data.get("entries", []):
+                if expires > now:
+                    entries[key] = (float(expires), str(result))
+        except Exception as e:
+            logger.warning(f"Failed to load web search cache: {e}")
+        return entries
+
+    def _snapshot(self) -> str:
+        entries = self._entries or {}
+        return json.dumps({"entries": [[k, e, r] for k, (e, r) in entries.items()]}, ensure_ascii=False)
+
+    def _write(self, data: str) -> None:
+        """Persist a snapshot to disk (runs on the I/O pool)."""
+        assert self.store_path is not None
+        try:
+            with self._write_lock:
+                self.store_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.store_path.with_suffix(".tmp")
+                tmp.write_text(data, encoding="utf-8")
+                os.replace(tmp, self.store_path)
+        except OSError as e:
+            logger.warning(f"Failed to save web search cache: {e}")
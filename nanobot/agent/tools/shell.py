@@ -2,16 +2,147 @@
 
 import asyncio
 import os
+import queue
 import re
+import threading
+import time
+import uuid
 from pathlib import Path
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.limits import (
+    ResourceLimits,
+    kill_process_group,
+    release_cgroup,
+    terminate_process_group,
+)
+from nanobot.agent.tools.shell_session import ShellSessionError, ShellSessionManager
+from nanobot.utils.io_executor import run_io
+
+# Bytes read from a pipe per step
+_READ_CHUNK = 64 * 1024
+# Spill files kept per directory; older ones are removed
+_MAX_SPILL_FILES = 20
+
+
+class OutputCapture:
+    """
+    Constant-memory capture of one output stream.
+
+    Keeps the first `head_bytes` and a ring of the last `tail_bytes`. Once the
+    stream outgrows both, everything is also written to `spill_path` so the
+    full output can still be inspected with read_file. The spill file is
+    written by a background thread, so feeding never waits on the disk.
+    """
+    
+    def __init__(self, stream: str, head_bytes: int, tail_bytes: int, spill_path: Path | None = None):
+        self.stream = stream
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill_path = spill_path
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self._spill: _SpillWriter | None = None
+        self.spilled = False
+    
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+    
+    def feed(self, chunk: bytes) -> None:
+        if (
+            self._spill is None and self.spill_path and not self.spilled
+            and self.total + len(chunk) > self.head_bytes + self.tail_bytes
+        ):
+            self._spill = _SpillWriter(self.spill_path, bytes(self.head + self.tail))
+            self.spilled = True
+        if self._spill is not None:
+            self._spill.write(chunk)
+        self.total += len(chunk)
+        
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk:
+            self.tail += chunk
+            if len(self.tail) > self.tail_bytes:
+                del self.tail[:len(self.tail) - self.tail_bytes]
+    
+    async def close(self) -> None:
+        """Finish the spill file, waiting until everything fed so far is on disk."""
+        if self._spill is None:
+            return
+        spill, self._spill = self._spill, None
+        spill.close()
+        await run_io(spill.join)
+        if spill.failed:
+            self.spilled = False
+            self.spill_path = None
+    
+    def text(self) -> str:
+        if not self.truncated:
+            return (self.head + self.tail).decode("utf-8", errors="replace")
+        head = self.head.decode("utf-8", errors="replace")
+        omitted = self.total - len(self.head) - len(self.tail)
+        tail = self.tail.decode("utf-8", errors="replace")
+        return f"{head}\n... ({omitted:,} bytes omitted) ...\n{tail}"
+    
+    def summary(self) -> str | None:
+        """Note on total size and where the full output went, if it was truncated."""
+        if not self.truncated:
+            return None
+        where = f"; full output saved to {self.spill_path}" if self.spilled else ""
+        return f"[{self.stream}: {self.total:,} bytes total{where}]"
+
+
+class _SpillWriter:
+    """Appends chunks to a spill file from a dedicated thread, in the order they were queued."""
+    
+    def __init__(self, path: Path, first: bytes):
+        self.path = path
+        self.failed = False
+        self._queue: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self._queue.put(first)
+        self._thread = threading.Thread(target=self._run, name="nanobot-spill", daemon=True)
+        self._thread.start()
+    
+    def write(self, chunk: bytes) -> None:
+        self._queue.put(bytes(chunk))
+    
+    def close(self) -> None:
+        self._queue.put(None)
+    
+    def join(self) -> None:
+        self._thread.join()
+    
+    def _run(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _prune_spill_files(self.path.parent)
+            with open(self.path, "wb") as f:
+                while (chunk := self._queue.get()) is not None:
+                    f.write(chunk)
+                return
+        except OSError:
+            self.failed = True
+        while self._queue.get() is not None:
+            pass  # keep draining so queued chunks don't pile up until close
+
+
+def _prune_spill_files(directory: Path) -> None:
+    files = sorted(directory.glob("*.log"), key=lambda p: p.stat().st_mtime)
+    for old in files[:max(0, len(files) - _MAX_SPILL_FILES + 1)]:
+        old.unlink(missing_ok=True)
 
 
 class ExecTool(Tool):
     """Tool to execute shell commands."""
     
+    writes_workspace = True
+    
     def __init__(
         self,
         timeout: int = 60,
@@ -19,6 +150,12 @@ class ExecTool(Tool):
         deny_patterns: list[str] | None = None,
         allow_patterns: list[str] | None = None,
         restrict_to_workspace: bool = False,
+        max_output_chars: int = 10000,
+        kill_after_bytes: int = 0,
+        spill_dir: Path | None = None,
+        sessions: ShellSessionManager | None = None,
+        limits: ResourceLimits | None = None,
+        kill_grace: float = 2.0,
     ):
         self.timeout = timeout
         self.working_dir = working_dir
@@ -34,6 +171,17 @@ class ExecTool(Tool):
         ]
         self.allow_patterns = allow_patterns or []
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_output_chars = max_output_chars
+        self.kill_after_bytes = kill_after_bytes
+        self.spill_dir = spill_dir
+        self.sessions = sessions
+        self.limits = limits or ResourceLimits()
+        self.kill_grace = kill_grace
+        self._session_key: str | None = None
+    
+    def set_context(self, channel: str, chat_id: str) -> None:
+        """Set the conversation whose persistent shell session is used."""
+        self._session_key = f"{channel}:{chat_id}"
     
     @property
     def name(self) -> str:
@@ -41,72 +189,192 @@ class ExecTool(Tool):
     
     @property
     def description(self) -> str:
+        if self.sessions is not None:
+            return (
+                "Execute a shell command and return its output. Use with caution. Commands run in a "
+                "persistent shell for this conversation, so cd, exported variables and activated "
+                "virtualenvs carry over between calls."
+            )
         return "Execute a shell command and return its output. Use with caution."
     
     @property
     def parameters(self) -> dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "command": {
-                    "type": "string",
-                    "description": "The shell command to execute"
-                },
-                "working_dir": {
-                    "type": "string",
-                    "description": "Optional working directory for the command"
-                }
+        properties: dict[str, Any] = {
+            "command": {
+                "type": "string",
+                "description": "The shell command to execute"
             },
-            "required": ["command"]
+            "working_dir": {
+                "type": "string",
+                "description": "Optional working directory for the command"
+            }
         }
+        if self.sessions is not None:
+            properties["working_dir"]["description"] += " (runs in a fresh shell instead of the persistent one)"
+            properties["reset_session"] = {
+                "type": "boolean",
+                "description": "Restart the persistent shell before running the command"
+            }
+        return {"type": "object", "properties": properties, "required": ["command"]}
     
-    async def execute(self, command: str, working_dir: str | None = None, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        command: str,
+        working_dir: str | None = None,
+        reset_session: bool = False,
+        **kwargs: Any,
+    ) -> str:
         cwd = working_dir or self.working_dir or os.getcwd()
         guard_error = self._guard_command(command, cwd)
         if guard_error:
             return guard_error
         
+        if self.sessions is not None and self._session_key and not working_dir:
+            return await self._execute_in_session(command, cwd, reset_session)
+        
+        cgroup = self.limits.create_cgroup()
         try:
-            process = await asyncio.create_subprocess_shell(
+            process = await self.limits.spawn_shell(
                 command,
+                cgroup,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
             )
             
+            stdout = self._new_capture("stdout")
+            stderr = self._new_capture("stderr")
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                killed = await asyncio.wait_for(
+                    self._pump(process, stdout, stderr),
                     timeout=self.timeout
                 )
             except asyncio.TimeoutError:
-                process.kill()
+                await terminate_process_group(process, self.kill_grace)
                 return f"Error: Command timed out after {self.timeout} seconds"
+            except asyncio.CancelledError:
+                # Turn deadline hit: don't leave the command running
+                kill_process_group(process)
+                raise
+            finally:
+                await stdout.close()
+                await stderr.close()
             
             output_parts = []
             
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
+            if stdout.total:
+                output_parts.append(stdout.text())
             
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
+            if stderr.total:
+                stderr_text = stderr.text()
                 if stderr_text.strip():
                     output_parts.append(f"STDERR:\n{stderr_text}")
             
-            if process.returncode != 0:
+            if killed:
+                output_parts.append(
+                    f"\nKilled: output exceeded {self.kill_after_bytes:,} bytes"
+                )
+            elif process.returncode is not None and process.returncode < 0:
+                output_parts.append(f"\nKilled by signal {-process.returncode}{self._limit_hint()}")
+            elif process.returncode != 0:
                 output_parts.append(f"\nExit code: {process.returncode}")
             
-            result = "\n".join(output_parts) if output_parts else "(no output)"
-            
-            # Truncate very long output
-            max_len = 10000
-            if len(result) > max_len:
-                result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
+            notes = [n for n in (stdout.summary(), stderr.summary()) if n]
+            if notes:
+                output_parts.append("\n" + "\n".join(notes))
             
-            return result
+            return "\n".join(output_parts) if output_parts else "(no output)"
             
         except Exception as e:
             return f"Error executing command: {str(e)}"
+        finally:
+            await run_io(release_cgroup, cgroup)
+    
+    def _limit_hint(self) -> str:
+        """Mention the configured limits so a killed command can be understood."""
+        active = [
+            f"{label} {value}" for label, value in (
+                ("cpu_seconds", self.limits.cpu_seconds),
+                ("address_space_mb", self.limits.address_space_mb),
+                ("max_processes", self.limits.max_processes),
+            ) if value
+        ]
+        return f" (resource limits: {', '.join(active)})" if active else ""
+    
+    async def _execute_in_session(self, command: str, cwd: str, reset: bool) -> str:
+        """Run a command in the conversation's persistent shell (stdout and stderr are merged)."""
+        assert self.sessions is not None and self._session_key is not None
+        key = self._session_key
+        if reset:
+            self.sessions.discard(key)
+        output = self._new_capture("output")
+        try:
+            session = await self.sessions.acquire(key, cwd)
+            async with session.lock:
+                exit_code = await asyncio.wait_for(
+                    session.run(command, output, self.kill_after_bytes),
+                    timeout=self.timeout
+                )
+        except asyncio.TimeoutError:
+            self.sessions.discard(key)
+            return f"Error: Command timed out after {self.timeout} seconds (shell session was reset)"
+        except asyncio.CancelledError:
+            self.sessions.discard(key)
+            raise
+        except ShellSessionError as e:
+            self.sessions.discard(key)
+            text = output.text() if output.total else ""
+            return f"{text}\nError: {e} (shell session was reset)".lstrip()
+        except Exception as e:
+            self.sessions.discard(key)
+            return f"Error executing command: {str(e)}"
+        finally:
+            await output.close()
+        
+        output_parts = [output.text()] if output.total else []
+        if exit_code != 0:
+            output_parts.append(f"\nExit code: {exit_code}")
+        if note := output.summary():
+            output_parts.append("\n" + note)
+        return "\n".join(output_parts) if output_parts else "(no output)"
+    
+    def _new_capture(self, stream: str) -> "OutputCapture":
+        spill_path = None
+        if self.spill_dir:
+            spill_path = self.spill_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.{stream}.log"
+        return OutputCapture(
+            stream,
+            head_bytes=self.max_output_chars * 2 // 3,
+            tail_bytes=self.max_output_chars // 3,
+            spill_path=spill_path,
+        )
+    
+    async def _pump(
+        self, process: asyncio.subprocess.Process, stdout: "OutputCapture", stderr: "OutputCapture"
+    ) -> bool:
+        """
+        Stream both pipes into bounded captures.
+        
+        Returns:
+            True if the process was killed for exceeding the output byte limit.
+        """
+        killed = False
+        
+        async def drain(reader: asyncio.StreamReader | None, capture: OutputCapture) -> None:
+            nonlocal killed
+            if reader is None:
+                return
+            while chunk := await reader.read(_READ_CHUNK):
+                if killed:
+                    continue  # discard what is still buffered until the pipe closes
+                capture.feed(chunk)
+                if self.kill_after_bytes and stdout.total + stderr.total > self.kill_after_bytes:
+                    killed = True
+                    kill_process_group(process)
+        
+        await asyncio.gather(drain(process.stdout, stdout), drain(process.stderr, stderr))
+        await process.wait()
+        return killed
 
     def _guard_command(self, command: str, cwd: str) -> str | None:
         """Best-effort safety guard for potentially destructive commands."""
@@ -0,0 +1,262 @@
+"""Persistent pty-backed shell sessions for the exec tool."""
+
+import asyncio
+import os
+import re
+import shutil
+import signal
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from nanobot.agent.tools.limits import ResourceLimits, release_cgroup
+from nanobot.utils.io_executor import get_io_executor, run_io
+
+if TYPE_CHECKING:
+    from nanobot.agent.tools.shell import OutputCapture
+
+_READ_CHUNK = 64 * 1024
+# Commands longer than this are written to a script and sourced, so the pty
+# never holds a half-written command if the shell stops reading
+_INLINE_COMMAND_BYTES = 1024
+
+
+class ShellSessionError(Exception):
+    """The shell session died or could not run the command; it should be discarded."""
+
+
+def _shell_argv() -> list[str]:
+    bash = shutil.which("bash")
+    if bash:
+        return [bash, "--noprofile", "--norc", "--noediting"]
+    return ["/bin/sh"]
+
+
+class ShellSession:
+    """
+    One long-lived shell attached to a pseudo-terminal.
+
+    Commands are written to the shell followed by a printf of a random
+    sentinel and the exit status, and output is read until that sentinel
+    appears. The pty is put in raw mode so input is not echoed and line
+    endings are left alone. Long commands are written to a temporary script
+    that the shell sources.
+    """
+
+    def __init__(self, key: str, cwd: str, limits: ResourceLimits | None = None):
+        self.key = key
+        self.cwd = cwd
+        self.limits = limits or ResourceLimits()
+        self._cgroup: Path | None = None
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self._process: asyncio.subprocess.Process | None = None
+        self._master: int | None = None
+        self._reader: asyncio.StreamReader | None = None
+        self._transport: asyncio.ReadTransport | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        import pty
+        import tty
+
+        master, slave = pty.openpty()
+        tty.setraw(slave)
+        env = {**os.environ, "TERM": "dumb", "PAGER": "cat", "GIT_PAGER": "cat", "PS1": "", "PS2": ""}
+        self._cgroup = self.limits.create_cgroup()
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self.limits.wrap_argv(_shell_argv(), self._cgroup),
+                stdin=slave,
+                stdout=slave,
+                stderr=slave,
+                cwd=self.cwd,
+                env=env,
+                **self.limits.popen_kwargs(),
+            )
+        except Exception:
+            os.close(master)
+            await run_io(release_cgroup, self._cgroup)
+            self._cgroup = None
+            raise
+        finally:
+            os.close(slave)
+        self._master = master
+        self._reader = asyncio.StreamReader(limit=_READ_CHUNK * 4)
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(self._reader),
+            os.fdopen(os.dup(master), "rb", 0),
+        )
+
+    async def run(self, command: str, capture: "OutputCapture", kill_after_bytes: int = 0) -> int:
+        """
+        Run one command in the session, streaming its output into `capture`.
+
+        Returns:
+            The command's exit status.
+
+        Raises:
+            ShellSessionError: If the shell exited or printed more than
+                kill_after_bytes; the caller must discard the session.
+        """
+        if not self.alive or self._reader is None or self._master is None:
+            raise ShellSessionError("shell session is not running")
+        self.last_used = time.monotonic()
+        marker = f"__NANOBOT_DONE_{uuid.uuid4().hex}__".encode()
+        done = re.compile(b"\n" + re.escape(marker) + rb":(\d+)\n")
+        script_path: str | None = None
+        if len(command.encode("utf-8")) > _INLINE_COMMAND_BYTES:
+            script_path = await run_io(_write_script, command)
+            command = f". '{script_path}'"
+        try:
+            script = f"{command}\nprintf '\\n%s:%s\\n' '{marker.decode()}' \"$?\"\n"
+            await self._write_all(script.encode("utf-8"))
+            return await self._read_until(done, len(marker) + 16, capture, kill_after_bytes)
+        finally:
+            if script_path:
+                await run_io(_remove_quietly, script_path)
+
+    async def _write_all(self, data: bytes) -> None:
+        """Write all of `data` to the non-blocking pty, waiting for it to drain when full."""
+        assert self._master is not None
+        loop = asyncio.get_running_loop()
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(self._master, view):]
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                raise ShellSessionError(f"could not write to the shell: {e}") from e
+            if not view:
+                break
+            writable = loop.create_future()
+            loop.add_writer(self._master, lambda: writable.done() or writable.set_result(None))
+            try:
+                await writable
+            finally:
+                loop.remove_writer(self._master)
+
+    async def _read_until(
+        self, done: re.Pattern[bytes], keep: int, capture: "OutputCapture", kill_after_bytes: int
+    ) -> int:
+        """Feed output into `capture` until the sentinel matched by `done`; return the exit status."""
+        assert self._reader is not None
+        pending = b""
+        while True:
+            try:
+                chunk = await self._reader.read(_READ_CHUNK)
+            except OSError:  # EIO from the pty once the shell is gone
+                chunk = b""
+            if not chunk:
+                capture.feed(pending)
+                raise ShellSessionError("shell session exited")
+            data = pending + chunk
+            match = done.search(data)
+            if match:
+                capture.feed(data[:match.start()])
+                self.last_used = time.monotonic()
+                return int(match.group(1))
+            capture.feed(data[:-keep])
+            pending = data[-keep:]
+            if kill_after_bytes and capture.total > kill_after_bytes:
+                raise ShellSessionError(f"output exceeded {kill_after_bytes:,} bytes")
+
+    def close(self) -> None:
+        """Kill the shell and everything it started."""
+        if self._process is not None and self._process.returncode is None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._master is not None:
+            try:
+                os.close(self._master)
+            except OSError:
+                pass
+            self._master = None
+        if self._cgroup is not None:
+            # Draining the cgroup can take a while; don't hold up the event loop for it
+            get_io_executor().submit(release_cgroup, self._cgroup)
+            self._cgroup = None
+
+
+def _write_script(command: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="nanobot-cmd-", suffix=".sh")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(command + "\n")
+    return path
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class ShellSessionManager:
+    """
+    Keeps at most `max_sessions` shells, one per conversation session key.
+
+    Sessions idle for longer than `idle_seconds` are closed on the next
+    access; when the cap is reached the least recently used idle session is
+    evicted.
+    """
+
+    def __init__(self, max_sessions: int = 8, idle_seconds: int = 900, limits: ResourceLimits | None = None):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.limits = limits
+        self._sessions: dict[str, ShellSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def acquire(self, key: str, cwd: str) -> ShellSession:
+        """Return the live session for `key`, starting one if needed."""
+        self._reap_idle()
+        session = self._sessions.get(key)
+        if session and session.alive:
+            return session
+        if session:
+            self.discard(key)
+        if len(self._sessions) >= self.max_sessions:
+            idle = [s for s in self._sessions.values() if not s.lock.locked()]
+            if not idle:
+                raise ShellSessionError(f"all {self.max_sessions} shell sessions are busy")
+            self.discard(min(idle, key=lambda s: s.last_used).key)
+        session = ShellSession(key, cwd, self.limits)
+        await session.start()
+        self._sessions[key] = session
+        logger.debug(f"Started shell session for {key}")
+        return session
+
+    def discard(self, key: str) -> None:
+        session = self._sessions.pop(key, None)
+        if session:
+            session.close()
+
+    def close_all(self) -> None:
+        for key in list(self._sessions):
+            self.discard(key)
+
+    def _reap_idle(self) -> None:
+        if not self.idle_seconds:
+            return
+        cutoff = time.monotonic() - self.idle_seconds
+        for key, session in list(self._sessions.items()):
+            if session.last_used < cutoff and not session.lock.locked():
+                logger.debug(f"Closing idle shell session for {key}")
+                self.discard(key)
@@ -2,6 +2,7 @@
 
 from typing import Any, TYPE_CHECKING
 
+from nanobot.agent.subagent import SUBAGENT_PRIORITIES
 from nanobot.agent.tools.base import Tool
 
 if TYPE_CHECKING:
@@ -20,11 +21,13 @@ class SpawnTool(Tool):
         self._manager = manager
         self._origin_channel = "cli"
         self._origin_chat_id = "direct"
+        self._origin_sender_id = "user"
     
-    def set_context(self, channel: str, chat_id: str) -> None:
-        """Set the origin context for subagent announcements."""
+    def set_context(self, channel: str, chat_id: str, sender_id: str = "user") -> None:
+        """Set the origin context for subagent announcements and quota accounting."""
         self._origin_channel = channel
         self._origin_chat_id = chat_id
+        self._origin_sender_id = sender_id
     
     @property
     def name(self) -> str:
@@ -35,7 +38,8 @@ class SpawnTool(Tool):
         return (
             "Spawn a subagent to handle a task in the background. "
             "Use this for complex or time-consuming tasks that can run independently. "
-            "The subagent will complete the task and report back when done."
+            "The subagent will complete the task and report back when done. "
+            "If too many subagents are running it waits in a queue; higher priority ones start first."
         )
     
     @property
@@ -51,15 +55,24 @@ class SpawnTool(Tool):
                     "type": "string",
                     "description": "Optional short label for the task (for display)",
                 },
+                "priority": {
+                    "type": "string",
+                    "enum": list(SUBAGENT_PRIORITIES),
+                    "description": "Queue priority if all subagent slots are busy (default: normal)",
+                },
             },
             "required": ["task"],
         }
     
-    async def execute(self, task: str, label: str | None = None, **kwargs: Any) -> str:
+    async def execute(
+        self, task: str, label: str | None = None, priority: str = "normal", **kwargs: Any
+    ) -> str:
         """Spawn a subagent to execute the given task."""
         return await self._manager.spawn(
             task=task,
             label=label,
             origin_channel=self._origin_channel,
             origin_chat_id=self._origin_chat_id,
+            origin_sender_id=self._origin_sender_id,
+            priority=priority,
         )
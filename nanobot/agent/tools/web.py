@@ -1,33 +1,56 @@
-"""Web tools: web_search and web_fetch."""
+"""Web tools: web_search, web_fetch and web_fetch_many."""
 
-import html
+import asyncio
+import codecs
 import json
 import os
 import re
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from urllib.parse import urlparse
 
 import httpx
+from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.search_cache import SearchCache
+from nanobot.agent.tools.web_cache import CachedPage, WebCache
+from nanobot.utils.cpu_executor import run_cpu
+from nanobot.utils.cpu_tasks import extract_content
+from nanobot.utils.http import get_http_client
+from nanobot.utils.io_executor import run_io
+
+if TYPE_CHECKING:
+    from nanobot.agent.tools.registry import ToolRegistry
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
-MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
+# Non text/* types that web_fetch still downloads
+_TEXT_TYPES = {"application/json", "application/xml", "application/javascript", "application/x-javascript"}
+# Bodies at least this long are extracted in the CPU worker pool
+_OFFLOAD_CHARS = 20_000
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
 
 
-def _strip_tags(text: str) -> str:
-    """Remove HTML tags and decode entities."""
-    text = re.sub(r'<script[\s\S]*?</script>', '', text, flags=re.I)
-    text = re.sub(r'<style[\s\S]*?</style>', '', text, flags=re.I)
-    text = re.sub(r'<[^>]+>', '', text)
-    return html.unescape(text).strip()
+def _is_textual(ctype: str) -> bool:
+    """Whether a Content-Type is worth downloading as text (an absent type is sniffed later)."""
+    mime = ctype.split(";")[0].strip().lower()
+    return (
+        not mime
+        or mime.startswith("text/")
+        or mime in _TEXT_TYPES
+        or mime.endswith(("+json", "+xml"))
+    )
 
 
-def _normalize(text: str) -> str:
-    """Normalize whitespace."""
-    text = re.sub(r'[ \t]+', ' ', text)
-    return re.sub(r'\n{3,}', '\n\n', text).strip()
+def _charset(r: httpx.Response, head: bytes) -> str:
+    """Charset from the Content-Type header, else an HTML meta tag, else UTF-8."""
+    charset = r.charset_encoding
+    if not charset and (match := _META_CHARSET_RE.search(head[:2048])):
+        charset = match.group(1).decode("ascii")
+    try:
+        return codecs.lookup(charset).name if charset else "utf-8"
+    except LookupError:
+        return "utf-8"
 
 
 def _validate_url(url: str) -> tuple[bool, str]:
@@ -47,6 +70,7 @@ class WebSearchTool(Tool):
     """Search the web using Brave Search API."""
     
     name = "web_search"
+    idempotent = True
     description = "Search the web. Returns titles, URLs, and snippets."
     parameters = {
         "type": "object",
@@ -57,24 +81,29 @@ class WebSearchTool(Tool):
         "required": ["query"]
     }
     
-    def __init__(self, api_key: str | None = None, max_results: int = 5):
+    def __init__(self, api_key: str | None = None, max_results: int = 5, cache: SearchCache | None = None):
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY", "")
         self.max_results = max_results
+        self.cache = cache
     
     async def execute(self, query: str, count: int | None = None, **kwargs: Any) -> str:
         if not self.api_key:
             return "Error: BRAVE_API_KEY not configured"
         
+        n = min(max(count or self.max_results, 1), 10)
+        if self.cache:
+            return await self.cache.get_or_fetch(query, n, lambda: self._search(query, n))
+        return await self._search(query, n)
+    
+    async def _search(self, query: str, n: int) -> str:
         try:
-            n = min(max(count or self.max_results, 1), 10)
-            async with httpx.AsyncClient() as client:
-                r = await client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": n},
-                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                    timeout=10.0
-                )
-                r.raise_for_status()
+            r = await get_http_client().get(
+                "https://api.search.brave.com/res/v1/web/search",
+                params={"q": query, "count": n},
+                headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+                timeout=10.0
+            )
+            r.raise_for_status()
             
             results = r.json().get("web", {}).get("results", [])
             if not results:
@@ -94,6 +123,7 @@ class WebFetchTool(Tool):
     """Fetch and extract content from a URL using Readability."""
     
     name = "web_fetch"
+    idempotent = True
     description = "Fetch URL and extract readable content (HTML → markdown/text)."
     parameters = {
         "type": "object",
@@ -105,12 +135,12 @@ class WebFetchTool(Tool):
         "required": ["url"]
     }
     
-    def __init__(self, max_chars: int = 50000):
+    def __init__(self, max_chars: int = 50000, cache: WebCache | None = None, max_bytes: int = 5_000_000):
         self.max_chars = max_chars
+        self.cache = cache
+        self.max_bytes = max_bytes
     
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
         max_chars = maxChars or self.max_chars
 
         # Validate URL before fetching
@@ -119,45 +149,192 @@ class WebFetchTool(Tool):
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url})
 
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
-            
-            ctype = r.headers.get("content-type", "")
-            
-            # JSON
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2), "json"
-            # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
-                extractor = "readability"
-            else:
-                text, extractor = r.text, "raw"
-            
-            truncated = len(text) > max_chars
-            if truncated:
-                text = text[:max_chars]
-            
-            return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
-                              "extractor": extractor, "truncated": truncated, "length": len(text), "text": text})
+            page, cache_status = await self._get_page(url, extractMode)
         except Exception as e:
             return json.dumps({"error": str(e), "url": url})
+        
+        text = page.text
+        truncated = len(text) > max_chars or page.partial
+        if len(text) > max_chars:
+            text = text[:max_chars]
+        
+        return json.dumps({"url": url, "finalUrl": page.final_url, "status": page.status,
+                          "extractor": page.extractor, "truncated": truncated, "length": len(text),
+                          "cache": cache_status, "text": text})
+    
+    async def _get_page(self, url: str, mode: str) -> tuple[CachedPage, str]:
+        """
+        Fetch a page through the on-disk cache.
+        
+        Returns:
+            The page and its cache status: "hit" (fresh copy), "revalidated"
+            (server answered 304), "miss" (downloaded) or "off" (no cache).
+        """
+        cached = await run_io(self.cache.get, url, mode) if self.cache else None
+        if cached and cached.fresh:
+            return cached, "hit"
+        
+        headers = {"User-Agent": USER_AGENT}
+        if cached:
+            headers.update(cached.validators())
+        async with get_http_client().stream(
+            "GET", url, headers=headers, follow_redirects=True, timeout=30.0
+        ) as r:
+            if cached and r.status_code == 304:
+                await run_io(self.cache.refresh, cached, r.headers)
+                return cached, "revalidated"
+            r.raise_for_status()
+            body, text, partial = await self._download(r)
+        
+        ctype = r.headers.get("content-type", "")
+        if len(text) >= _OFFLOAD_CHARS:
+            content, extractor = await run_cpu(extract_content, text, ctype, mode, partial)
+        else:
+            content, extractor = extract_content(text, ctype, mode, partial)
+        page = CachedPage(url=url, mode=mode, final_url=str(r.url), status=r.status_code,
+                          headers={}, extractor=extractor, text=content, partial=partial)
+        if not self.cache:
+            return page, "off"
+        await run_io(self.cache.put, page, body, r.headers)
+        return page, "miss"
+    
+    async def _download(self, r: httpx.Response) -> tuple[bytes, str, bool]:
+        """
+        Read at most `max_bytes` of a streamed response, decoding as it arrives.
+        
+        Binary content types are refused from the headers alone, before any
+        of the body is read. Returns (raw body, decoded text, cut short).
+        """
+        ctype = r.headers.get("content-type", "")
+        if not _is_textual(ctype):
+            raise ValueError(f"Unsupported content type '{ctype.split(';')[0]}' (only text is fetched)")
+        length = r.headers.get("content-length", "")
+        if length.isdigit() and int(length) > self.max_bytes:
+            logger.debug(f"web_fetch: {r.url} is {length} bytes, reading the first {self.max_bytes}")
+        
+        body = bytearray()
+        parts: list[str] = []
+        decoder = None
+        partial = False
+        async for chunk in r.aiter_bytes():
+            if decoder is None:
+                # Untyped responses are sniffed: a NUL byte means binary
+                if not ctype and b"\0" in chunk[:1024]:
+                    raise ValueError("Response looks like binary data (only text is fetched)")
+                decoder = codecs.getincrementaldecoder(_charset(r, chunk))(errors="replace")
+            if len(body) + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - len(body)]
+                partial = True
+            body += chunk
+            parts.append(decoder.decode(chunk))
+            if partial:
+                break
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+        return bytes(body), "".join(parts), partial
+
+
+class WebFetchManyTool(Tool):
+    """
+    Fetch several URLs concurrently with WebFetchTool and return one consolidated result.
+
+    Given the registry the fetch tool is registered in, each URL goes through it,
+    so web_fetch's shared concurrency cap, timeout and metrics apply per URL.
+    """
+    
+    name = "web_fetch_many"
+    idempotent = True
+    description = (
+        "Fetch several URLs at once and extract their readable content. "
+        "Prefer this over repeated web_fetch calls when you already have a list of links."
+    )
+    
+    def __init__(
+        self,
+        fetch_tool: WebFetchTool,
+        max_urls: int = 10,
+        concurrency: int = 4,
+        per_host: int = 2,
+        max_total_chars: int = 100000,
+        registry: "ToolRegistry | None" = None,
+    ):
+        self.fetch_tool = fetch_tool
+        self.registry = registry
+        self.max_urls = max_urls
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.max_total_chars = max_total_chars
+    
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "urls": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "maxItems": self.max_urls,
+                    "description": "URLs to fetch",
+                },
+                "extractMode": {"type": "string", "enum": ["markdown", "text"], "default": "markdown"},
+                "maxCharsPerUrl": {"type": "integer", "minimum": 100},
+                "maxTotalChars": {"type": "integer", "minimum": 100},
+            },
+            "required": ["urls"],
+        }
+    
+    async def execute(
+        self,
+        urls: list[str],
+        extractMode: str = "markdown",
+        maxCharsPerUrl: int | None = None,
+        maxTotalChars: int | None = None,
+        **kwargs: Any,
+    ) -> str:
+        urls = list(dict.fromkeys(urls))[:self.max_urls]
+        total_budget = min(maxTotalChars or self.max_total_chars, self.max_total_chars)
+        per_doc = min(maxCharsPerUrl or self.fetch_tool.max_chars, total_budget)
+        
+        gate = asyncio.Semaphore(self.concurrency)
+        hosts: dict[str, asyncio.Semaphore] = {}
+        
+        async def fetch(url: str) -> dict[str, Any]:
+            host_gate = hosts.setdefault(urlparse(url).netloc.lower(), asyncio.Semaphore(self.per_host))
+            params = {"url": url, "extractMode": extractMode, "maxChars": per_doc}
+            async with host_gate, gate:
+                if self.registry is not None:
+                    raw = await self.registry.execute(self.fetch_tool.name, params)
+                else:
+                    raw = await self.fetch_tool.execute(**params)
+            try:
+                return json.loads(raw)
+            except json.JSONDecodeError:
+                return {"error": raw, "url": url}  # Plain-text error from the registry (timeout, ...)
+        
+        results = await asyncio.gather(*(fetch(url) for url in urls))
+        _apply_total_budget([r for r in results if "text" in r], total_budget)
+        return json.dumps({
+            "results": results,
+            "fetched": sum(1 for r in results if "error" not in r),
+            "failed": sum(1 for r in results if "error" in r),
+            "totalChars": sum(r.get("length", 0) for r in results),
+        })
+
+
+def _apply_total_budget(docs: list[dict[str, Any]], budget: int) -> None:
+    """
+    Trim document texts in place so together they fit in `budget` characters.
     
-    def _to_markdown(self, html: str) -> str:
-        """Convert HTML to markdown."""
-        # Convert links, headings, lists before stripping tags
-        text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
-                      lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
-        text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
-                      lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
-        text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
-        text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
-        text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
-        return _normalize(_strip_tags(text))
+    Short documents keep all their text and the rest is shared equally among
+    the longer ones.
+    """
+    remaining = budget
+    by_length = sorted(docs, key=lambda d: len(d["text"]))
+    for i, doc in enumerate(by_length):
+        share = remaining // (len(by_length) - i)
+        if len(doc["text"]) > share:
+            doc["text"] = doc["text"][:share]
+            doc["truncated"] = True
+            doc["length"] = share
+        remaining -= len(doc["text"])
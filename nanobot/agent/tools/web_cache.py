@@ -0,0 +1,171 @@
+"""On-disk HTTP cache for web_fetch."""
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+# Response headers kept with a cached page
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires", "date")
+_MAX_AGE_RE = re.compile(r"\bmax-age\s*=\s*(\d+)", re.I)
+
+
+@dataclass
+class CachedPage:
+    """A fetched page: the raw response plus what web_fetch extracted from it."""
+    url: str
+    mode: str
+    final_url: str
+    status: int
+    headers: dict[str, str]
+    extractor: str
+    text: str
+    partial: bool = False  # Body was cut off at the download byte limit
+    stored_at: float = field(default_factory=time.time)
+    expires_at: float = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this page."""
+        headers = {}
+        if etag := self.headers.get("etag"):
+            headers["If-None-Match"] = etag
+        if modified := self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = modified
+        return headers
+
+
+def cache_policy(headers: Any, default_ttl: int) -> tuple[bool, int]:
+    """
+    Decide whether a response may be stored and for how many seconds it is fresh.
+
+    `no-store` is never stored; `no-cache` is stored but always revalidated.
+    Pages without freshness information get `default_ttl`.
+    """
+    cache_control = (headers.get("cache-control") or "").lower()
+    if "no-store" in cache_control:
+        return False, 0
+    if "no-cache" in cache_control:
+        return True, 0
+    if match := _MAX_AGE_RE.search(cache_control):
+        return True, int(match.group(1))
+    if expires := headers.get("expires"):
+        try:
+            return True, max(0, int(parsedate_to_datetime(expires).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return True, 0  # An invalid Expires means already expired
+    return True, default_ttl
+
+
+class WebCache:
+    """
+    Pages stored under `root` as `<key>.json` (metadata and extracted text)
+    and `<key>.body` (raw response body), keyed by URL and extract mode.
+
+    Files are touched on every hit, and when the cache grows past `max_bytes`
+    the least recently used entries are removed.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 200 * 1024 * 1024, default_ttl: int = 3600):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._approx_size: int | None = None
+
+    @staticmethod
+    def key(url: str, mode: str) -> str:
+        return hashlib.sha256(f"{mode}\0{url}".encode("utf-8")).hexdigest()[:32]
+
+    def get(self, url: str, mode: str) -> CachedPage | None:
+        meta = self.root / f"{self.key(url, mode)}.json"
+        try:
+            data = json.loads(meta.read_text(encoding="utf-8"))
+            os.utime(meta)
+            return CachedPage(**data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"Dropping unreadable web cache entry {meta.name}: {e}")
+            self._remove(meta.stem)
+            return None
+
+    def put(self, page: CachedPage, body: bytes, headers: Any) -> bool:
+        """Store a page if its headers allow it. Returns False if it was not stored."""
+        storable, ttl = cache_policy(headers, self.default_ttl)
+        if not storable:
+            return False
+        page.headers = {k: headers[k] for k in _KEPT_HEADERS if k in headers}
+        page.stored_at = time.time()
+        page.expires_at = page.stored_at + ttl
+        key = self.key(page.url, page.mode)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if self._approx_size is None:
+                self._approx_size = self.size()
+            (self.root / f"{key}.body").write_bytes(body)
+            self._approx_size += len(body) + self._write_meta(key, page)
+        except OSError as e:
+            logger.warning(f"Failed to cache {page.url}: {e}")
+            return False
+        # Only walk the directory once the running estimate says the quota may be exceeded
+        if self._approx_size > self.max_bytes:
+            self._approx_size = self._enforce_quota()
+        return True
+
+    def refresh(self, page: CachedPage, headers: Any) -> None:
+        """Extend a page's freshness after a 304 Not Modified."""
+        _, ttl = cache_policy(headers, self.default_ttl)
+        for name in ("etag", "last-modified", "cache-control", "expires"):
+            if name in headers:
+                page.headers[name] = headers[name]
+        page.expires_at = time.time() + ttl
+        try:
+            self._write_meta(self.key(page.url, page.mode), page)
+        except OSError as e:
+            logger.warning(f"Failed to refresh cached {page.url}: {e}")
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*") if p.is_file()) if self.root.exists() else 0
+
+    def _write_meta(self, key: str, page: CachedPage) -> int:
+        tmp = self.root / f"{key}.json.tmp"
+        data = json.dumps(asdict(page), ensure_ascii=False).encode("utf-8")
+        tmp.write_bytes(data)
+        os.replace(tmp, self.root / f"{key}.json")
+        return len(data)
+
+    def _enforce_quota(self) -> int:
+        """Evict least recently used entries until under quota; returns the new total size."""
+        entries: dict[str, tuple[float, int]] = {}
+        for path in self.root.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            key = path.name.split(".", 1)[0]
+            used, size = entries.get(key, (0.0, 0))
+            # The metadata file is touched on every hit, so its mtime is the last use
+            used = max(used, stat.st_mtime) if path.suffix == ".json" else used
+            entries[key] = (used, size + stat.st_size)
+
+        total = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+        return total
+
+    def _remove(self, key: str) -> None:
+        for suffix in (".json", ".body"):
+            (self.root / f"{key}{suffix}").unlink(missing_ok=True)
@@ -13,6 +13,7 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import DiscordConfig
+from nanobot.utils.http import get_http_client
 
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
@@ -40,7 +41,7 @@ class DiscordChannel(BaseChannel):
             return
 
         self._running = True
-        self._http = httpx.AsyncClient(timeout=30.0)
+        self._http = get_http_client()
 
         while self._running:
             try:
@@ -68,9 +69,8 @@ class DiscordChannel(BaseChannel):
         if self._ws:
             await self._ws.close()
             self._ws = None
-        if self._http:
-            await self._http.aclose()
-            self._http = None
+        # The HTTP client is shared; it is closed on gateway shutdown
+        self._http = None
 
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Discord REST API."""
@@ -182,11 +182,19 @@ def gateway(
     from nanobot.bus.queue import MessageBus
     from nanobot.providers.litellm_provider import LiteLLMProvider
     from nanobot.agent.loop import AgentLoop
+    from nanobot.agent.tools.registry import ToolLimiter
     from nanobot.channels.manager import ChannelManager
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
     from nanobot.webapi import WebAPIState, create_web_app
+    from nanobot.utils.http import HttpSettings, close_http_client, configure_http
+    from nanobot.utils.cpu_executor import (
+        configure_cpu_executor,
+        shutdown_cpu_executor,
+        warm_cpu_executor,
+    )
+    from nanobot.utils.io_executor import LoopLagMonitor, configure_io_executor
     from uvicorn import Config as UvicornConfig
     from uvicorn import Server as UvicornServer
     
@@ -197,6 +205,11 @@ def gateway(
     console.print(f"{__logo__} Starting nanobot gateway...")
     
     config = load_config()
+    configure_io_executor(config.gateway.io_workers)
+    configure_cpu_executor(config.gateway.cpu_workers, config.gateway.cpu_queue)
+    warm_cpu_executor()
+    configure_http(HttpSettings(**config.gateway.http.model_dump()))
+    loop_lag = LoopLagMonitor()
     
     # Create components
     bus = MessageBus()
@@ -234,6 +247,16 @@ def gateway(
         exec_config=config.tools.exec,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        quota_config=config.agents.quota,
+        deadlines_config=config.agents.deadlines,
+        loop_guard_config=config.agents.loop_guard,
+        subagents_config=config.agents.subagents,
+        results_config=config.tools.results,
+        python_config=config.tools.python,
+        web_fetch_config=config.tools.web.fetch,
+        web_search_config=config.tools.web.search,
+        tool_limiter=ToolLimiter.from_config(config.tools),
+        exposure_config=config.tools.exposure,
     )
     
     # Set cron callback (needs agent)
@@ -244,6 +267,7 @@ def gateway(
             session_key=f"cron:{job.id}",
             channel=job.payload.channel or "cli",
             chat_id=job.payload.to or "direct",
+            source="cron",
         )
         if job.payload.deliver and job.payload.to:
             from nanobot.bus.events import OutboundMessage
@@ -258,7 +282,7 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        return await agent.process_direct(prompt, session_key="heartbeat", source="heartbeat")
     
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
@@ -297,6 +321,7 @@ def gateway(
             workspace=config.workspace_path,
             gateway_port=web_port,
             config_path=get_config_path(),
+            loop_lag=loop_lag,
         )
         web_app = create_web_app(web_state)
         uvicorn_config = UvicornConfig(
@@ -317,6 +342,7 @@ def gateway(
     
     async def run():
         try:
+            loop_lag.start()
             await cron.start()
             await heartbeat.start()
             tasks = [agent.run(), channels.start_all()]
@@ -330,7 +356,10 @@ def gateway(
             heartbeat.stop()
             cron.stop()
             agent.stop()
+            loop_lag.stop()
             await channels.stop_all()
+            await close_http_client()
+            shutdown_cpu_executor()
     
     asyncio.run(run())
 
@@ -352,8 +381,11 @@ def agent(
     from nanobot.bus.queue import MessageBus
     from nanobot.providers.litellm_provider import LiteLLMProvider
     from nanobot.agent.loop import AgentLoop
+    from nanobot.agent.tools.registry import ToolLimiter
+    from nanobot.utils.http import HttpSettings, configure_http
     
     config = load_config()
+    configure_http(HttpSettings(**config.gateway.http.model_dump()))
     
     api_key = config.get_api_key()
     api_base = config.get_api_base()
@@ -380,13 +412,27 @@ def agent(
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        quota_config=config.agents.quota,
+        deadlines_config=config.agents.deadlines,
+        loop_guard_config=config.agents.loop_guard,
+        subagents_config=config.agents.subagents,
+        results_config=config.tools.results,
+        python_config=config.tools.python,
+        web_fetch_config=config.tools.web.fetch,
+        web_search_config=config.tools.web.search,
+        tool_limiter=ToolLimiter.from_config(config.tools),
+        exposure_config=config.tools.exposure,
     )
     
     if message:
         # Single message mode
         async def run_once():
-            response = await agent_loop.process_direct(message, session_id)
-            console.print(f"\n{__logo__} {response}")
+            try:
+                response = await agent_loop.process_direct(message, session_id)
+                console.print(f"\n{__logo__} {response}")
+            finally:
+                # Kill background jobs, python workers and shell sessions; save quota
+                agent_loop.stop()
         
         asyncio.run(run_once())
     else:
@@ -394,17 +440,20 @@ def agent(
         console.print(f"{__logo__} Interactive mode (Ctrl+C to exit)\n")
         
         async def run_interactive():
-            while True:
-                try:
-                    user_input = console.input("[bold blue]You:[/bold blue] ")
-                    if not user_input.strip():
-                        continue
-                    
-                    response = await agent_loop.process_direct(user_input, session_id)
-                    console.print(f"\n{__logo__} {response}\n")
-                except KeyboardInterrupt:
-                    console.print("\nGoodbye!")
-                    break
+            try:
+                while True:
+                    try:
+                        user_input = console.input("[bold blue]You:[/bold blue] ")
+                        if not user_input.strip():
+                            continue
+                        
+                        response = await agent_loop.process_direct(user_input, session_id)
+                        console.print(f"\n{__logo__} {response}\n")
+                    except KeyboardInterrupt:
+                        console.print("\nGoodbye!")
+                        break
+            finally:
+                agent_loop.stop()
         
         asyncio.run(run_interactive())
 
@@ -728,6 +777,38 @@ def status():
         vllm_status = f"[green]✓ {config.providers.vllm.api_base}[/green]" if has_vllm else "[dim]not set[/dim]"
         console.print(f"vLLM/Local: {vllm_status}")
 
+    _print_tool_metrics()
+
+
+def _print_tool_metrics() -> None:
+    """Print the tool metrics snapshot last written by a running agent."""
+    import time
+
+    from nanobot.agent.tools.metrics import ToolMetrics
+    from nanobot.utils.helpers import get_data_path
+
+    snapshot = ToolMetrics.load_snapshot(get_data_path() / "metrics" / "tools.json")
+    if not snapshot or not snapshot.get("tools"):
+        console.print("\nTool metrics: [dim]none recorded yet[/dim]")
+        return
+
+    updated = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["updatedAt"]))
+    table = Table(title=f"Tool Metrics (updated {updated})")
+    for column in ("Tool", "Scope", "Calls", "Errors", "Timeouts", "Invalid", "p50", "p95", "Max", "Avg size"):
+        table.add_column(column, justify="left" if column in ("Tool", "Scope") else "right")
+
+    def ms(value: float) -> str:
+        return f"{value:.0f}ms" if value < 1000 else f"{value / 1000:.1f}s"
+
+    for tool, scopes in snapshot["tools"].items():
+        for scope, m in scopes.items():
+            table.add_row(
+                tool, scope, str(m["calls"]), str(m["errors"]), str(m["timeouts"]), str(m["invalidParams"]),
+                ms(m["p50Ms"]), ms(m["p95Ms"]), ms(m["maxMs"]), f"{m['meanResultBytes']:,}B",
+            )
+    console.print()
+    console.print(table)
+
 
 if __name__ == "__main__":
     app()
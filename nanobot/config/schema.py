@@ -56,9 +56,51 @@ class AgentDefaults(BaseModel):
     max_tool_iterations: int = 20
 
 
+class QuotaConfig(BaseModel):
+    """Rolling-window usage budgets per sender and per channel (0 = unlimited)."""
+    enabled: bool = False
+    window_seconds: int = 3600
+    sender_tokens: int = 0
+    sender_requests: int = 0
+    channel_tokens: int = 0
+    channel_requests: int = 0
+    deferral_message: str = (
+        "I've hit my usage limit for now, so I can't take this on right away. "
+        "Please try again in about {minutes} minute(s)."
+    )
+
+
+class TurnDeadlinesConfig(BaseModel):
+    """Wall-clock budget per turn in seconds, by source (0 = unlimited)."""
+    interactive: int = 120
+    cron: int = 600
+    heartbeat: int = 300
+    subagent: int = 900
+    channels: dict[str, int] = Field(default_factory=dict)  # Per-channel override for interactive turns
+    finalize_seconds: int = 15  # Reserved at the end of a turn for a best-effort answer
+
+
+class LoopGuardConfig(BaseModel):
+    """Detection of repeated tool calls that make no progress within a turn."""
+    enabled: bool = True
+    repeat_threshold: int = 3  # Identical call+result repeats before acting (cycles: one fewer)
+    max_cycle_length: int = 4  # Longest sequence of calls checked for A-B-A-B style cycles
+    action: str = "warn"  # warn | memoize | stop
+
+
+class SubagentsConfig(BaseModel):
+    """Limits on background subagents."""
+    max_concurrent: int = 3  # Subagents running at once (0 = unlimited); others wait in a queue
+    max_queued: int = 50  # Spawns beyond this many waiting are rejected
+
+
 class AgentsConfig(BaseModel):
     """Agent configuration."""
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
+    quota: QuotaConfig = Field(default_factory=QuotaConfig)
+    deadlines: TurnDeadlinesConfig = Field(default_factory=TurnDeadlinesConfig)
+    loop_guard: LoopGuardConfig = Field(default_factory=LoopGuardConfig)
+    subagents: SubagentsConfig = Field(default_factory=SubagentsConfig)
 
 
 class ProviderConfig(BaseModel):
@@ -81,6 +123,18 @@ class ProvidersConfig(BaseModel):
     minimax: ProviderConfig = Field(default_factory=ProviderConfig)
 
 
+class HttpClientConfig(BaseModel):
+    """Shared outbound HTTP client (web tools, transcription, Discord)."""
+    max_connections: int = 100
+    max_keepalive: int = 20  # Idle connections kept open for reuse
+    keepalive_expiry: float = 30.0  # Seconds an idle connection is kept
+    per_host: int = 8  # Concurrent requests per host (0 = unlimited)
+    connect_timeout: float = 10.0
+    timeout: float = 30.0  # Default read/write timeout; tools may set their own
+    http2: bool = True  # Used when the h2 package is installed
+    proxy: str = ""  # Defaults to HTTPS_PROXY / HTTP_PROXY
+
+
 class GatewayConfig(BaseModel):
     """Gateway/server configuration."""
     host: str = "0.0.0.0"
@@ -90,29 +144,128 @@ class GatewayConfig(BaseModel):
     web_port: int = 18790
     web_token: str = ""
     web_max_heartbeat_file_bytes: int = 20000
+    io_workers: int = 8  # Threads for blocking disk I/O (file tools, sessions, skills)
+    cpu_workers: int = 2  # Processes for HTML extraction and image encoding (0 = run inline)
+    cpu_queue: int = 16  # Jobs waiting for a CPU worker; beyond this, callers run them inline
+    http: HttpClientConfig = Field(default_factory=HttpClientConfig)
 
 
 class WebSearchConfig(BaseModel):
     """Web search tool configuration."""
     api_key: str = ""  # Brave Search API key
     max_results: int = 5
+    cache_ttl: int = 3600  # Seconds a result is reused for the same query (0 = no cache)
+    cache_max_entries: int = 500  # Least recently used queries are dropped beyond this
+
+
+class WebFetchConfig(BaseModel):
+    """Web fetch tool configuration."""
+    max_chars: int = 50000  # Default extracted text returned per page
+    max_bytes: int = 5_000_000  # Download limit per page; longer bodies are cut off, binary types refused
+    cache_enabled: bool = True  # Keep fetched pages under ~/.nanobot/web_cache
+    cache_max_mb: int = 200  # Least recently used pages are evicted beyond this
+    cache_default_ttl: int = 3600  # Seconds a page without Cache-Control/Expires stays fresh
+    batch_max_urls: int = 10  # URLs per web_fetch_many call (0 = disable the tool)
+    batch_concurrency: int = 4  # Pages fetched at once by web_fetch_many
+    batch_per_host: int = 2  # Pages fetched at once from one host
+    batch_max_total_chars: int = 100000  # Text returned by one web_fetch_many call across all pages
 
 
 class WebToolsConfig(BaseModel):
     """Web tools configuration."""
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    fetch: WebFetchConfig = Field(default_factory=WebFetchConfig)
+
+
+class ExecLimitsConfig(BaseModel):
+    """Resource limits for shell commands (0 / empty = no limit)."""
+    cpu_seconds: int = 0  # RLIMIT_CPU per process
+    address_space_mb: int = 0  # RLIMIT_AS per process; memory.max for the whole tree with a cgroup
+    max_open_files: int = 0  # RLIMIT_NOFILE
+    max_processes: int = 0  # pids.max with a cgroup, otherwise RLIMIT_NPROC (counts all of the user's processes)
+    cgroup_parent: str = ""  # Delegated cgroup v2 directory to create one child cgroup per command in
 
 
 class ExecToolConfig(BaseModel):
     """Shell exec tool configuration."""
     timeout: int = 60
+    max_output_chars: int = 10000  # Per stream; the head and tail are kept, the middle is elided
+    kill_after_bytes: int = 50_000_000  # Kill commands that print more than this (0 = never)
+    spill_output: bool = True  # Save full output of truncated streams under <workspace>/.nanobot/exec
+    persistent_sessions: bool = False  # Keep one shell per conversation (POSIX only)
+    max_sessions: int = 8  # Concurrent persistent shells; the least recently used idle one is evicted
+    session_idle_seconds: int = 900  # Close persistent shells unused for this long
+    max_background_jobs: int = 4  # Concurrent exec_background jobs (0 = disable the job tools)
+    background_timeout: int = 3600  # Seconds before a background job is killed (0 = never)
+    job_log_bytes: int = 10_000_000  # Output kept per job in <workspace>/.nanobot/jobs/<id>.log
+    kill_grace_seconds: float = 2.0  # Time between SIGTERM and SIGKILL when a command is stopped
+    limits: ExecLimitsConfig = Field(default_factory=ExecLimitsConfig)
+
+
+class PythonToolConfig(BaseModel):
+    """Python snippet tool backed by warm worker processes (never enabled with restrict_to_workspace)."""
+    enabled: bool = False
+    workers: int = 2  # Warm interpreters kept per workspace
+    max_uses: int = 50  # Snippets a worker runs before it is replaced
+    timeout: int = 60  # Seconds per snippet; the worker is killed and replaced on timeout
+    memory_mb: int = 2048  # Address space cap per worker (0 = unlimited)
+    preload: list[str] = Field(default_factory=list)  # e.g. ["numpy", "pandas"]; missing modules are skipped
+    max_output_chars: int = 10000  # Per field (stdout, stderr, result)
+
+
+class ToolResultsConfig(BaseModel):
+    """Out-of-band storage for large tool results."""
+    enabled: bool = True
+    spill_chars: int = 8000  # Results longer than this are stored and replaced by an excerpt
+    head_chars: int = 2000  # Characters from the start kept inline
+    tail_chars: int = 1000  # Characters from the end kept inline
+    retention_hours: int = 24  # Stored results older than this are pruned
+
+
+class ToolLimitConfig(BaseModel):
+    """Limits the tool registry applies to one tool."""
+    timeout: float | None = None  # Seconds per call (None = tools.defaultTimeout, 0 = no limit)
+    max_concurrent: int = 0  # Calls running at once across all turns and subagents (0 = unlimited)
+
+
+def _default_tool_limits() -> dict[str, ToolLimitConfig]:
+    # exec and python enforce their own timeouts and clean up their processes
+    return {
+        "exec": ToolLimitConfig(timeout=0, max_concurrent=8),
+        "python": ToolLimitConfig(timeout=0),
+        "web_search": ToolLimitConfig(timeout=30),
+        "web_fetch": ToolLimitConfig(timeout=60, max_concurrent=8),
+        "web_fetch_many": ToolLimitConfig(timeout=180),
+        "message": ToolLimitConfig(timeout=30),
+        "spawn": ToolLimitConfig(timeout=30),
+    }
+
+
+class ToolExposureConfig(BaseModel):
+    """Which tool schemas each turn sends to the model (empty = all tools, every turn)."""
+    groups: dict[str, list[str]] = Field(default_factory=dict)  # Extra or redefined tool groups
+    channels: dict[str, list[str]] = Field(default_factory=dict)  # Channel -> allowed groups/tools
+    optional: dict[str, list[str]] = Field(default_factory=dict)  # Group/tool -> keywords that expose it
 
 
 class ToolsConfig(BaseModel):
     """Tools configuration."""
     web: WebToolsConfig = Field(default_factory=WebToolsConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
+    python: PythonToolConfig = Field(default_factory=PythonToolConfig)
+    results: ToolResultsConfig = Field(default_factory=ToolResultsConfig)
+    exposure: ToolExposureConfig = Field(default_factory=ToolExposureConfig)
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
+    default_timeout: float = 300  # Seconds any tool call may run unless limits say otherwise (0 = no limit)
+    limits: dict[str, ToolLimitConfig] = Field(default_factory=dict)  # Per tool name, merged over the defaults
+
+    def effective_limits(self) -> dict[str, ToolLimitConfig]:
+        """Built-in per-tool limits with the configured fields applied on top."""
+        limits = _default_tool_limits()
+        for name, limit in self.limits.items():
+            base = limits.get(name, ToolLimitConfig())
+            limits[name] = base.model_copy(update=limit.model_dump(exclude_unset=True))
+        return limits
 
 
 class Config(BaseSettings):
@@ -49,6 +49,7 @@ class LLMProvider(ABC):
         model: str | None = None,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        timeout: float | None = None,
     ) -> LLMResponse:
         """
         Send a chat completion request.
@@ -59,6 +60,7 @@ class LLMProvider(ABC):
             model: Model identifier (provider-specific).
             max_tokens: Maximum tokens in response.
             temperature: Sampling temperature.
+            timeout: Optional request timeout in seconds.
         
         Returns:
             LLMResponse with content and/or tool calls.
@@ -73,6 +75,7 @@ class LLMProvider(ABC):
         model: str | None = None,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        timeout: float | None = None,
     ) -> AsyncIterator[dict[str, Any]]:
         """
         Stream chat completion events.
@@ -158,6 +158,7 @@ class LiteLLMProvider(LLMProvider):
         model: str | None = None,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        timeout: float | None = None,
     ) -> LLMResponse:
         """
         Send a chat completion request via LiteLLM.
@@ -168,6 +169,7 @@ class LiteLLMProvider(LLMProvider):
             model: Model identifier (e.g., 'anthropic/claude-sonnet-4-5').
             max_tokens: Maximum tokens in response.
             temperature: Sampling temperature.
+            timeout: Optional request timeout in seconds.
         
         Returns:
             LLMResponse with content and/or tool calls.
@@ -197,6 +199,9 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
         
+        if timeout:
+            kwargs["timeout"] = timeout
+        
         try:
             response = await acompletion(**kwargs)
             return self._parse_response(response)
@@ -214,6 +219,7 @@ class LiteLLMProvider(LLMProvider):
         model: str | None = None,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        timeout: float | None = None,
     ) -> AsyncIterator[dict[str, Any]]:
         """Stream chat completion events."""
         model = self._normalize_model_name(model or self.default_model)
@@ -234,6 +240,8 @@ class LiteLLMProvider(LLMProvider):
         if tools:
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
+        if timeout:
+            kwargs["timeout"] = timeout
         try:
             stream = await acompletion(**kwargs)
             async for event in consume_litellm_stream(stream):
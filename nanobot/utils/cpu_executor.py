@@ -0,0 +1,159 @@
+"""
+Shared process pool for CPU-bound transforms (HTML extraction, image encoding).
+
+Offloaded functions should live in `nanobot.utils.cpu_tasks`: workers import
+the module of every function they unpickle, and that module is kept light.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+_executor: ProcessPoolExecutor | None = None
+_workers = 2
+_max_queue = 16
+_lock = threading.Lock()
+_pending = 0
+_stats = {"offloaded": 0, "inline": 0, "failures": 0}
+
+
+def configure_cpu_executor(workers: int, max_queue: int = 16) -> None:
+    """
+    Set the size of the shared CPU pool and reset its counters.
+
+    `workers=0` disables the pool and every call runs inline in its caller.
+    """
+    global _workers, _max_queue
+    shutdown_cpu_executor()
+    _workers = max(0, workers)
+    _max_queue = max(0, max_queue)
+    with _lock:
+        _stats.update(offloaded=0, inline=0, failures=0)
+
+
+def shutdown_cpu_executor() -> None:
+    """Stop the worker processes; a new pool is started on next use."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """The shared pool, started if needed (call with _lock held)."""
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the parent has an event loop and helper threads
+        _executor = ProcessPoolExecutor(_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def warm_cpu_executor() -> None:
+    """Start the worker processes now, in the background, instead of on the first offloaded call."""
+    from nanobot.utils.cpu_tasks import warm_up
+
+    with _lock:
+        if not _workers:
+            return
+        executor = _get_executor()
+    try:
+        for _ in range(_workers):
+            executor.submit(warm_up)
+    except (BrokenProcessPool, RuntimeError) as e:
+        logger.warning(f"Could not start CPU workers: {e}")
+
+
+def _submit(func: Callable[..., T], args: tuple, kwargs: dict) -> tuple[Future[T], ProcessPoolExecutor] | None:
+    """
+    Queue a call on the pool, or return None if it should run inline instead.
+
+    Calls run inline when the pool is disabled or when `workers + max_queue`
+    calls are already pending, so a burst makes its callers do the work
+    themselves instead of growing an unbounded backlog.
+    """
+    global _pending
+    with _lock:
+        if not _workers or _pending >= _workers + _max_queue:
+            _stats["inline"] += 1
+            return None
+        executor = _get_executor()
+        _pending += 1
+    try:
+        future = executor.submit(func, *args, **kwargs)
+    except (BrokenProcessPool, RuntimeError) as e:
+        _release()
+        _discard_pool(executor, e)
+        return None
+    future.add_done_callback(lambda _: _release())
+    return future, executor
+
+
+def _release() -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _discard_pool(executor: ProcessPoolExecutor, error: BaseException) -> None:
+    """Drop a broken pool (a worker crashed or was killed); the next call starts a new one."""
+    global _executor
+    logger.warning(f"CPU worker pool failed ({error}); running inline and restarting it")
+    with _lock:
+        _stats["failures"] += 1
+        _stats["inline"] += 1
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _count_offloaded() -> None:
+    with _lock:
+        _stats["offloaded"] += 1
+
+
+async def run_cpu(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a CPU-bound call in the shared process pool without blocking the event loop.
+
+    `func` and its arguments must be picklable (module-level functions). If the
+    pool is disabled, saturated or broken, the call runs inline instead.
+    """
+    if submitted := _submit(func, args, kwargs):
+        future, executor = submitted
+        try:
+            result = await asyncio.wrap_future(future)
+        except BrokenProcessPool as e:
+            _discard_pool(executor, e)
+        else:
+            _count_offloaded()
+            return result
+    return func(*args, **kwargs)
+
+
+def run_cpu_sync(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Blocking variant of run_cpu for code already running on a worker thread."""
+    if submitted := _submit(func, args, kwargs):
+        future, executor = submitted
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            _discard_pool(executor, e)
+        else:
+            _count_offloaded()
+            return result
+    return func(*args, **kwargs)
+
+
+def cpu_pool_stats() -> dict[str, Any]:
+    """Call counts for the shared CPU pool."""
+    with _lock:
+        return {"workers": _workers, "pending": _pending, **_stats}
@@ -0,0 +1,75 @@
+"""
+Functions run in the CPU worker pool.
+
+Spawned workers import this module to unpickle the function they are sent,
+so it must stay light: standard library only at import time, and never
+anything under `nanobot.agent` (that would pull in the agent loop and the
+provider SDKs and make the first offloaded call slower than running inline).
+"""
+
+import base64
+import html
+import json
+import os
+import re
+from pathlib import Path
+
+
+def _strip_tags(text: str) -> str:
+    """Remove HTML tags and decode entities."""
+    text = re.sub(r'<script[\s\S]*?</script>', '', text, flags=re.I)
+    text = re.sub(r'<style[\s\S]*?</style>', '', text, flags=re.I)
+    text = re.sub(r'<[^>]+>', '', text)
+    return html.unescape(text).strip()
+
+
+def _normalize(text: str) -> str:
+    """Normalize whitespace."""
+    text = re.sub(r'[ \t]+', ' ', text)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def _to_markdown(html: str) -> str:
+    """Convert HTML to markdown."""
+    # Convert links, headings, lists before stripping tags
+    text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
+                  lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
+    text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
+                  lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
+    text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
+    text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
+    text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
+    return _normalize(_strip_tags(text))
+
+
+def extract_content(text: str, ctype: str, mode: str, partial: bool = False) -> tuple[str, str]:
+    """Turn a decoded web page body into readable text; returns (text, extractor)."""
+    from readability import Document
+
+    # JSON (a cut-off document cannot be parsed, so it is returned raw)
+    if "json" in ctype and not partial:
+        try:
+            return json.dumps(json.loads(text), indent=2), "json"
+        except ValueError:
+            return text, "raw"
+    # HTML
+    if "text/html" in ctype or text[:256].lower().startswith(("<!doctype", "<html")):
+        doc = Document(text)
+        content = _to_markdown(doc.summary()) if mode == "markdown" else _strip_tags(doc.summary())
+        text = f"# {doc.title()}\n\n{content}" if doc.title() else content
+        return text, "readability"
+    return text, "raw"
+
+
+def encode_image(path: str) -> str:
+    """Read an image file and return it base64-encoded."""
+    return base64.b64encode(Path(path).read_bytes()).decode()
+
+
+def warm_up() -> int:
+    """Import what the tasks above need, so a fresh worker's first real call is fast."""
+    try:
+        import readability  # noqa: F401
+    except ImportError:
+        pass
+    return os.getpid()
@@ -0,0 +1,181 @@
+"""Process-wide pooled HTTP client shared by tools, providers and channels."""
+
+import asyncio
+import urllib.request
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from loguru import logger
+
+# Redirects followed by requests that opt into follow_redirects
+MAX_REDIRECTS = 5
+
+
+@dataclass
+class HttpSettings:
+    """Connection pool settings for the shared client."""
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry: float = 30.0
+    per_host: int = 8  # Concurrent requests per host (0 = unlimited)
+    connect_timeout: float = 10.0
+    timeout: float = 30.0  # Read/write/pool timeout unless a request overrides it
+    http2: bool = True  # Used when the h2 package is installed
+    proxy: str = ""  # Defaults to HTTPS_PROXY / HTTP_PROXY from the environment
+
+
+_settings = HttpSettings()
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+_transport: "_HostLimitedTransport | None" = None
+
+
+def configure_http(settings: HttpSettings) -> None:
+    """Set the shared client's pool settings (takes effect for the next client created)."""
+    global _settings, _client, _client_loop, _transport
+    _settings = settings
+    _client = _client_loop = _transport = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _default_proxy() -> str | None:
+    proxies = urllib.request.getproxies()
+    return proxies.get("https") or proxies.get("http") or None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees the host slot once it has been read or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Any):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _HostLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Pooled transport that allows at most `per_host` requests in flight per host.
+
+    A slot is held until the response body is closed, so a slow streaming
+    download counts against its host for as long as it runs.
+    """
+
+    def __init__(self, settings: HttpSettings):
+        self._inner = httpx.AsyncHTTPTransport(
+            http2=settings.http2 and _http2_available(),
+            proxy=settings.proxy or _default_proxy(),
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+        )
+        self.per_host = settings.per_host
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self.in_flight: dict[str, int] = {}
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests += 1
+        gate = None
+        if self.per_host:
+            gate = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+            await gate.acquire()
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self.in_flight[host] -= 1
+            if not self.in_flight[host]:
+                del self.in_flight[host]
+            if gate is not None:
+                gate.release()
+
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        pool = self._inner._pool
+        connections = list(pool.connections)
+        return {
+            "requests": self.requests,
+            "inFlight": sum(self.in_flight.values()),
+            "inFlightByHost": dict(self.in_flight),
+            "connections": len(connections),
+            "idleConnections": sum(1 for c in connections if c.is_idle()),
+            "http2Connections": sum(1 for c in connections if "HTTP/2" in c.info()),
+        }
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client for the running event loop, creating it on first use.
+
+    Connections are tied to the loop that opened them, so a new client is
+    made if the loop has changed (e.g. between test cases or CLI runs).
+    Callers must not close it; use close_http_client() on shutdown.
+    """
+    global _client, _client_loop, _transport
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop or _client.is_closed:
+        _transport = _HostLimitedTransport(_settings)
+        _client = httpx.AsyncClient(
+            transport=_transport,
+            timeout=httpx.Timeout(_settings.timeout, connect=_settings.connect_timeout),
+            max_redirects=MAX_REDIRECTS,
+        )
+        _client_loop = loop
+        logger.debug(f"Created shared HTTP client (http2={_settings.http2 and _http2_available()})")
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client, _client_loop, _transport
+    if _client is not None:
+        await _client.aclose()
+    _client = _client_loop = _transport = None
+
+
+def http_pool_stats() -> dict[str, Any] | None:
+    """Connection pool statistics for the shared client, or None if it hasn't been used."""
+    if _transport is None:
+        return None
+    return _transport.stats()
+
@@ -0,0 +1,96 @@
+"""Shared thread pool for blocking disk I/O, and an event-loop lag monitor."""
+
+import asyncio
+import functools
+import math
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_max_workers = 8
+
+
+def configure_io_executor(max_workers: int) -> None:
+    """Set the size of the shared I/O pool (takes effect for the next pool created)."""
+    global _executor, _max_workers
+    _max_workers = max(1, max_workers)
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Return the shared I/O pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="nanobot-io")
+    return _executor
+
+
+async def run_io(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking disk-I/O call on the shared pool.
+
+    Like asyncio.to_thread, but bounded, so a burst of large reads cannot
+    exhaust the default executor that DNS lookups and other libraries rely on.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a fixed-interval sleep.
+
+    Lag is the time the loop was blocked by synchronous work; it shows up as
+    jitter in every channel and stream at once.
+    """
+
+    def __init__(self, interval_s: float = 0.5, window: int = 240, warn_ms: float = 500.0):
+        self.interval_s = interval_s
+        self.warn_ms = warn_ms
+        self._samples: deque[float] = deque(maxlen=window)
+        self._max_ms = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def record(self, lag_ms: float) -> None:
+        self._samples.append(lag_ms)
+        self._max_ms = max(self._max_ms, lag_ms)
+        if lag_ms >= self.warn_ms:
+            logger.warning(f"Event loop blocked for {lag_ms:.0f}ms")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval_s)
+            self.record(max(0.0, (loop.time() - start - self.interval_s) * 1000))
+
+    def stats(self) -> dict[str, Any]:
+        """Lag over the recent window, in milliseconds."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "lastMs": 0.0, "meanMs": 0.0, "p95Ms": 0.0, "maxMs": 0.0}
+        p95 = samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)]
+        return {
+            "samples": len(samples),
+            "lastMs": round(self._samples[-1], 1),
+            "meanMs": round(sum(samples) / len(samples), 1),
+            "p95Ms": round(p95, 1),
+            "maxMs": round(self._max_ms, 1),
+        }
@@ -12,6 +12,9 @@ from fastapi.staticfiles import StaticFiles
 
 from nanobot.config.loader import save_config
 from nanobot.cron.service import _compute_next_run
+from nanobot.utils.cpu_executor import cpu_pool_stats
+from nanobot.utils.http import http_pool_stats
+from nanobot.utils.io_executor import run_io
 from nanobot.webapi.auth import parse_bearer_token, verify_token, ws_authenticate
 from nanobot.webapi.config_ops import build_updated_config, config_to_masked_payload
 from nanobot.webapi.models import (
@@ -49,11 +52,21 @@ def create_web_app(state: WebAPIState) -> FastAPI:
             },
             "channels": state.channels.get_status() if state.channels else {},
             "activeRuns": len(state.running_jobs),
+            "toolCache": state.agent.tools.cache_stats(),
+            "toolLimits": state.agent.tools.limiter.stats(),
+            "subagents": state.agent.subagents.queue_stats(),
+            "loopLag": state.loop_lag.stats() if state.loop_lag else None,
+            "http": http_pool_stats(),
+            "cpu": cpu_pool_stats(),
         }
 
+    @app.get("/api/v1/metrics/tools", dependencies=[Depends(require_auth)])
+    async def get_tool_metrics() -> dict[str, Any]:
+        return state.agent.tools.metrics.snapshot()
+
     @app.get("/api/v1/sessions", dependencies=[Depends(require_auth)])
     async def list_sessions() -> dict[str, Any]:
-        sessions = state.agent.sessions.list_sessions()
+        sessions = await run_io(state.agent.sessions.list_sessions)
         return {"sessions": sessions}
 
     @app.get("/api/v1/sessions/{session_key:path}", dependencies=[Depends(require_auth)])
@@ -76,7 +89,7 @@ def create_web_app(state: WebAPIState) -> FastAPI:
 
     @app.delete("/api/v1/sessions/{session_key:path}", dependencies=[Depends(require_auth)])
     async def delete_session(session_key: str) -> dict[str, Any]:
-        deleted = state.agent.sessions.delete(session_key)
+        deleted = await run_io(state.agent.sessions.delete, session_key)
         if not deleted:
             raise HTTPException(status_code=404, detail="Session not found")
         return {"ok": True}
@@ -183,8 +196,7 @@ def create_web_app(state: WebAPIState) -> FastAPI:
         response = await state.heartbeat.trigger_now()
         return {"ok": True, "response": response}
 
-    @app.get("/api/v1/skills", dependencies=[Depends(require_auth)])
-    async def list_skills() -> dict[str, Any]:
+    def collect_skills() -> dict[str, Any]:
         loader = state.agent.context.skills
         skills = []
         for skill in loader.list_skills(filter_unavailable=False, include_disabled=True):
@@ -201,13 +213,17 @@ def create_web_app(state: WebAPIState) -> FastAPI:
             })
         return {"skills": skills, "settings": loader.get_skill_settings()}
 
+    @app.get("/api/v1/skills", dependencies=[Depends(require_auth)])
+    async def list_skills() -> dict[str, Any]:
+        return await run_io(collect_skills)
+
     @app.put("/api/v1/skills/settings", dependencies=[Depends(require_auth)])
     async def update_skill_settings(payload: SkillSettingsUpdateRequest) -> dict[str, Any]:
         loader = state.agent.context.skills
         current = loader.get_skill_settings()
         for name, setting in payload.skills.items():
             current[name] = {"enabled": setting.enabled, "always": setting.always}
-        settings = loader.save_skill_settings(current)
+        settings = await run_io(loader.save_skill_settings, current)
         return {"settings": settings}
 
     @app.get("/api/v1/config", dependencies=[Depends(require_auth)])
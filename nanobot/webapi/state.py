@@ -20,6 +20,7 @@ class WebAPIState:
     gateway_port: int
     config_path: Path | None = None
     running_jobs: set[str] = field(default_factory=set)
+    loop_lag: Any = None
 
     @property
     def auth_token(self) -> str:
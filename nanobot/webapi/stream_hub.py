@@ -72,10 +72,11 @@ class StreamHub:
             return
         channel = str(event.get("channel", "cli"))
         chat_id = str(event.get("chat_id", "web"))
+        sender_id = str(event.get("sender_id", "user"))
         run_id = str(event.get("run_id", "")).strip() or uuid.uuid4().hex[:10]
         await self._safe_send(websocket, {"type": "chat.ack", "run_id": run_id, "session_key": session_key})
         task = asyncio.create_task(
-            self._run_stream(websocket, run_id, content, session_key, channel, chat_id)
+            self._run_stream(websocket, run_id, content, session_key, channel, chat_id, sender_id)
         )
         async with self._lock:
             self._run_tasks[run_id] = task
@@ -89,6 +90,7 @@ class StreamHub:
         session_key: str,
         channel: str,
         chat_id: str,
+        sender_id: str = "user",
     ) -> None:
         """Pump streamed events from AgentLoop to websocket."""
         self.state.running_jobs.add(run_id)
@@ -99,6 +101,7 @@ class StreamHub:
                 channel=channel,
                 chat_id=chat_id,
                 run_id=run_id,
+                sender_id=sender_id,
             ):
                 await self._safe_send(websocket, server_event)
                 if server_event.get("type") == "session.updated":
@@ -0,0 +1,84 @@
+import asyncio
+
+from nanobot.agent.jobs import JobManager
+from nanobot.agent.tools.jobs import ExecBackgroundTool, JobKillTool, JobOutputTool, JobStatusTool
+from nanobot.agent.tools.registry import workspace_changes
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.bus.queue import MessageBus
+
+
+def _tools(manager: JobManager, tmp_path):
+    tools = (
+        ExecBackgroundTool(manager, ExecTool(working_dir=str(tmp_path))),
+        JobStatusTool(manager),
+        JobOutputTool(manager),
+        JobKillTool(manager),
+    )
+    for tool in tools:
+        tool.set_context("telegram", "42", "alice")
+    return tools
+
+
+async def _wait(manager: JobManager, job_id: str) -> None:
+    job = manager.get(job_id)
+    assert job is not None and job.task is not None
+    await asyncio.wait_for(asyncio.shield(job.task), timeout=5)
+
+
+async def test_job_runs_in_background_and_announces(tmp_path) -> None:
+    bus = MessageBus()
+    manager = JobManager(bus, log_dir=tmp_path / "jobs")
+    start, status, output, _ = _tools(manager, tmp_path)
+
+    generation = workspace_changes.generation
+    started = await start.execute(command="echo building; sleep 0.2; echo done")
+    job_id = started.split()[3].rstrip(".")
+    assert workspace_changes.busy == 1
+    assert "running" in await status.execute(job_id=job_id)
+
+    await _wait(manager, job_id)
+    assert workspace_changes.busy == 0 and workspace_changes.generation > generation
+    assert "exited 0" in await status.execute(job_id=job_id)
+    assert "building\ndone" in await output.execute(job_id=job_id)
+    assert (tmp_path / "jobs" / f"{job_id}.log").read_text() == "building\ndone\n"
+
+    announce = await asyncio.wait_for(bus.consume_inbound(), timeout=1)
+    assert announce.channel == "system" and announce.chat_id == "telegram:42"
+    assert job_id in announce.content and "done" in announce.content
+    assert announce.metadata == {"origin_sender_id": "alice"}
+
+
+async def test_kill_and_owner_scoping(tmp_path) -> None:
+    manager = JobManager(MessageBus(), max_jobs=1)
+    start, status, _, kill = _tools(manager, tmp_path)
+
+    job_id = (await start.execute(command="sleep 30", notify=False)).split()[3].rstrip(".")
+    assert "already running" in await start.execute(command="sleep 30")
+
+    other = JobStatusTool(manager)
+    other.set_context("telegram", "99")
+    assert (await other.execute(job_id=job_id)).startswith("Error: Unknown job")
+
+    assert await kill.execute(job_id=job_id) == f"Killed job {job_id}"
+    await _wait(manager, job_id)
+    assert "killed" in await status.execute()
+
+
+async def test_job_timeout(tmp_path) -> None:
+    manager = JobManager(MessageBus(), timeout=1)
+    start, status, _, _ = _tools(manager, tmp_path)
+
+    job_id = (await start.execute(command="sleep 30", notify=False)).split()[3].rstrip(".")
+    await _wait(manager, job_id)
+    assert "timed out" in await status.execute(job_id=job_id)
+
+
+async def test_kill_all_stops_running_jobs_on_shutdown(tmp_path) -> None:
+    manager = JobManager(MessageBus())
+    start, _, _, _ = _tools(manager, tmp_path)
+    job_id = (await start.execute(command="sleep 30", notify=False)).split()[3].rstrip(".")
+
+    manager.kill_all()
+
+    await _wait(manager, job_id)
+    assert manager.get(job_id).status == "killed"
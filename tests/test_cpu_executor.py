@@ -0,0 +1,76 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from nanobot.utils.cpu_executor import (
+    configure_cpu_executor,
+    cpu_pool_stats,
+    run_cpu,
+    run_cpu_sync,
+    shutdown_cpu_executor,
+    warm_cpu_executor,
+)
+from nanobot.utils.cpu_tasks import extract_content
+
+
+@pytest.fixture(autouse=True)
+def _pool():
+    configure_cpu_executor(1, max_queue=0)
+    yield
+    configure_cpu_executor(2)
+
+
+async def test_work_runs_in_a_worker_process() -> None:
+    assert await run_cpu(os.getpid) != os.getpid()
+    assert run_cpu_sync(os.getpid) != os.getpid()
+
+    html = "<html><head><title>T</title></head><body><article><h2>Head</h2><p>Body text here.</p></article></body></html>"
+    text, extractor = await run_cpu(extract_content, html, "text/html", "markdown")
+    assert extractor == "readability" and "## Head" in text
+    assert cpu_pool_stats()["offloaded"] == 3
+
+
+async def test_saturated_pool_runs_inline() -> None:
+    await run_cpu(os.getpid)  # Start the worker so the timing below is not spawn time
+    busy = asyncio.create_task(run_cpu(time.sleep, 0.5))
+    await asyncio.sleep(0.05)
+
+    assert await run_cpu(os.getpid) == os.getpid()
+    await busy
+    assert cpu_pool_stats()["inline"] == 1
+
+
+async def test_disabled_or_broken_pool_runs_inline() -> None:
+    configure_cpu_executor(0)
+    assert await run_cpu(os.getpid) == os.getpid()
+
+    configure_cpu_executor(1)
+    worker = await run_cpu(os.getpid)
+    os.kill(worker, signal.SIGKILL)
+    await asyncio.sleep(0.2)
+
+    assert await run_cpu(os.getpid) == os.getpid()
+    assert cpu_pool_stats()["failures"] == 1
+    assert await run_cpu(os.getpid) not in (worker, os.getpid())
+    shutdown_cpu_executor()
+
+
+def test_task_module_does_not_import_the_agent() -> None:
+    # Workers import it to unpickle each task, so it must not drag in the agent loop or litellm
+    code = (
+        "import sys, nanobot.utils.cpu_tasks; "
+        "print(sorted(m for m in sys.modules if m.startswith('nanobot.agent') or m == 'litellm'))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+async def test_warm_starts_the_workers_ahead_of_use() -> None:
+    warm_cpu_executor()
+    assert await run_cpu(os.getpid) != os.getpid()
+    assert cpu_pool_stats()["offloaded"] == 1 and cpu_pool_stats()["inline"] == 0
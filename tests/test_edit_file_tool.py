@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from nanobot.agent.tools import filesystem
+from nanobot.agent.tools.filesystem import EditFileTool, WriteFileTool
+
+
+async def test_batched_edits_apply_in_one_pass(tmp_path) -> None:
+    target = tmp_path / "app.py"
+    target.write_text("a = 1\nb = 2\nc = 3\n")
+
+    result = await EditFileTool().execute(
+        path=str(target),
+        edits=[
+            {"old_text": "c = 3", "new_text": "c = 30"},
+            {"old_text": "a = 1", "new_text": "a = 10"},
+        ],
+    )
+
+    assert target.read_text() == "a = 10\nb = 2\nc = 30\n"
+    assert result.startswith(f"Successfully edited {target} (2 edits)")
+    assert "-a = 1" in result and "+c = 30" in result
+
+
+async def test_batched_edits_are_all_or_nothing(tmp_path) -> None:
+    target = tmp_path / "app.py"
+    original = "x = 1\nx = 1\ny = 2\n"
+    target.write_text(original)
+    tool = EditFileTool()
+
+    missing = await tool.execute(
+        path=str(target),
+        edits=[{"old_text": "y = 2", "new_text": "y = 3"}, {"old_text": "zzz", "new_text": ""}],
+    )
+    ambiguous = await tool.execute(
+        path=str(target),
+        edits=[{"old_text": "y = 2", "new_text": "y = 3"}, {"old_text": "x = 1", "new_text": "x = 5"}],
+    )
+    overlap = await tool.execute(
+        path=str(target),
+        edits=[{"old_text": "1\ny =", "new_text": "!"}, {"old_text": " = 2", "new_text": "?"}],
+    )
+
+    assert missing.startswith("Error: edit 2: old_text not found")
+    assert "edit 2: old_text appears 2 times" in ambiguous
+    assert overlap.startswith("Error: edits overlap")
+    assert target.read_text() == original
+
+
+async def test_single_edit_keeps_mode_and_leaves_no_temp_files(tmp_path) -> None:
+    target = tmp_path / "run.sh"
+    target.write_text("echo old\n")
+    os.chmod(target, 0o755)
+
+    result = await EditFileTool().execute(path=str(target), old_text="old", new_text="new")
+
+    assert result.startswith(f"Successfully edited {target}\n")
+    assert target.read_text() == "echo new\n"
+    assert os.stat(target).st_mode & 0o777 == 0o755
+    assert [p.name for p in tmp_path.iterdir()] == ["run.sh"]
+
+
+async def test_write_file_is_atomic_and_creates_parents(tmp_path) -> None:
+    target = tmp_path / "nested" / "out.txt"
+    assert (await WriteFileTool().execute(path=str(target), content="hi")).startswith("Successfully")
+    assert target.read_text() == "hi"
+    assert [p.name for p in target.parent.iterdir()] == ["out.txt"]
+
+
+async def test_new_files_honour_the_umask(tmp_path) -> None:
+    previous = os.umask(0o027)
+    try:
+        await WriteFileTool().execute(path=str(tmp_path / "new.txt"), content="hi")
+    finally:
+        os.umask(previous)
+    assert os.stat(tmp_path / "new.txt").st_mode & 0o777 == 0o640
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="reads the umask from /proc")
+def test_reading_the_umask_never_changes_it(monkeypatch) -> None:
+    def no_umask(mask: int) -> int:
+        raise AssertionError("os.umask() changes the mask for every thread")
+
+    expected = os.umask(0o027)
+    os.umask(expected)
+    monkeypatch.setattr(os, "umask", no_umask)
+
+    assert filesystem._current_umask() == expected
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from nanobot.agent.tools import shell
+from nanobot.agent.tools.limits import ResourceLimits, wait_cgroup_empty
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionManager
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="process groups and rlimits need Linux")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"  # zombies are dead, just not reaped
+    except FileNotFoundError:
+        return False
+
+
+async def test_rlimits_apply_to_the_command(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), limits=ResourceLimits(max_open_files=64, cpu_seconds=30))
+
+    assert await tool.execute(command="ulimit -n; ulimit -t") == "64\n30\n"
+
+
+async def test_cpu_limit_kills_runaway_command(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), limits=ResourceLimits(cpu_seconds=1), timeout=20)
+
+    result = await tool.execute(command="while :; do :; done")
+
+    assert "Killed by signal" in result and "cpu_seconds 1" in result
+
+
+async def test_timeout_kills_grandchildren_that_ignore_sigterm(tmp_path) -> None:
+    pid_file = tmp_path / "pid"
+    tool = ExecTool(working_dir=str(tmp_path), timeout=1, kill_grace=0.2)
+
+    result = await tool.execute(command=f"sh -c 'trap \"\" TERM; echo $$ > {pid_file}; sleep 30' & wait")
+
+    assert "timed out" in result
+    pid = int(pid_file.read_text())
+    for _ in range(20):
+        if not _alive(pid):
+            break
+        await asyncio.sleep(0.05)
+    assert not _alive(pid)
+
+
+def test_cgroup_is_skipped_when_unavailable(tmp_path) -> None:
+    limits = ResourceLimits(cgroup_parent=str(tmp_path))
+
+    assert limits.create_cgroup() is None
+    assert limits.wrap_argv(["true"]) == ["true"]
+
+
+async def test_limits_are_applied_without_preexec_fn(tmp_path, monkeypatch) -> None:
+    def no_preexec(*args, **kwargs):
+        assert kwargs.get("preexec_fn") is None
+        return original(*args, **kwargs)
+
+    original = asyncio.create_subprocess_exec
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", no_preexec)
+    limits = ResourceLimits(max_open_files=48)
+    sessions = ShellSessionManager(limits=limits)
+    tool = ExecTool(working_dir=str(tmp_path), sessions=sessions, limits=limits)
+    tool.set_context("cli", "direct")
+    try:
+        assert await tool.execute(command="ulimit -n") == "48\n"
+        assert (await tool.execute(command="no-such-program-xyz")).endswith("Exit code: 127")
+    finally:
+        sessions.close_all()
+
+
+def test_cgroup_removal_waits_until_it_is_empty(tmp_path) -> None:
+    events = tmp_path / "cgroup.events"
+    events.write_text("populated 1\nfrozen 0\n")
+    assert not wait_cgroup_empty(tmp_path, 0.05)
+
+    events.write_text("populated 0\nfrozen 0\n")
+    assert wait_cgroup_empty(tmp_path, 0.05)
+
+
+async def test_cgroup_is_released_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    released = []
+    monkeypatch.setattr(
+        shell, "release_cgroup", lambda cgroup: released.append(threading.current_thread())
+    )
+    tool = ExecTool(working_dir=str(tmp_path))
+
+    assert await tool.execute(command="echo hi") == "hi\n"
+
+    assert released and released[0] is not threading.current_thread()
@@ -0,0 +1,73 @@
+import sys
+import threading
+
+from nanobot.agent.tools import shell
+from nanobot.agent.tools.shell import ExecTool, OutputCapture
+
+
+def _py(code: str) -> str:
+    return f'{sys.executable} -c "{code}"'
+
+
+def test_capture_keeps_head_and_tail_with_constant_memory() -> None:
+    capture = OutputCapture("stdout", head_bytes=4, tail_bytes=3)
+    for chunk in (b"abcdef", b"ghij", b"klmnop"):
+        capture.feed(chunk)
+
+    assert capture.total == 16
+    assert bytes(capture.head) == b"abcd"
+    assert bytes(capture.tail) == b"nop"
+    assert "abcd" in capture.text() and "(9 bytes omitted)" in capture.text()
+
+
+async def test_small_output_is_unchanged(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path))
+    assert await tool.execute(command="echo hello") == "hello\n"
+
+
+async def test_large_output_is_truncated_and_spilled(tmp_path) -> None:
+    spill_dir = tmp_path / "spill"
+    tool = ExecTool(working_dir=str(tmp_path), max_output_chars=300, spill_dir=spill_dir)
+
+    result = await tool.execute(command=_py("print('START' + 'x' * 100000 + 'END')"))
+
+    assert result.startswith("START")
+    assert "END" in result
+    assert len(result) < 1000
+    assert "[stdout: 100,009 bytes total; full output saved to" in result
+    [spilled] = list(spill_dir.iterdir())
+    assert spilled.stat().st_size == 100_009
+
+
+async def test_runaway_output_is_killed(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), max_output_chars=100, kill_after_bytes=200_000)
+
+    result = await tool.execute(command="yes")
+
+    assert "Killed: output exceeded 200,000 bytes" in result
+
+
+async def test_spill_file_is_written_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    threads = []
+    real_prune = shell._prune_spill_files
+    monkeypatch.setattr(
+        shell, "_prune_spill_files",
+        lambda d: (threads.append(threading.current_thread()), real_prune(d)),
+    )
+    capture = OutputCapture("stdout", head_bytes=4, tail_bytes=3, spill_path=tmp_path / "s.log")
+    for chunk in (b"abcdef", b"ghij", b"klmnop"):
+        capture.feed(chunk)
+    await capture.close()
+
+    assert threads and threads[0] is not threading.current_thread()
+    assert (tmp_path / "s.log").read_bytes() == b"abcdefghijklmnop"
+    assert "full output saved to" in capture.summary()
+
+
+async def test_unwritable_spill_is_not_reported(tmp_path) -> None:
+    (tmp_path / "file").write_text("")
+    capture = OutputCapture("stdout", head_bytes=4, tail_bytes=3, spill_path=tmp_path / "file" / "s.log")
+    capture.feed(b"x" * 100)
+    await capture.close()
+
+    assert capture.summary() == "[stdout: 100 bytes total]"
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from nanobot.utils.http import (
+    HttpSettings,
+    close_http_client,
+    configure_http,
+    get_http_client,
+    http_pool_stats,
+)
+
+
+async def _serve(body: bytes = b"hello", delay: float = 0.0):
+    """Tiny keep-alive HTTP/1.1 server; returns (server, base_url, connection counter)."""
+    connections = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal connections
+        connections += 1
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                await asyncio.sleep(delay)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/", lambda: connections
+
+
+@pytest.fixture(autouse=True)
+def _fresh_client():
+    configure_http(HttpSettings(proxy="", per_host=8))
+    yield
+    configure_http(HttpSettings())
+
+
+async def test_requests_reuse_pooled_connections() -> None:
+    server, url, connections = await _serve()
+    try:
+        client = get_http_client()
+        assert get_http_client() is client
+        for _ in range(3):
+            r = await client.get(url)
+            assert r.text == "hello"
+
+        assert connections() == 1
+        stats = http_pool_stats()
+        assert stats["requests"] == 3 and stats["inFlight"] == 0
+        assert stats["connections"] == 1 and stats["idleConnections"] == 1
+    finally:
+        await close_http_client()
+        server.close()
+
+
+async def test_per_host_limit_queues_requests() -> None:
+    configure_http(HttpSettings(proxy="", per_host=1))
+    server, url, _ = await _serve(delay=0.2)
+    try:
+        client = get_http_client()
+        start = asyncio.get_running_loop().time()
+        await asyncio.gather(client.get(url), client.get(url))
+        assert asyncio.get_running_loop().time() - start >= 0.4
+        assert http_pool_stats()["inFlight"] == 0
+    finally:
+        await close_http_client()
+        server.close()
+
+
+def test_new_event_loop_gets_a_new_client() -> None:
+    async def grab():
+        return get_http_client()
+
+    first = asyncio.run(grab())
+    second = asyncio.run(grab())
+    assert first is not second
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import time
+
+from nanobot.utils.io_executor import LoopLagMonitor, run_io
+
+
+async def test_run_io_uses_shared_pool() -> None:
+    name = await run_io(lambda: threading.current_thread().name)
+    assert name.startswith("nanobot-io")
+
+
+async def test_blocking_io_does_not_stall_the_loop() -> None:
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await run_io(time.sleep, 0.2)
+    task.cancel()
+    assert ticks >= 5
+
+
+async def test_loop_lag_monitor_reports_blocking() -> None:
+    monitor = LoopLagMonitor(interval_s=0.01, warn_ms=10_000)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    time.sleep(0.15)  # block the loop on purpose
+    await asyncio.sleep(0.05)
+    monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["samples"] > 0
+    assert stats["maxMs"] >= 100
+    assert stats["p95Ms"] <= stats["maxMs"]
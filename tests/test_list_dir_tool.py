@@ -0,0 +1,53 @@
+from nanobot.agent.tools.filesystem import ListDirTool
+
+
+def _tree(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "README.md").write_text("hello")
+    (tmp_path / "src" / "main.py").write_text("x" * 2048)
+    (tmp_path / "src" / "pkg" / "mod.py").write_text("")
+    (tmp_path / "src" / "pkg" / "data.json").write_text("{}")
+    return tmp_path
+
+
+async def test_single_level_listing(tmp_path) -> None:
+    root = _tree(tmp_path)
+    result = await ListDirTool().execute(path=str(root))
+    assert result.splitlines() == ["README.md", "docs/", "node_modules/", "src/"]
+
+
+async def test_recursive_tree_with_sizes(tmp_path) -> None:
+    root = _tree(tmp_path)
+
+    result = await ListDirTool().execute(path=str(root), depth=3, include_sizes=True)
+
+    assert result.splitlines() == [
+        "README.md (5 B)",
+        "docs/",
+        "node_modules/",
+        "src/",
+        "  main.py (2.0 KB)",
+        "  pkg/",
+        "    data.json (2 B)",
+        "    mod.py (0 B)",
+    ]
+
+
+async def test_glob_prunes_directories_without_matches(tmp_path) -> None:
+    root = _tree(tmp_path)
+    result = await ListDirTool().execute(path=str(root), depth=3, glob="*.py")
+    assert result.splitlines() == ["src/", "  main.py", "  pkg/", "    mod.py"]
+    assert "No entries matching" in await ListDirTool().execute(path=str(root), glob="*.rs")
+
+
+async def test_listing_is_truncated_at_max_entries(tmp_path) -> None:
+    for i in range(10):
+        (tmp_path / f"f{i}.txt").write_text("")
+
+    result = await ListDirTool().execute(path=str(tmp_path), max_entries=3)
+
+    lines = result.splitlines()
+    assert lines[:3] == ["f0.txt", "f1.txt", "f2.txt"]
+    assert lines[3].startswith("[Listing truncated at 3 entries")
@@ -0,0 +1,57 @@
+from typing import Any
+
+from nanobot.agent.loop_guard import ToolLoopGuard
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.config.schema import LoopGuardConfig
+
+
+class _CountingTool(Tool):
+    name = "read_file"
+    description = "counts calls"
+    parameters = {"type": "object", "properties": {"path": {"type": "string"}}}
+
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, **kwargs: Any) -> str:
+        self.calls += 1
+        return f"contents of {kwargs.get('path')}"
+
+
+def test_repeated_identical_call_is_flagged() -> None:
+    guard = ToolLoopGuard(LoopGuardConfig(repeat_threshold=3))
+    assert guard.record("exec", {"command": "make"}, "fail") is None
+    assert guard.record("exec", {"command": "make"}, "fail") is None
+    note = guard.record("exec", {"command": "make"}, "fail")
+    assert note and "Loop guard" in note
+    assert not guard.should_stop
+
+
+def test_changing_results_are_not_a_loop() -> None:
+    guard = ToolLoopGuard(LoopGuardConfig(repeat_threshold=2))
+    assert guard.record("exec", {"command": "ls"}, "a") is None
+    assert guard.record("exec", {"command": "ls"}, "b") is None
+
+
+def test_cycle_detection_and_stop_action() -> None:
+    guard = ToolLoopGuard(LoopGuardConfig(repeat_threshold=3, action="stop"))
+    assert guard.record("read_file", {"path": "a"}, "A") is None
+    assert guard.record("read_file", {"path": "b"}, "B") is None
+    assert guard.record("read_file", {"path": "a"}, "A") is None
+    note = guard.record("read_file", {"path": "b"}, "B")
+    assert note and "keep repeating" in note
+    assert guard.should_stop
+
+
+async def test_memoize_action_skips_execution() -> None:
+    tool = _CountingTool()
+    reg = ToolRegistry()
+    reg.register(tool)
+    guard = ToolLoopGuard(LoopGuardConfig(repeat_threshold=3, action="memoize"))
+
+    for _ in range(4):
+        result = await guard.execute(reg, "read_file", {"path": "x"})
+
+    assert tool.calls == 2
+    assert "result reused" in result
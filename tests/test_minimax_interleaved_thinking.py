@@ -142,6 +142,7 @@ async def test_agent_loop_preserves_assistant_payload_in_tool_turn(tmp_path: Pat
             model: str | None = None,
             max_tokens: int = 4096,
             temperature: float = 0.7,
+            timeout: float | None = None,
         ) -> LLMResponse:
             self.calls.append(messages)
             self.turn += 1
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.limits import ResourceLimits
+from nanobot.agent.tools.python import PythonTool
+from nanobot.agent.tools.python_pool import PythonWorkerPool
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import PythonToolConfig
+
+
+def _pool(tmp_path, **kwargs) -> PythonWorkerPool:
+    return PythonWorkerPool(str(tmp_path), size=1, max_uses=3, preload=["json", "no_such_module"], **kwargs)
+
+
+async def test_runs_snippets_in_a_warm_worker(tmp_path) -> None:
+    pool = _pool(tmp_path)
+    try:
+        await pool.warm()
+        [worker] = pool._idle
+        assert worker.preloaded == ["json"]
+        tool = PythonTool(pool)
+
+        assert await tool.execute(code="import os\nprint('cwd', os.getcwd())\n6 * 7") == f"cwd {tmp_path}\n42"
+        assert pool._idle == [worker]
+        # Fresh namespace per call
+        assert await tool.execute(code="x = 1") == "(no output)"
+        assert "NameError: name 'x' is not defined" in await tool.execute(code="x")
+    finally:
+        await pool.aclose()
+
+
+async def test_worker_is_recycled_after_max_uses(tmp_path) -> None:
+    pool = _pool(tmp_path)
+    try:
+        pids = [(await pool.run("import os; os.getpid()", timeout=10))["result"] for _ in range(4)]
+
+        assert pids[0] == pids[1] == pids[2]
+        assert pids[3] != pids[0]
+    finally:
+        await pool.aclose()
+
+
+async def test_timeout_and_crash_replace_the_worker(tmp_path) -> None:
+    pool = _pool(tmp_path)
+    tool = PythonTool(pool, timeout=1)
+    try:
+        assert "timed out after 1 seconds" in await tool.execute(code="while True: pass")
+        assert "crashed" in await tool.execute(code="import os; os._exit(3)")
+        assert await tool.execute(code="print('still works')") == "still works"
+    finally:
+        await pool.aclose()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="rlimits are POSIX only")
+async def test_memory_cap_is_enforced(tmp_path) -> None:
+    pool = _pool(tmp_path, limits=ResourceLimits(address_space_mb=512))
+    try:
+        result = await PythonTool(pool).execute(code="b = bytearray(1024 ** 3)")
+        assert "MemoryError" in result
+    finally:
+        await pool.aclose()
+
+
+class _Provider:
+    def get_default_model(self) -> str:
+        return "dummy"
+
+
+@pytest.mark.parametrize(
+    ("enabled", "restricted", "registered"),
+    [(False, False, False), (True, False, True), (True, True, False)],
+)
+def test_tool_is_opt_in_and_never_registered_when_restricted(tmp_path, enabled, restricted, registered) -> None:
+    loop = AgentLoop(
+        bus=MessageBus(),
+        provider=_Provider(),  # type: ignore[arg-type]
+        workspace=tmp_path,
+        restrict_to_workspace=restricted,
+        python_config=PythonToolConfig(enabled=enabled),
+    )
+    assert ("python" in loop.tools.tool_names) is registered
+    # Nothing is started before the first call
+    assert loop.python_pool is None or not loop.python_pool._idle
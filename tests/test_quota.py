@@ -0,0 +1,92 @@
+import asyncio
+from pathlib import Path
+
+from nanobot.agent.quota import QuotaManager
+from nanobot.agent.subagent import SubagentManager
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import QuotaConfig
+from nanobot.providers.base import LLMResponse
+
+
+def test_quota_disabled_never_defers(tmp_path: Path) -> None:
+    quota = QuotaManager(QuotaConfig(sender_requests=1), store_path=tmp_path / 'usage.json')
+    quota.record_request('telegram', 'alice')
+    quota.record_request('telegram', 'alice')
+    assert quota.check('telegram', 'alice') is None
+    assert not (tmp_path / 'usage.json').exists()
+
+
+def test_quota_sender_token_budget(tmp_path: Path) -> None:
+    config = QuotaConfig(enabled=True, sender_tokens=100)
+    quota = QuotaManager(config, store_path=tmp_path / 'usage.json')
+
+    quota.record_usage('telegram', 'alice', {'total_tokens': 60})
+    assert quota.check('telegram', 'alice') is None
+
+    quota.record_usage('telegram', 'alice', {'prompt_tokens': 30, 'completion_tokens': 20})
+    deferral = quota.check('telegram', 'alice')
+    assert deferral is not None
+    assert 'try again' in deferral
+    assert quota.check('telegram', 'bob') is None
+
+
+def test_quota_channel_request_budget_persists(tmp_path: Path) -> None:
+    config = QuotaConfig(enabled=True, channel_requests=2)
+    store = tmp_path / 'usage.json'
+    quota = QuotaManager(config, store_path=store)
+    quota.record_request('discord', 'alice')
+    quota.record_request('discord', 'bob')
+    quota.save()  # Flush on shutdown
+
+    restarted = QuotaManager(config, store_path=store)
+    assert restarted.check('discord', 'carol') is not None
+    assert restarted.check('telegram', 'carol') is None
+    assert restarted.status()['channel:discord']['requests'] == 2
+
+
+async def test_quota_writes_are_debounced_and_off_the_event_loop(tmp_path: Path) -> None:
+    store = tmp_path / 'usage.json'
+    quota = QuotaManager(QuotaConfig(enabled=True), store_path=store)
+
+    quota.record_usage('telegram', 'alice', {'total_tokens': 10})
+    quota.record_usage('telegram', 'alice', {'total_tokens': 5})
+    while quota._writes:
+        await asyncio.sleep(0.01)
+    assert QuotaManager(QuotaConfig(enabled=True), store_path=store).status()['sender:telegram:alice']['tokens'] == 10
+
+    quota.save()
+    assert QuotaManager(QuotaConfig(enabled=True), store_path=store).status()['sender:telegram:alice']['tokens'] == 15
+
+
+class _UsageProvider:
+    def __init__(self):
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, timeout=None):
+        self.calls += 1
+        return LLMResponse(content='done', usage={'total_tokens': 40})
+
+    def get_default_model(self) -> str:
+        return 'dummy'
+
+
+async def test_subagents_spend_and_respect_the_spawning_senders_quota(tmp_path: Path) -> None:
+    quota = QuotaManager(QuotaConfig(enabled=True, sender_tokens=50))
+    provider = _UsageProvider()
+    bus = MessageBus()
+    manager = SubagentManager(provider=provider, workspace=tmp_path, bus=bus, quota=quota)  # type: ignore[arg-type]
+
+    await manager.spawn('first', origin_channel='telegram', origin_sender_id='alice')
+    announce = await asyncio.wait_for(bus.consume_inbound(), timeout=5)
+    assert 'completed successfully' in announce.content
+    assert announce.metadata['origin_sender_id'] == 'alice'
+    assert quota.status() == {
+        'sender:telegram:alice': {'tokens': 40, 'requests': 0},
+        'channel:telegram': {'tokens': 40, 'requests': 0},
+    }
+
+    quota.record_usage('telegram', 'alice', {'total_tokens': 20})
+    await manager.spawn('second', origin_channel='telegram', origin_sender_id='alice')
+    announce = await asyncio.wait_for(bus.consume_inbound(), timeout=5)
+    assert 'failed' in announce.content and 'try again' in announce.content
+    assert provider.calls == 1
@@ -0,0 +1,63 @@
+from nanobot.agent.tools.filesystem import ReadFileTool
+
+
+def _write_lines(path, count: int) -> None:
+    path.write_text("".join(f"line {i}\n" for i in range(1, count + 1)), encoding="utf-8")
+
+
+async def test_small_file_is_read_whole(tmp_path) -> None:
+    target = tmp_path / "a.txt"
+    _write_lines(target, 3)
+    assert await ReadFileTool().execute(path=str(target)) == "line 1\nline 2\nline 3\n"
+
+
+async def test_line_range_with_continuation_hint(tmp_path) -> None:
+    target = tmp_path / "a.txt"
+    _write_lines(target, 100)
+
+    result = await ReadFileTool().execute(path=str(target), offset=10, limit=3)
+
+    assert result.startswith("line 10\nline 11\nline 12\n")
+    assert "line 13" not in result
+    assert "continue with offset=13" in result
+    assert await ReadFileTool().execute(path=str(target), offset=99) == "line 99\nline 100\n"
+    assert (await ReadFileTool().execute(path=str(target), offset=500)).startswith("Error")
+
+
+async def test_line_index_crosses_scan_chunks(tmp_path, monkeypatch) -> None:
+    import nanobot.agent.tools.filesystem as fs
+
+    monkeypatch.setattr(fs, "_SCAN_CHUNK", 16)
+    target = tmp_path / "a.txt"
+    _write_lines(target, 50)
+
+    result = await ReadFileTool().execute(path=str(target), offset=37, limit=2)
+    assert result.startswith("line 37\nline 38\n")
+
+
+async def test_byte_range(tmp_path) -> None:
+    target = tmp_path / "a.txt"
+    target.write_text("0123456789", encoding="utf-8")
+
+    result = await ReadFileTool().execute(path=str(target), byte_offset=2, byte_limit=3)
+
+    assert result.startswith("234")
+    assert "continue with byte_offset=5" in result
+
+
+async def test_large_file_returns_summary(tmp_path) -> None:
+    target = tmp_path / "big.log"
+    _write_lines(target, 5000)
+
+    result = await ReadFileTool(max_bytes=1000).execute(path=str(target))
+
+    assert result.startswith("File too large to read at once")
+    assert "5,000 lines" in result
+    assert "line 1\n" in result
+    assert "line 4999" not in result
+
+
+async def test_binary_file_is_rejected(tmp_path) -> None:
+    target = tmp_path / "blob.bin"
+    target.write_bytes(b"\x89PNG\x00\x00data")
+    assert "binary" in await ReadFileTool().execute(path=str(target))
@@ -0,0 +1,40 @@
+import re
+
+from nanobot.agent.result_store import ResultStore
+from nanobot.agent.tools.result import ReadResultTool
+from nanobot.config.schema import ToolResultsConfig
+
+
+def _config() -> ToolResultsConfig:
+    return ToolResultsConfig(spill_chars=100, head_chars=20, tail_chars=10)
+
+
+async def test_small_results_stay_inline(tmp_path) -> None:
+    store = ResultStore(_config(), tmp_path)
+    assert await store.spill("exec", "short") == "short"
+    assert not any(tmp_path.iterdir())
+
+
+async def test_large_result_is_spilled_and_paged(tmp_path) -> None:
+    store = ResultStore(_config(), tmp_path)
+    text = "".join(f"line {i}\n" for i in range(100))
+
+    excerpt = await store.spill("web_fetch", text)
+
+    assert len(excerpt) < len(text)
+    assert excerpt.startswith(text[:20])
+    handle = re.search(r"stored as '([^']+)'", excerpt).group(1)
+
+    tool = ReadResultTool(tmp_path, max_chars=50)
+    page = await tool.execute(handle=handle, offset=20, limit=500)
+    assert text[20:70] in page
+    assert "continue with offset=70" in page
+
+    assert (await tool.execute(handle="../etc-1")).startswith("Error")
+    assert (await tool.execute(handle=handle, offset=10_000)).startswith("Error")
+
+
+async def test_read_result_output_is_never_spilled(tmp_path) -> None:
+    store = ResultStore(_config(), tmp_path)
+    text = "x" * 500
+    assert await store.spill("read_result", text) == text
@@ -0,0 +1,57 @@
+import asyncio
+
+from nanobot.agent.tools.search_cache import SearchCache
+from nanobot.agent.tools.web import WebSearchTool
+
+
+async def test_concurrent_identical_searches_share_one_request(tmp_path) -> None:
+    calls: list[tuple[str, int]] = []
+
+    async def search(query: str, n: int) -> str:
+        calls.append((query, n))
+        await asyncio.sleep(0.05)
+        return f"Results for: {query}"
+
+    tool = WebSearchTool(api_key="k", cache=SearchCache(tmp_path / "cache.json"))
+    tool._search = search
+
+    results = await asyncio.gather(
+        tool.execute(query="Python asyncio"),
+        tool.execute(query="  python   ASYNCIO "),
+        tool.execute(query="python asyncio", count=3),
+    )
+
+    assert results[0] == results[1]
+    # Whichever of the two equivalent queries got there first made the request
+    assert sorted(n for _, n in calls) == [3, 5]
+    assert tool.cache.coalesced == 1
+    assert await tool.execute(query="python asyncio") == results[0]
+    assert tool.cache.hits == 1
+
+
+async def test_cache_persists_expires_and_is_bounded(tmp_path) -> None:
+    path = tmp_path / "cache.json"
+    cache = SearchCache(path, ttl=60, max_entries=2)
+    for q in ("a", "b", "c"):
+        await cache.get_or_fetch(q, 5, lambda q=q: _result(q))
+
+    async def fail() -> str:
+        raise AssertionError("should be served from disk")
+
+    reloaded = SearchCache(path, ttl=60, max_entries=2)
+    assert await reloaded.get_or_fetch("c", 5, fail) == "Results for c"
+    assert await reloaded.get_or_fetch("a", 5, lambda: _result("a again")) == "Results for a again"
+
+    expiring = SearchCache(tmp_path / "other.json", ttl=0)
+    await expiring.get_or_fetch("c", 5, lambda: _result("old"))
+    assert await expiring.get_or_fetch("c", 5, lambda: _result("fresh")) == "Results for fresh"
+
+
+async def test_errors_are_not_cached(tmp_path) -> None:
+    cache = SearchCache(None)
+    assert await cache.get_or_fetch("q", 5, lambda: _result("x", error=True)) == "Error: x"
+    assert await cache.get_or_fetch("q", 5, lambda: _result("ok")) == "Results for ok"
+
+
+async def _result(text: str, error: bool = False) -> str:
+    return f"Error: {text}" if error else f"Results for {text}"
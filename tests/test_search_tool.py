@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from nanobot.agent.tools.search import SearchTool, WorkspaceIndex, _literal_runs
+
+
+def _workspace(tmp_path):
+    ws = tmp_path / "ws"
+    (ws / "src").mkdir(parents=True)
+    (ws / "node_modules").mkdir()
+    (ws / "src" / "app.py").write_text("def handler():\n    return compute_total(1)\n\ncompute_total(2)\n")
+    (ws / "src" / "util.py").write_text("def compute_total(x):\n    return x\n")
+    (ws / "notes.md").write_text("nothing relevant here\n")
+    (ws / "node_modules" / "dep.js").write_text("compute_total()\n")
+    return ws
+
+
+async def test_literal_search_ranks_files_and_skips_dependency_dirs(tmp_path) -> None:
+    ws = _workspace(tmp_path)
+    tool = SearchTool(ws, index_path=tmp_path / "index.json")
+
+    result = await tool.execute(query="compute_total", context=0)
+
+    lines = result.splitlines()
+    assert lines[0] == "3 matches in 2 files for: compute_total"
+    assert lines[2].startswith("src/app.py:2:")
+    assert "src/util.py:1:" in result
+    assert "node_modules" not in result
+
+
+async def test_regex_glob_and_context(tmp_path) -> None:
+    ws = _workspace(tmp_path)
+    tool = SearchTool(ws, index_path=tmp_path / "index.json")
+
+    result = await tool.execute(query=r"def \w+\(", regex=True, glob="util.py", context=1)
+
+    assert "src/util.py:1: def compute_total(x):" in result
+    assert "src/util.py-2-     return x" in result
+    assert "app.py" not in result
+    assert (await tool.execute(query="(", regex=True)).startswith("Error")
+
+
+async def test_index_is_persisted_and_updated_from_mtimes(tmp_path) -> None:
+    ws = _workspace(tmp_path)
+    index_path = tmp_path / "index.json"
+    assert (await SearchTool(ws, index_path=index_path).execute(query="fresh_marker")).startswith("No matches")
+
+    data = json.loads(index_path.read_text())
+    assert "src/util.py" in data["files"]
+
+    (ws / "src" / "new.py").write_text("fresh_marker = 1\n")
+    (ws / "notes.md").unlink()
+    tool = SearchTool(ws, index_path=index_path)
+    assert "src/new.py:1:" in await tool.execute(query="FRESH_marker")
+    assert "notes.md" not in json.loads(index_path.read_text())["files"]
+
+
+async def test_search_respects_workspace_restriction(tmp_path) -> None:
+    ws = _workspace(tmp_path)
+    tool = SearchTool(ws, allowed_dir=ws, index_path=tmp_path / "index.json")
+    assert (await tool.execute(query="x", path=str(tmp_path))).startswith("Error")
+
+
+def test_literal_runs_are_conservative() -> None:
+    assert _literal_runs(r"foo|bar") is None
+    assert _literal_runs(r"colou?r_name") == ["colo", "r_name"]
+    assert _literal_runs(r"abc{2,3}def(ghi)?") == ["def"]
+
+
+async def test_escape_payloads_are_not_taken_as_literals(tmp_path) -> None:
+    assert _literal_runs(r"\x41BC123") == ["BC123"]
+    assert _literal_runs(r"\N{LATIN CAPITAL LETTER A}BC123") == ["BC123"]
+    assert _literal_runs(r"(ab)\1xyz") == ["xyz"]
+    assert _literal_runs(r"\éabc") is None
+
+    ws = _workspace(tmp_path)
+    (ws / "ids.txt").write_text("ABC123\n")
+    tool = SearchTool(ws, index_path=tmp_path / "index.json")
+    assert "ids.txt:1:" in await tool.execute(query=r"\x41BC123", regex=True)
+    assert "ids.txt:1:" in await tool.execute(query=r"ABC123", regex=True)
+
+
+async def test_shared_index_survives_concurrent_searches(tmp_path) -> None:
+    ws = _workspace(tmp_path)
+    index = WorkspaceIndex(ws.resolve(), tmp_path / "index.json")
+    tools = [SearchTool(ws, index=index) for _ in range(4)]
+
+    results = await asyncio.gather(*(t.execute(query="compute_total") for t in tools * 5))
+
+    assert all(r.startswith("3 matches in 2 files") for r in results)
+    assert "src/util.py" in json.loads((tmp_path / "index.json").read_text())["files"]
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionManager
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="persistent shells need a pty")
+
+
+def _tool(tmp_path, **kwargs) -> ExecTool:
+    tool = ExecTool(working_dir=str(tmp_path), sessions=ShellSessionManager(**kwargs), timeout=5)
+    tool.set_context("cli", "direct")
+    return tool
+
+
+async def test_state_persists_between_calls(tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+    tool = _tool(tmp_path)
+    try:
+        assert await tool.execute(command="cd sub && export GREETING=hi") == "(no output)"
+        assert await tool.execute(command='pwd; echo "$GREETING"') == f"{tmp_path / 'sub'}\nhi\n"
+        assert (await tool.execute(command="false")).endswith("Exit code: 1")
+        assert await tool.execute(command="pwd", reset_session=True) == f"{tmp_path}\n"
+    finally:
+        tool.sessions.close_all()
+
+
+async def test_timeout_and_exit_reset_the_session(tmp_path) -> None:
+    tool = _tool(tmp_path)
+    tool.timeout = 1
+    try:
+        assert "shell session was reset" in await tool.execute(command="export X=1; sleep 5")
+        assert "shell session was reset" in await tool.execute(command="exit 3")
+        assert await tool.execute(command='echo "[$X]"') == "[]\n"
+    finally:
+        tool.sessions.close_all()
+
+
+async def test_session_cap_evicts_least_recently_used(tmp_path) -> None:
+    sessions = ShellSessionManager(max_sessions=1)
+    try:
+        first = await sessions.acquire("a", str(tmp_path))
+        await sessions.acquire("b", str(tmp_path))
+        assert len(sessions) == 1
+        assert not first.alive or first._master is None
+    finally:
+        sessions.close_all()
+
+
+async def test_command_larger_than_the_pty_buffer(tmp_path) -> None:
+    tool = _tool(tmp_path)
+    payload = "x" * 100_000
+    try:
+        assert await tool.execute(command=f"P='{payload}'; echo ${{#P}}") == "100000\n"
+        assert await tool.execute(command='echo "${#P}"; pwd') == f"100000\n{tmp_path}\n"
+    finally:
+        tool.sessions.close_all()
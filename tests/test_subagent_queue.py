@@ -0,0 +1,79 @@
+import asyncio
+from pathlib import Path
+
+from nanobot.agent.subagent import SubagentManager
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import SubagentsConfig
+
+
+class _Provider:
+    def get_default_model(self) -> str:
+        return "dummy"
+
+
+def _manager(tmp_path: Path, **config) -> tuple[SubagentManager, list[str], dict[str, asyncio.Event]]:
+    """Manager whose subagents wait for a per-task release event instead of calling a model."""
+    manager = SubagentManager(
+        provider=_Provider(),  # type: ignore[arg-type]
+        workspace=tmp_path,
+        bus=MessageBus(),
+        subagents_config=SubagentsConfig(**config),
+    )
+    started: list[str] = []
+    release: dict[str, asyncio.Event] = {}
+
+    async def run(task_id, task, label, origin) -> None:
+        started.append(task)
+        await release.setdefault(task, asyncio.Event()).wait()
+
+    manager._run_subagent = run  # type: ignore[method-assign]
+    return manager, started, release
+
+
+async def test_spawns_beyond_the_limit_queue_by_priority(tmp_path: Path) -> None:
+    manager, started, release = _manager(tmp_path, max_concurrent=1)
+
+    assert "started" in await manager.spawn("a")
+    assert "queued at position 1" in await manager.spawn("b", priority="low")
+    assert "queued at position 2" in await manager.spawn("c", priority="low")
+    assert "queued at position 1" in await manager.spawn("d", priority="high")
+    assert "queued at position 2" in await manager.spawn("e")
+    await asyncio.sleep(0)
+
+    stats = manager.queue_stats()
+    assert stats["running"] == 1 and stats["queued"] == 4
+    assert stats["queuedByPriority"] == {"high": 1, "normal": 1, "low": 2}
+
+    for task in ["a", "d", "e", "b"]:
+        release.setdefault(task, asyncio.Event()).set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+    assert started == ["a", "d", "e", "b", "c"]
+
+    stats = manager.queue_stats()
+    assert stats["running"] == 1 and stats["queued"] == 0 and stats["startedFromQueue"] == 4
+
+
+async def test_full_queue_and_bad_priority_are_rejected(tmp_path: Path) -> None:
+    manager, _, release = _manager(tmp_path, max_concurrent=1, max_queued=1)
+
+    await manager.spawn("a")
+    await manager.spawn("b")
+    assert (await manager.spawn("c")).startswith("Error:")
+    assert (await manager.spawn("d", priority="urgent")).startswith("Error:")
+    assert manager.queue_stats()["queued"] == 1
+
+    for event in release.values():
+        event.set()
+
+
+async def test_zero_means_unlimited(tmp_path: Path) -> None:
+    manager, started, release = _manager(tmp_path, max_concurrent=0)
+
+    results = [await manager.spawn(str(n)) for n in range(5)]
+    await asyncio.sleep(0)
+
+    assert all("started" in r for r in results)
+    assert len(started) == 5 and manager.get_running_count() == 5
+    for event in release.values():
+        event.set()
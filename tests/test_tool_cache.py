@@ -0,0 +1,97 @@
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool
+from nanobot.agent.tools.registry import ToolRegistry, ToolResultCache, workspace_changes
+
+
+class _FetchTool(Tool):
+    name = "web_fetch"
+    description = "counts fetches"
+    parameters = {
+        "type": "object",
+        "properties": {
+            "url": {"type": "string"},
+            "extractMode": {"type": "string", "default": "markdown"},
+        },
+        "required": ["url"],
+    }
+    idempotent = True
+
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, **kwargs: Any) -> str:
+        self.calls += 1
+        if kwargs["url"] == "bad":
+            return "Error: fetch failed"
+        return f"page {kwargs['url']}"
+
+
+async def test_identical_calls_hit_cache_with_defaults_normalized() -> None:
+    tool = _FetchTool()
+    reg = ToolRegistry()
+    reg.register(tool)
+    cache = ToolResultCache()
+
+    first = await reg.execute("web_fetch", {"url": "a"}, cache=cache)
+    second = await reg.execute("web_fetch", {"url": "a", "extractMode": "markdown"}, cache=cache)
+
+    assert first == second == "page a"
+    assert tool.calls == 1
+    assert reg.cache_stats() == {"hits": 1, "misses": 1, "hitRate": 0.5}
+
+
+async def test_errors_are_not_cached_and_no_cache_means_no_memo() -> None:
+    tool = _FetchTool()
+    reg = ToolRegistry()
+    reg.register(tool)
+    cache = ToolResultCache()
+
+    await reg.execute("web_fetch", {"url": "bad"}, cache=cache)
+    await reg.execute("web_fetch", {"url": "bad"}, cache=cache)
+    await reg.execute("web_fetch", {"url": "a"})
+    await reg.execute("web_fetch", {"url": "a"})
+
+    assert tool.calls == 4
+    assert len(cache) == 0
+
+
+async def test_workspace_write_invalidates_file_reads(tmp_path) -> None:
+    reg = ToolRegistry()
+    reg.register(ReadFileTool())
+    reg.register(WriteFileTool())
+    cache = ToolResultCache()
+    target = tmp_path / "note.txt"
+    target.write_text("v1", encoding="utf-8")
+
+    assert await reg.execute("read_file", {"path": str(target)}, cache=cache) == "v1"
+    target.write_text("changed behind the cache", encoding="utf-8")
+    assert await reg.execute("read_file", {"path": str(target)}, cache=cache) == "v1"
+
+    await reg.execute("write_file", {"path": str(target), "content": "v2"}, cache=cache)
+    assert await reg.execute("read_file", {"path": str(target)}, cache=cache) == "v2"
+
+
+async def test_writes_from_other_registries_and_jobs_invalidate_reads(tmp_path) -> None:
+    main, subagent = ToolRegistry(), ToolRegistry(scope="subagent")
+    main.register(ReadFileTool())
+    subagent.register(WriteFileTool())
+    cache = ToolResultCache()
+    target = tmp_path / "note.txt"
+    target.write_text("v1", encoding="utf-8")
+
+    assert await main.execute("read_file", {"path": str(target)}, cache=cache) == "v1"
+    await subagent.execute("write_file", {"path": str(target), "content": "v2"})
+    assert await main.execute("read_file", {"path": str(target)}, cache=cache) == "v2"
+
+    # While a background job runs, reads are never memoized; its end invalidates them
+    workspace_changes.job_started()
+    try:
+        target.write_text("v3", encoding="utf-8")
+        assert await main.execute("read_file", {"path": str(target)}, cache=cache) == "v3"
+        assert len(cache) == 1
+    finally:
+        workspace_changes.job_finished()
+    target.write_text("v4", encoding="utf-8")
+    assert await main.execute("read_file", {"path": str(target)}, cache=cache) == "v4"
@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.deadline import TurnDeadline
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.exposure import ToolExposurePolicy, ToolSelection
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import ToolExposureConfig
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+TOOLS = ["read_file", "exec", "web_search", "web_fetch", "cron", "message"]
+
+
+class _NamedTool(Tool):
+    parameters = {"type": "object", "properties": {}}
+
+    def __init__(self, name: str):
+        self._name = name
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return self._name
+
+    async def execute(self, **kwargs: Any) -> str:
+        self.calls += 1
+        return "ran"
+
+
+class _ScriptedProvider:
+    """Calls `exec` once, then answers; records the tool names it was offered."""
+
+    def __init__(self):
+        self.offered: list[set[str]] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, timeout=None):
+        self.offered.append({t["function"]["name"] for t in tools or []})
+        if len(self.offered) == 1:
+            return LLMResponse(content="", tool_calls=[ToolCallRequest(id="c1", name="exec", arguments={})])
+        return LLMResponse(content="done")
+
+    def get_default_model(self) -> str:
+        return "dummy"
+
+
+def test_default_policy_exposes_everything() -> None:
+    selection = ToolExposurePolicy.from_config(ToolExposureConfig()).select(TOOLS, "cli", "hi")
+    assert selection.allowed is None and selection.exposed is None
+    assert selection.allows("anything")
+
+
+def test_channel_allowlist_and_keyword_groups() -> None:
+    policy = ToolExposurePolicy(
+        channels={"discord": ["web", "messaging"]},
+        optional={"web": ["search", "http"], "schedule": ["remind"]},
+    )
+
+    plain = policy.select(TOOLS, "discord", "hello there")
+    assert plain.allowed == {"web_search", "web_fetch", "message"}
+    assert plain.exposed == {"message"}
+    assert not plain.allows("exec")
+
+    asked = policy.select(TOOLS, "discord", "Please SEARCH for it")
+    assert asked.exposed == {"web_search", "web_fetch", "message"}
+
+    # Unlisted channels allow everything, optional groups still need a keyword
+    cli = policy.select(TOOLS, "cli", "Remind me at noon")
+    assert cli.allowed == set(TOOLS)
+    assert cli.exposed == {"read_file", "exec", "cron", "message"}
+
+
+def test_calling_a_hidden_tool_exposes_its_group() -> None:
+    policy = ToolExposurePolicy(optional={"web": ["search"]})
+    selection = policy.select(TOOLS, "cli", "hi")
+    assert "web_fetch" not in selection.exposed
+
+    selection.note_call("web_search")
+    assert {"web_search", "web_fetch"} <= selection.exposed
+
+
+def test_registry_filters_definitions() -> None:
+    reg = ToolRegistry()
+    for name in TOOLS:
+        reg.register(_NamedTool(name))
+    assert len(reg.get_definitions()) == len(TOOLS)
+    assert [d["function"]["name"] for d in reg.get_definitions({"exec", "missing"})] == ["exec"]
+
+
+async def test_loop_refuses_tools_outside_the_channel(tmp_path: Path) -> None:
+    provider = _ScriptedProvider()
+    loop = AgentLoop(
+        bus=MessageBus(),
+        provider=provider,  # type: ignore[arg-type]
+        workspace=tmp_path,
+        model="dummy",
+        exposure_config=ToolExposureConfig(channels={"discord": ["messaging"]}),
+    )
+    probe = _NamedTool("exec")
+    loop.tools.register(probe)
+    messages = [{"role": "user", "content": "run it"}]
+
+    output = await loop._run_agent_loop(
+        messages, "discord", "user", TurnDeadline(0),
+        selection=loop.select_tools("discord", "run it"),
+    )
+
+    assert output == "done"
+    assert provider.offered[0] <= {"message"}
+    assert probe.calls == 0
+    assert ToolSelection.refusal("exec", "discord") in str(messages)
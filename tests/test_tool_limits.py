@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolLimiter, ToolRegistry
+from nanobot.config.schema import ToolLimitConfig, ToolsConfig
+
+
+class _SlowTool(Tool):
+    name = "slow"
+    description = "sleeps"
+    parameters = {"type": "object", "properties": {"seconds": {"type": "number"}}}
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def execute(self, seconds: float = 0.05, **kwargs: Any) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.active -= 1
+        return "done"
+
+
+async def test_per_tool_timeout_returns_error() -> None:
+    reg = ToolRegistry(ToolLimiter(default_timeout=0.1))
+    reg.register(_SlowTool())
+
+    assert await reg.execute("slow", {"seconds": 0.01}) == "done"
+    result = await reg.execute("slow", {"seconds": 5})
+    assert result.startswith("Error: Tool 'slow' timed out after 0.1s (per-tool limit)")
+
+    # The turn budget is reported as such when it is the tighter limit
+    result = await reg.execute("slow", {"seconds": 5}, timeout=0.05)
+    assert "turn time budget exhausted" in result
+
+
+async def test_concurrency_cap_is_shared_between_registries() -> None:
+    limiter = ToolLimiter(max_concurrent={"slow": 2})
+    tool = _SlowTool()
+    agent, subagent = ToolRegistry(limiter), ToolRegistry(limiter)
+    agent.register(tool)
+    subagent.register(tool)
+
+    calls = [agent.execute("slow", {}) for _ in range(3)] + [subagent.execute("slow", {}) for _ in range(3)]
+    waiting = asyncio.gather(*calls)
+    await asyncio.sleep(0.01)
+    assert limiter.stats() == {"slow": {"limit": 2, "running": 2, "waiting": 4}}
+
+    assert await waiting == ["done"] * 6
+    assert tool.peak == 2
+    assert limiter.stats()["slow"]["running"] == 0
+
+
+def test_configured_limits_override_the_defaults() -> None:
+    config = ToolsConfig(default_timeout=120, limits={"exec": ToolLimitConfig(max_concurrent=2)})
+    limiter = ToolLimiter.from_config(config)
+
+    assert limiter.max_concurrent["exec"] == 2
+    assert limiter.timeout_for("exec") is None  # Unset fields keep their built-in value
+    assert limiter.timeout_for("web_fetch") == 60
+    assert limiter.timeout_for("read_file") == 120
@@ -0,0 +1,54 @@
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.metrics import ToolMetrics
+from nanobot.agent.tools.registry import ToolLimiter, ToolRegistry
+
+
+class _EchoTool(Tool):
+    name = "echo"
+    description = "echoes"
+    parameters = {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]}
+
+    async def execute(self, text: str, **kwargs: Any) -> str:
+        if text == "boom":
+            raise RuntimeError("boom")
+        return text
+
+
+async def test_registry_records_calls_by_scope(tmp_path) -> None:
+    metrics = ToolMetrics()
+    agent = ToolRegistry(metrics=metrics)
+    subagent = ToolRegistry(ToolLimiter(), metrics, scope="subagent")
+    agent.register(_EchoTool())
+    subagent.register(_EchoTool())
+
+    await agent.execute("echo", {"text": "héllo"})
+    await agent.execute("echo", {"text": "boom"})
+    await agent.execute("echo", {})
+    await subagent.execute("echo", {"text": "hi"})
+
+    tools = metrics.snapshot()["tools"]
+    main = tools["echo"]["agent"]
+    assert main["calls"] == 2 and main["errors"] == 1 and main["invalidParams"] == 1
+    assert main["maxResultBytes"] == len("Error executing echo: boom")
+    assert main["latencyBuckets"]["0.01"] == 2 and main["p95Ms"] <= 10.0
+    assert tools["echo"]["subagent"]["calls"] == 1
+    assert tools["echo"]["subagent"]["resultBytes"] == 2
+
+    path = tmp_path / "metrics" / "tools.json"
+    metrics.save(path)
+    assert not metrics.dirty
+    assert ToolMetrics.load_snapshot(path)["tools"] == tools
+    assert ToolMetrics.load_snapshot(tmp_path / "missing.json") is None
+
+
+def test_quantiles_use_bucket_bounds() -> None:
+    metrics = ToolMetrics()
+    for seconds in (0.02, 0.03, 0.04, 0.7, 400.0):
+        metrics.record("t", "agent", seconds, "", error=False, timed_out=False)
+
+    stats = metrics.snapshot()["tools"]["t"]["agent"]
+    assert stats["p50Ms"] == 50.0
+    assert stats["p95Ms"] == 400000.0  # Beyond the last bucket: the slowest call
+    assert stats["maxMs"] == 400000.0
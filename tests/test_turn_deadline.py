@@ -0,0 +1,79 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.deadline import TIMED_OUT_FALLBACK, TurnDeadline
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import TurnDeadlinesConfig
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+
+class _SlowTool(Tool):
+    name = "slow"
+    description = "sleeps"
+    parameters = {"type": "object", "properties": {}}
+
+    async def execute(self, **kwargs: Any) -> str:
+        await asyncio.sleep(5)
+        return "done"
+
+
+class _LoopingProvider:
+    """Always asks for another tool call, and records request timeouts."""
+
+    def __init__(self):
+        self.timeouts: list[float | None] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, timeout=None):
+        self.timeouts.append(timeout)
+        if messages[-1]["role"] == "user" and "time budget" in str(messages[-1]["content"]):
+            return LLMResponse(content="partial answer")
+        return LLMResponse(
+            content="",
+            tool_calls=[ToolCallRequest(id=f"c{len(self.timeouts)}", name="slow", arguments={})],
+        )
+
+    def get_default_model(self) -> str:
+        return "dummy"
+
+
+def test_deadline_per_source_and_channel_override() -> None:
+    config = TurnDeadlinesConfig(interactive=30, cron=600, channels={"telegram": 10}, finalize_seconds=4)
+    assert TurnDeadline.for_source(config, "interactive", "discord").seconds == 30
+    assert TurnDeadline.for_source(config, "interactive", "telegram").seconds == 10
+    assert TurnDeadline.for_source(config, "cron", "telegram").seconds == 600
+    unbounded = TurnDeadline(0)
+    assert unbounded.timeout() is None and not unbounded.expired
+
+
+async def test_registry_enforces_timeout() -> None:
+    reg = ToolRegistry()
+    reg.register(_SlowTool())
+    result = await reg.execute("slow", {}, timeout=0.05)
+    assert "timed out" in result
+
+
+async def test_turn_ends_with_best_effort_answer(tmp_path: Path) -> None:
+    provider = _LoopingProvider()
+    loop = AgentLoop(
+        bus=MessageBus(),
+        provider=provider,  # type: ignore[arg-type]
+        workspace=tmp_path,
+        model="dummy",
+        max_iterations=20,
+        deadlines_config=TurnDeadlinesConfig(interactive=3, finalize_seconds=1),
+    )
+    loop.tools.register(_SlowTool())
+
+    output = await loop._run_agent_loop(
+        [{"role": "user", "content": "go"}],
+        "cli",
+        "user",
+        TurnDeadline.for_source(loop.deadlines, "interactive", "cli"),
+    )
+
+    assert output in ("partial answer", TIMED_OUT_FALLBACK)
+    assert provider.timeouts[0] is not None and provider.timeouts[0] <= 2
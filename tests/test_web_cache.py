@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import time
+from email.utils import formatdate
+
+from nanobot.agent.tools.web import WebFetchTool
+from nanobot.agent.tools.web_cache import CachedPage, WebCache, cache_policy
+from nanobot.utils.http import close_http_client
+
+
+async def _serve(cache_control: str):
+    """HTTP server with an ETag; returns (server, url, list of request header blocks)."""
+    requests: list[str] = []
+    body = b"<html><head><title>Doc</title></head><body><p>Hello cache</p></body></html>"
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode().lower()
+        requests.append(head)
+        if 'if-none-match: "v1"' in head:
+            writer.write(b'HTTP/1.1 304 Not Modified\r\nETag: "v1"\r\nConnection: close\r\n\r\n')
+        else:
+            writer.write(
+                b'HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nETag: "v1"\r\n'
+                b"Cache-Control: %s\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s"
+                % (cache_control.encode(), len(body), body)
+            )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/doc", requests
+
+
+def test_cache_policy() -> None:
+    assert cache_policy({"cache-control": "no-store"}, 60) == (False, 0)
+    assert cache_policy({"cache-control": "no-cache, max-age=30"}, 60) == (True, 0)
+    assert cache_policy({"cache-control": "public, max-age=30"}, 60) == (True, 30)
+    assert cache_policy({"expires": "not a date"}, 60) == (True, 0)
+    assert 0 < cache_policy({"expires": formatdate(time.time() + 120, usegmt=True)}, 60)[1] <= 120
+    assert cache_policy({}, 60) == (True, 60)
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path) -> None:
+    cache = WebCache(tmp_path, max_bytes=6000)
+
+    def page(n: int) -> CachedPage:
+        return CachedPage(url=f"https://x/{n}", mode="text", final_url="", status=200,
+                          headers={}, extractor="raw", text="")
+
+    for n in range(3):
+        cache.put(page(n), b"x" * 1500, {})
+        stamp = time.time() - 100 + n
+        os.utime(tmp_path / f"{cache.key(f'https://x/{n}', 'text')}.json", (stamp, stamp))
+    assert cache.get("https://x/0", "text")  # Touch the oldest entry
+
+    cache.put(page(3), b"x" * 1500, {})
+
+    assert cache.size() <= 6000
+    assert cache.get("https://x/1", "text") is None
+    assert all(cache.get(f"https://x/{n}", "text") for n in (0, 2, 3))
+
+
+async def test_fetch_serves_hits_and_revalidates(tmp_path) -> None:
+    server, url, requests = await _serve("no-cache")
+    tool = WebFetchTool(cache=WebCache(tmp_path))
+    try:
+        first = json.loads(await tool.execute(url=url))
+        assert first["cache"] == "miss" and "Hello cache" in first["text"]
+
+        second = json.loads(await tool.execute(url=url))
+        assert second["cache"] == "revalidated" and second["text"] == first["text"]
+        assert 'if-none-match: "v1"' in requests[1]
+    finally:
+        await close_http_client()
+        server.close()
+
+    # max-age pages are served without a request while fresh
+    server, url, requests = await _serve("max-age=60")
+    try:
+        await tool.execute(url=url)
+        assert json.loads(await tool.execute(url=url))["cache"] == "hit"
+        assert len(requests) == 1
+    finally:
+        await close_http_client()
+        server.close()
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+from nanobot.agent.tools.web import WebFetchTool
+from nanobot.utils.http import close_http_client
+
+
+async def _serve(headers: bytes, body_chunks: int, chunk: bytes = b"a" * 65536):
+    """Server that streams `body_chunks` chunks (-1 = forever); returns (server, url, sent bytes)."""
+    sent = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal sent
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\n" + headers + b"Connection: close\r\n\r\n")
+        try:
+            n = 0
+            while body_chunks < 0 or n < body_chunks:
+                writer.write(chunk)
+                await writer.drain()
+                sent += len(chunk)
+                n += 1
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/", lambda: sent
+
+
+async def test_endless_body_is_cut_at_byte_limit() -> None:
+    server, url, sent = await _serve(b"Content-Type: text/plain\r\n", body_chunks=-1)
+    try:
+        result = json.loads(await WebFetchTool(max_bytes=200_000).execute(url=url, maxChars=1_000_000))
+        assert result["truncated"] is True
+        assert result["length"] == 200_000
+        assert sent() < 10_000_000
+    finally:
+        await close_http_client()
+        server.close()
+
+
+async def test_binary_content_is_refused_before_download() -> None:
+    server, url, sent = await _serve(b"Content-Type: application/octet-stream\r\n", body_chunks=-1)
+    try:
+        result = json.loads(await WebFetchTool().execute(url=url))
+        assert "Unsupported content type 'application/octet-stream'" in result["error"]
+        assert sent() < 10_000_000
+    finally:
+        await close_http_client()
+        server.close()
+
+
+async def test_untyped_binary_is_sniffed() -> None:
+    server, url, _ = await _serve(b"", body_chunks=1, chunk=b"\x89PNG\r\n\x1a\n\0\0\0")
+    try:
+        result = json.loads(await WebFetchTool().execute(url=url))
+        assert "binary" in result["error"]
+    finally:
+        await close_http_client()
+        server.close()
+
+
+async def test_charset_is_decoded_across_chunks() -> None:
+    text = "Grüße aus Köln " * 5000
+    body = text.encode("latin-1")
+    server, url, _ = await _serve(b"Content-Type: text/plain; charset=iso-8859-1\r\n", body_chunks=1, chunk=body)
+    try:
+        result = json.loads(await WebFetchTool().execute(url=url, maxChars=1_000_000))
+        assert result["text"] == text
+    finally:
+        await close_http_client()
+        server.close()
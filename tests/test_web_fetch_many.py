@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from nanobot.agent.tools.registry import ToolLimiter, ToolRegistry
+from nanobot.agent.tools.web import WebFetchManyTool, WebFetchTool, _apply_total_budget
+
+
+class _FakeFetch(WebFetchTool):
+    """Returns `size` characters per URL and records concurrency."""
+
+    def __init__(self, sizes: dict[str, int]):
+        super().__init__()
+        self.sizes = sizes
+        self.active = 0
+        self.peak = 0
+        self.calls: list[str] = []
+
+    async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs) -> str:
+        self.calls.append(url)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        if url not in self.sizes:
+            return json.dumps({"error": "404", "url": url})
+        text = "x" * min(self.sizes[url], maxChars)
+        return json.dumps({"url": url, "truncated": len(text) < self.sizes[url], "length": len(text), "text": text})
+
+
+async def test_fetches_concurrently_within_limits() -> None:
+    sizes = {f"https://a.com/{i}": 100 for i in range(4)} | {f"https://b.com/{i}": 100 for i in range(4)}
+    fetch = _FakeFetch(sizes)
+    tool = WebFetchManyTool(fetch, concurrency=3, per_host=1)
+
+    result = json.loads(await tool.execute(urls=list(sizes) + ["https://a.com/0", "https://c.com/missing"]))
+
+    assert fetch.peak == 3
+    assert len(fetch.calls) == 9  # The duplicate is fetched once
+    assert result["fetched"] == 8 and result["failed"] == 1
+    assert result["results"][-1]["error"] == "404"
+
+
+async def test_total_budget_is_shared_by_long_pages() -> None:
+    fetch = _FakeFetch({"https://a.com/short": 100, "https://b.com/long": 5000, "https://c.com/long": 5000})
+    tool = WebFetchManyTool(fetch, max_total_chars=2100)
+
+    result = json.loads(await tool.execute(urls=list(fetch.sizes)))
+
+    assert [r["length"] for r in result["results"]] == [100, 1000, 1000]
+    assert result["totalChars"] == 2100
+    assert result["results"][1]["truncated"] is True
+
+
+def test_apply_total_budget_keeps_short_documents() -> None:
+    docs = [{"text": "a" * 10}, {"text": "b" * 50}, {"text": "c" * 50}]
+    _apply_total_budget(docs, 70)
+    assert [len(d["text"]) for d in docs] == [10, 30, 30]
+
+
+async def test_each_url_takes_a_web_fetch_slot_through_the_registry() -> None:
+    sizes = {f"https://h{i}.com/": 100 for i in range(6)}
+    fetch = _FakeFetch(sizes)
+    registry = ToolRegistry(ToolLimiter(max_concurrent={"web_fetch": 2}))
+    registry.register(fetch)
+    tool = WebFetchManyTool(fetch, concurrency=4, registry=registry)
+
+    result = json.loads(await tool.execute(urls=list(sizes)))
+
+    assert result["fetched"] == 6
+    assert fetch.peak == 2
+    assert registry.metrics.snapshot()["tools"]["web_fetch"]["agent"]["calls"] == 6
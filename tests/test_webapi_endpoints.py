@@ -16,7 +16,7 @@ class DummyProvider(LLMProvider):
     def __init__(self):
         super().__init__(api_key='test', api_base=None)
 
-    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, timeout=None):
         return LLMResponse(content='ok')
 
     async def chat_stream(
@@ -26,6 +26,7 @@ class DummyProvider(LLMProvider):
         model=None,
         max_tokens=4096,
         temperature=0.7,
+        timeout=None,
     ) -> AsyncIterator[dict]:
         yield {'type': 'delta', 'text': 'ok'}
         yield {'type': 'done', 'response': LLMResponse(content='ok')}
@@ -134,6 +135,24 @@ def test_config_endpoint_masks_secrets(tmp_path: Path) -> None:
     assert state.config.providers.openai.api_key == 'sk-test-secret-12345'
 
 
+def test_tool_metrics_endpoint(tmp_path: Path) -> None:
+    client, state = _build_client(tmp_path)
+    state.agent.tools.metrics.record('web_fetch', 'agent', 0.2, 'page', error=False, timed_out=False)
+
+    response = client.get('/api/v1/metrics/tools', headers=_headers())
+    assert response.status_code == 200
+    assert response.json()['tools']['web_fetch']['agent']['calls'] == 1
+
+
+def test_status_reports_subagent_queue(tmp_path: Path) -> None:
+    client, _ = _build_client(tmp_path)
+
+    response = client.get('/api/v1/status', headers=_headers())
+    assert response.status_code == 200
+    subagents = response.json()['subagents']
+    assert subagents['maxConcurrent'] == 3 and subagents['queued'] == 0
+
+
 def test_auth_is_enforced(tmp_path: Path) -> None:
     client, _ = _build_client(tmp_path)
     response = client.get('/api/v1/status')